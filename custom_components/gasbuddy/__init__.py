@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+from itertools import starmap
 import logging
+import time
 from types import MappingProxyType
 
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import (
     config_validation as cv,
     device_registry as dr,
@@ -18,8 +21,10 @@ from homeassistant.helpers.device_registry import DeviceEntry
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CONF_ADAPTIVE_POLLING,
     CONF_BRAND_ADJUSTMENTS,
     CONF_CHEAPEST,
+    CONF_DETOUR_PENALTY,
     CONF_EV_CHARGING,
     CONF_EXCLUDE_BRANDS,
     CONF_EXCLUDE_STATIONS,
@@ -27,24 +32,43 @@ from .const import (
     CONF_GPS,
     CONF_INCLUDE_BRANDS,
     CONF_INCLUDE_STATIONS,
+    CONF_INDEX_RADIUS,
     CONF_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
     CONF_NAME,
+    CONF_RANK_SENSORS,
+    CONF_RESPONSE_CACHE_SIZE,
+    CONF_RESPONSE_CACHE_TTL,
     CONF_SHOW_DISCOUNTED,
     CONF_SOLVER,
+    CONF_STARTUP_CONCURRENCY,
     CONF_STATION_ID,
     CONF_TIMEOUT,
+    CONF_TOP_K,
     CONF_UOM,
     CONFIG_VER,
     COORDINATOR,
+    DEFAULT_DETOUR_PENALTY,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_STARTUP_CONCURRENCY,
     DEFAULT_TIMEOUT as DEFAULT_TIMEOUT,
+    DEFAULT_TOP_K,
     DOMAIN,
+    HUB,
     ISSUE_URL,
     PLATFORMS,
+    REGIONS,
     SERVICES,
     VERSION,
     CoordinatorsDict,
 )
 from .coordinator import GasBuddyUpdateCoordinator
+from .hub import GasBuddyHub
+from .region import GasBuddyRegionCoordinator
 from .services import GasBuddyServices
 
 _LOGGER = logging.getLogger(__name__)
@@ -177,6 +201,75 @@ async def _async_migrate_legacy_entries(hass: HomeAssistant, hub_entry: ConfigEn
         )
 
 
+async def _async_first_refresh(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinators: dict[str, GasBuddyUpdateCoordinator],
+) -> None:
+    """Run the first refresh of every station concurrently.
+
+    At most ``startup_concurrency`` stations refresh at once. A station that
+    is not ready yet is logged and left to retry on its own update interval
+    instead of holding back the rest of the hub; only when no station comes
+    up at all is the hub setup retried. Stations restored from a snapshot
+    start right away and refresh in the background.
+    """
+    limit = config_entry.data.get(CONF_STARTUP_CONCURRENCY) or DEFAULT_STARTUP_CONCURRENCY
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _refresh(subentry_id: str, coordinator: GasBuddyUpdateCoordinator) -> bool:
+        if coordinator.stale:
+            _LOGGER.debug(
+                "Station %s started from its snapshot, refreshing in the background",
+                config_entry.subentries[subentry_id].title,
+            )
+            config_entry.async_create_background_task(
+                hass,
+                _refresh_live(coordinator),
+                f"gasbuddy warm start {subentry_id}",
+            )
+            return True
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                await coordinator.async_config_entry_first_refresh()
+            except ConfigEntryNotReady as ex:
+                _LOGGER.warning(
+                    "Station %s is not ready yet, it will retry on its next update: %s",
+                    config_entry.subentries[subentry_id].title,
+                    ex,
+                )
+                ready = False
+            else:
+                ready = True
+            _LOGGER.debug(
+                "Station %s first refresh %s in %.2fs (%s)",
+                config_entry.subentries[subentry_id].title,
+                "finished" if ready else "failed",
+                time.monotonic() - start,
+                ", ".join(
+                    f"{phase} {elapsed:.2f}s" for phase, elapsed in coordinator.timings.items()
+                )
+                or "no upstream calls",
+            )
+            return ready
+
+    async def _refresh_live(coordinator: GasBuddyUpdateCoordinator) -> None:
+        async with semaphore:
+            await coordinator.async_refresh()
+
+    start = time.monotonic()
+    results = await asyncio.gather(*starmap(_refresh, coordinators.items()))
+    _LOGGER.debug(
+        "First refresh of %d station(s) took %.2fs with %d failure(s)",
+        len(results),
+        time.monotonic() - start,
+        results.count(False),
+    )
+    if results and not any(results):
+        raise ConfigEntryNotReady("None of the GasBuddy stations could be refreshed")
+
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up is called when Home Assistant is loading our component."""
     hass.data.setdefault(DOMAIN, {})
@@ -248,7 +341,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     entity_registry = er.async_get(hass)
     for device_entry in dr.async_entries_for_config_entry(device_registry, config_entry.entry_id):
         subentry_ids = device_entry.config_entries_subentries.get(config_entry.entry_id)
-        if subentry_ids and any(sub_id not in config_entry.subentries for sub_id in subentry_ids):
+        # The hub device belongs to the entry itself (subentry None) and is kept.
+        if subentry_ids and any(
+            sub_id is not None and sub_id not in config_entry.subentries for sub_id in subentry_ids
+        ):
             _LOGGER.debug(
                 "Removing device %s as its subentries %s were removed",
                 device_entry.name,
@@ -268,18 +364,34 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             )
             entity_registry.async_remove(entity_entry.entity_id)
 
-    # Set up coordinators for each station subentry
+    # Set up coordinators for each station subentry. They share one hub
+    # runtime so due price lookups can be batched into area queries.
+    hub = GasBuddyHub(hass, config_entry)
+    await hub.async_load()
     coordinators: dict[str, GasBuddyUpdateCoordinator] = {}
+    regions: dict[str, GasBuddyRegionCoordinator] = {}
     for subentry in config_entry.subentries.values():
+        if subentry.subentry_type == "region":
+            regions[subentry.subentry_id] = GasBuddyRegionCoordinator(
+                hass, config_entry, subentry, hub
+            )
+            device_registry.async_get_or_create(
+                config_entry_id=config_entry.entry_id,
+                config_subentry_id=subentry.subentry_id,
+                identifiers={(DOMAIN, subentry.subentry_id)},
+                name=subentry.title,
+                manufacturer="GasBuddy",
+            )
+            continue
         if subentry.subentry_type != "station":
             continue
         if subentry.unique_id == "hub" or subentry.subentry_id == "hub":
             _LOGGER.warning("Ignoring invalid station subentry: %s", subentry.subentry_id)
             continue
 
-        coordinator = GasBuddyUpdateCoordinator(hass, config_entry, subentry)
-        await coordinator.async_config_entry_first_refresh()
-        coordinators[subentry.subentry_id] = coordinator
+        coordinators[subentry.subentry_id] = GasBuddyUpdateCoordinator(
+            hass, config_entry, subentry, hub=hub
+        )
 
         # Ensure station device exists
         old_entry_id = subentry.data.get("old_entry_id")
@@ -292,8 +404,20 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             manufacturer="GasBuddy",
         )
 
+    # Every station is registered with the batcher before the first refresh,
+    # so the first lookup in an area already covers its neighbours.
+    await _async_first_refresh(hass, config_entry, coordinators)
+    # Regions refresh in the background so they never hold up the hub; a
+    # region that cannot be refreshed yet retries on its own interval.
+    for subentry_id, region in regions.items():
+        config_entry.async_create_background_task(
+            hass, region.async_refresh(), f"gasbuddy region {subentry_id}"
+        )
+
     hass.data[DOMAIN][config_entry.entry_id] = {
         COORDINATOR: CoordinatorsDict(coordinators),
+        REGIONS: regions,
+        HUB: hub,
     }
 
     # Register services
@@ -353,6 +477,34 @@ async def async_migrate_entry(hass, config_entry) -> bool:
         if CONF_BRAND_ADJUSTMENTS not in updated_config:
             updated_config[CONF_BRAND_ADJUSTMENTS] = {}
 
+    # 9 -> 10: Hub-wide request settings and cheapest tracker ranking.
+    # Region subentries are new and need nothing; fill in the defaults the
+    # options flows would otherwise have to assume.
+    if version < 10 and config_entry.unique_id == "hub":
+        for key, default in (
+            (CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY),
+            (CONF_ADAPTIVE_POLLING, False),
+            (CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            (CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+            (CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL),
+            (CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE),
+        ):
+            updated_config.setdefault(key, default)
+        for subentry in config_entry.subentries.values():
+            if subentry.subentry_type != "station" or not subentry.data.get(CONF_CHEAPEST):
+                continue
+            hass.config_entries.async_update_subentry(
+                config_entry,
+                subentry,
+                data={
+                    CONF_TOP_K: DEFAULT_TOP_K,
+                    CONF_RANK_SENSORS: False,
+                    CONF_INDEX_RADIUS: 0,
+                    CONF_DETOUR_PENALTY: DEFAULT_DETOUR_PENALTY,
+                    **subentry.data,
+                },
+            )
+
     # Persist the bumped version even when no data keys changed; otherwise
     # the entry stays on the old version and HA re-runs migration every start.
     if updated_config != config_entry.data or config_entry.version != new_version:
@@ -377,6 +529,8 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
 
     if unload_ok:
         _LOGGER.debug("Successfully removed entities from the %s integration", DOMAIN)
+        if hub := hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {}).get(HUB):
+            await hub.async_unload()
         entry_data = hass.data.get(DOMAIN, {}).pop(config_entry.entry_id, None)
         if entry_data and (services := entry_data.get(SERVICES)):
             services.async_unregister()
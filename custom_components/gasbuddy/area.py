@@ -0,0 +1,67 @@
+"""Hub-level area snapshots shared by cheapest gas trackers."""
+
+from __future__ import annotations
+
+import copy
+import logging
+import time
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from .coalesce import GasBuddyRequestCoalescer
+from .const import AREA_LIMIT, AREA_MAX_AGE, AREA_PRECISION
+from .geocode import normalize_postal_code
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GasBuddyAreaSnapshots:
+    """Share one area price query between cheapest gas trackers at a location.
+
+    Trackers that search the same postal code, or coordinates equal to
+    ``AREA_PRECISION`` decimal places, read the same snapshot of the
+    ``price_lookup_service`` response as long as it is younger than the
+    caller's ``max_age``. Each tracker applies its own fuel, price type and
+    brand filters to its copy. Snapshots older than ``AREA_MAX_AGE`` seconds
+    are never reused.
+    """
+
+    def __init__(self, requests: GasBuddyRequestCoalescer | None = None) -> None:
+        """Initialize."""
+        self.requests = requests if requests is not None else GasBuddyRequestCoalescer()
+        self._snapshots: dict[tuple[Any, ...], tuple[float, dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def async_price_lookup(
+        self,
+        api: GasBuddy,
+        lat: float | None,
+        lon: float | None,
+        zipcode: str | None,
+        max_age: float = AREA_MAX_AGE,
+    ) -> dict[str, Any]:
+        """Return the area's prices, from a fresh enough snapshot if there is one."""
+        if zipcode:
+            key: tuple[Any, ...] = ("zipcode", normalize_postal_code(zipcode))
+        else:
+            key = ("gps", round(lat or 0.0, AREA_PRECISION), round(lon or 0.0, AREA_PRECISION))
+        now = time.monotonic()
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and now - snapshot[0] <= min(max_age, AREA_MAX_AGE):
+            self.hits += 1
+            _LOGGER.debug("Reusing area snapshot from %.0f seconds ago", now - snapshot[0])
+            return copy.copy(snapshot[1])
+
+        self.misses += 1
+        result = await self.requests.async_request(
+            api, "price_lookup_service", lat=lat, lon=lon, zipcode=zipcode, limit=AREA_LIMIT
+        )
+        now = time.monotonic()
+        for stale in [
+            k for k, (fetched_at, _) in self._snapshots.items() if now - fetched_at > AREA_MAX_AGE
+        ]:
+            del self._snapshots[stale]
+        self._snapshots[key] = (now, result)
+        return copy.copy(result)
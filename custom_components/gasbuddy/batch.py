@@ -0,0 +1,234 @@
+"""Hub-level batching of station price lookups for GasBuddy."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from homeassistant.core import HomeAssistant, callback
+
+from .coalesce import GasBuddyRequestCoalescer
+from .const import BATCH_LIMIT, BATCH_MAX_AGE, BATCH_RADIUS_MILES, BATCH_WINDOW
+from .geo import distance_miles
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingLookup:
+    """A station price lookup waiting for the next batch flush."""
+
+    api: GasBuddy
+    lat: float | None
+    lon: float | None
+    future: asyncio.Future = field(repr=False)
+
+
+class GasBuddyPriceBatcher:
+    """Combine due station price lookups into shared area queries.
+
+    Station coordinators hand their lookup to the batcher instead of calling
+    ``price_lookup()`` directly. Lookups that arrive within ``window`` seconds
+    of each other are grouped by location; every group is answered by a single
+    ``price_lookup_service`` area query and each coordinator receives its own
+    station slice. Stations the area query does not return fall back to their
+    own ``price_lookup()``, so results never get worse than the unbatched path.
+    A station due on its own is always looked up directly, since an area query
+    for it could only add a round trip.
+
+    Slices for registered stations that were not due yet are kept for
+    ``max_age`` seconds, so neighbours that come due shortly afterwards are
+    answered without another round trip. An explicit refresh skips them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        window: float = BATCH_WINDOW,
+        max_age: float = BATCH_MAX_AGE,
+        radius: float = BATCH_RADIUS_MILES,
+        requests: GasBuddyRequestCoalescer | None = None,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.requests = requests if requests is not None else GasBuddyRequestCoalescer()
+        self._window = window
+        self._max_age = max_age
+        self._radius = radius
+        self._stations: dict[str, tuple[float, float]] = {}
+        self._pending: dict[str, _PendingLookup] = {}
+        self._slices: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.area_queries = 0
+        self.station_queries = 0
+
+    @callback
+    def async_register(self, station_id: Any, lat: float | None, lon: float | None) -> None:
+        """Register a station location so area queries can cover it."""
+        if lat is None or lon is None:
+            return
+        self._stations[str(station_id).strip()] = (lat, lon)
+
+    async def async_price_lookup(
+        self,
+        api: GasBuddy,
+        station_id: Any,
+        lat: float | None = None,
+        lon: float | None = None,
+        *,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return price data for a station, batching with other due stations.
+
+        With ``refresh`` a cached slice is not used.
+        """
+        key = str(station_id).strip()
+        if not refresh and (cached := self._fresh_slice(key)) is not None:
+            _LOGGER.debug("Serving station %s from a batched area query", key)
+            return cached
+
+        if (pending := self._pending.get(key)) is None:
+            if lat is None or lon is None:
+                lat, lon = self._stations.get(key, (None, None))
+            pending = _PendingLookup(
+                api=api,
+                lat=lat,
+                lon=lon,
+                future=self.hass.loop.create_future(),
+            )
+            self._pending[key] = pending
+            if self._flush_task is None:
+                self._flush_task = self.hass.async_create_background_task(
+                    self._async_flush(), "gasbuddy price batch"
+                )
+
+        return dict(await asyncio.shield(pending.future))
+
+    def _fresh_slice(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of a cached slice if it is still fresh."""
+        if (entry := self._slices.get(key)) is None:
+            return None
+        fetched_at, data = entry
+        if time.monotonic() - fetched_at > self._max_age:
+            self._slices.pop(key, None)
+            return None
+        return dict(data)
+
+    def _prune_slices(self, now: float) -> None:
+        """Drop cached slices older than ``max_age``."""
+        for key in [
+            k for k, (fetched_at, _) in self._slices.items() if now - fetched_at > self._max_age
+        ]:
+            del self._slices[key]
+
+    async def _async_flush(self) -> None:
+        """Wait for the batching window, then dispatch every pending lookup."""
+        # Always yield, so an eagerly started flush still lets the caller
+        # record the task before the pending lookups are swapped out.
+        await asyncio.sleep(self._window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        groups, singles = self._plan(pending)
+        _LOGGER.debug(
+            "Dispatching %d due station(s) as %d area query(ies) and %d single lookup(s)",
+            len(pending),
+            len(groups),
+            len(singles),
+        )
+        await asyncio.gather(
+            *(self._async_area_lookup(members, pending) for members in groups),
+            *(self._async_single_lookup(key, pending[key]) for key in singles),
+        )
+
+    def _plan(self, pending: dict[str, _PendingLookup]) -> tuple[list[list[str]], list[str]]:
+        """Group pending stations into area queries by proximity."""
+        groups: list[list[str]] = []
+        singles: list[str] = []
+        assigned: set[str] = set()
+
+        for key, lookup in pending.items():
+            if key in assigned:
+                continue
+            if lookup.lat is None or lookup.lon is None:
+                singles.append(key)
+                continue
+            members = [
+                other
+                for other, other_lookup in pending.items()
+                if other not in assigned
+                and other_lookup.lat is not None
+                and other_lookup.lon is not None
+                and distance_miles(lookup.lat, lookup.lon, other_lookup.lat, other_lookup.lon)
+                <= self._radius
+            ]
+            assigned.update(members)
+            # A lone due station is cheaper (and richer) as a direct station
+            # lookup: if the area query missed it, it would cost two calls.
+            if len(members) > 1:
+                groups.append(members)
+            else:
+                singles.extend(members)
+
+        return groups, singles
+
+    async def _async_area_lookup(
+        self, members: list[str], pending: dict[str, _PendingLookup]
+    ) -> None:
+        """Answer a group of stations with one area query."""
+        lats = [pending[key].lat for key in members if pending[key].lat is not None]
+        lons = [pending[key].lon for key in members if pending[key].lon is not None]
+        lat = sum(lats) / len(lats)
+        lon = sum(lons) / len(lons)
+        api = pending[members[0]].api
+        self.area_queries += 1
+        try:
+            result = await self.requests.async_request(
+                api, "price_lookup_service", lat=lat, lon=lon, limit=BATCH_LIMIT
+            )
+        except Exception as ex:  # noqa: BLE001
+            _LOGGER.debug("Batched area query failed, falling back to station lookups: %s", ex)
+            result = {}
+
+        now = time.monotonic()
+        self._prune_slices(now)
+        found: dict[str, dict[str, Any]] = {}
+        for station in (result or {}).get("results") or []:
+            if station.get("station_id") is None:
+                continue
+            key = str(station["station_id"]).strip()
+            # Distance is relative to the query point, not to any station.
+            data = {k: v for k, v in station.items() if k != "distance"}
+            found[key] = data
+            # Only registered stations that were not due can use a slice later.
+            if key in self._stations and key not in pending:
+                self._slices[key] = (now, data)
+
+        missing = []
+        for key in members:
+            if key in found:
+                pending[key].future.set_result(found[key])
+            else:
+                missing.append(key)
+
+        if missing:
+            _LOGGER.debug(
+                "Area query did not cover %d station(s); looking them up directly", len(missing)
+            )
+            await asyncio.gather(*(self._async_single_lookup(key, pending[key]) for key in missing))
+
+    async def _async_single_lookup(self, key: str, lookup: _PendingLookup) -> None:
+        """Fall back to a direct station lookup."""
+        self.station_queries += 1
+        try:
+            result = await self.requests.async_request(lookup.api, "price_lookup", key)
+        except Exception as ex:  # noqa: BLE001
+            lookup.future.set_exception(ex)
+        else:
+            lookup.future.set_result(result)
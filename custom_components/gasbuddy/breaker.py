@@ -0,0 +1,168 @@
+"""Hub-wide circuit breaker for Cloudflare/CSRF-blocked periods."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any
+
+from py_gasbuddy import CSRF_TIMEOUT, ERROR_TIMEOUT, GasBuddy
+from py_gasbuddy.exceptions import CloudflareBlocked, CSRFTokenMissing, LibraryError
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import BREAKER_BASE_DELAY, BREAKER_JITTER, BREAKER_MAX_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(HomeAssistantError):
+    """Error to indicate requests are paused while GasBuddy is blocking them."""
+
+    def __init__(self, retry_in: float) -> None:
+        """Initialize."""
+        super().__init__(f"GasBuddy is blocking requests; retrying in {retry_in:.0f} seconds")
+        self.retry_in = retry_in
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Return True if a failed request timed out.
+
+    py_gasbuddy reports its own timeouts as a ``LibraryError`` carrying the
+    timeout message rather than raising ``TimeoutError``.
+    """
+    return isinstance(error, TimeoutError) or (
+        isinstance(error, LibraryError) and str(error) in {ERROR_TIMEOUT, CSRF_TIMEOUT}
+    )
+
+
+def is_blocked(error: BaseException) -> bool:
+    """Return True if a failed request hit the CSRF/Cloudflare block."""
+    return isinstance(error, (CloudflareBlocked, CSRFTokenMissing))
+
+
+def classify_error(api: GasBuddy, error: Exception) -> Exception:
+    """Return ``error``, or a ``CloudflareBlocked`` if the client saw a block.
+
+    py_gasbuddy reports 401/403 challenges and non-JSON interstitials as a
+    plain ``LibraryError`` and only leaves the block in the client's
+    ``_cf_last`` sentinel. Pooled clients are shared, so this must be called
+    as soon as the request fails, before another request can reset it. The
+    sentinel is also cleared on a plain timeout, which is not a block.
+    """
+    if (
+        type(error) is LibraryError
+        and getattr(api, "_cf_last", None) is False
+        and not is_timeout(error)
+    ):
+        return CloudflareBlocked(*error.args)
+    return error
+
+
+class GasBuddyCircuitBreaker:
+    """Stop sending requests while GasBuddy blocks them.
+
+    The breaker opens when a request fails with a block signature. While
+    open no request is sent until the backoff delay has passed; then a
+    single probe request is let through (half-open). A probe that gets an
+    answer closes the breaker, and a blocked probe reopens it with the
+    delay doubled, up to ``max_delay``. A probe that fails for another
+    reason, such as a timeout, proves nothing either way: the breaker stays
+    open and waits the same delay again. Delays are spread by ``jitter`` so
+    several hubs or restarts do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        *,
+        base: float = BREAKER_BASE_DELAY,
+        max_delay: float = BREAKER_MAX_DELAY,
+        jitter: float = BREAKER_JITTER,
+    ) -> None:
+        """Initialize."""
+        self._base = base
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._retry_at = 0.0
+        self._probing = False
+        # Consecutive blocked requests; zero while the breaker is closed.
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Return ``closed``, ``open`` or ``half_open``."""
+        if not self.failures:
+            return "closed"
+        return "half_open" if self._probing or self.retry_in == 0 else "open"
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe may be sent."""
+        return max(self._retry_at - time.monotonic(), 0.0)
+
+    @property
+    def allows_requests(self) -> bool:
+        """Return True if a request would be sent now."""
+        return not self.failures or (not self._probing and self.retry_in == 0)
+
+    @callback
+    def acquire(self) -> None:
+        """Claim permission to send a request, or raise CircuitOpenError."""
+        if not self.failures:
+            return
+        if not self.allows_requests:
+            self.rejected += 1
+            raise CircuitOpenError(self.retry_in)
+        _LOGGER.debug("Probing GasBuddy after %d blocked request(s)", self.failures)
+        self._probing = True
+
+    @callback
+    def release(self) -> None:
+        """Give up a claimed request without an outcome (it was cancelled)."""
+        self._probing = False
+
+    @callback
+    def record(self, error: BaseException | None = None) -> None:
+        """Record the outcome of a request sent after ``acquire``."""
+        self._probing = False
+        if error is None:
+            if self.failures:
+                _LOGGER.info("GasBuddy is answering requests again")
+            self.failures = 0
+            return
+        if not is_blocked(error):
+            if self.failures:
+                delay = self._schedule()
+                _LOGGER.debug("Probe failed (%s); retrying in %.0f seconds", error, delay)
+            return
+
+        self.failures += 1
+        if self.failures == 1:
+            self.opened += 1
+        delay = self._schedule()
+        _LOGGER.warning(
+            "GasBuddy is blocking requests (%d in a row); pausing requests for %.0f seconds",
+            self.failures,
+            delay,
+        )
+
+    def _schedule(self) -> float:
+        """Set the next probe time from the failure count and return the delay."""
+        delay = min(self._base * 2 ** (self.failures - 1), self._max_delay)
+        delay *= random.uniform(1 - self._jitter, 1 + self._jitter)
+        self._retry_at = time.monotonic() + delay
+        return delay
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker status for diagnostics."""
+        return {
+            "status": self.state,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in, 1),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
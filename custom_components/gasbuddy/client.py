@@ -0,0 +1,74 @@
+"""Pooled GasBuddy API clients."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import logging
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import CACHE_FILE_NAME, CLIENT_POOL_SIZE, DEFAULT_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GasBuddyClientPool:
+    """Keep long-lived GasBuddy clients for reuse across the hub.
+
+    A client holds its CSRF token and Cloudflare state in memory once it has
+    made a request, so reusing it skips token negotiation; the token cache
+    file under ``.storage`` is only used to persist the token between
+    restarts. ``price_lookup()`` queries the station a client was created
+    for, so clients are kept per solver URL and station ID; area searches
+    and other requests use the client without a station. Every client uses
+    the hub's ``timeout``, and the least recently used one is dropped once
+    ``size`` clients exist.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        size: int = CLIENT_POOL_SIZE,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._size = size
+        self._timeout = timeout
+        self._clients: OrderedDict[tuple[str | None, str | None], GasBuddy] = OrderedDict()
+
+    @callback
+    def async_get(self, solver: str | None = None, station_id: Any = None) -> GasBuddy:
+        """Return the pooled client for a solver URL and station, creating it if needed."""
+        key = (solver or None, None if station_id is None else str(station_id).strip())
+        if (client := self._clients.get(key)) is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = async_create_client(self.hass, key[0], self._timeout, station_id)
+        self._clients[key] = client
+        if len(self._clients) > self._size:
+            self._clients.popitem(last=False)
+        _LOGGER.debug("Created pooled GasBuddy client (%d pooled)", len(self._clients))
+        return client
+
+
+@callback
+def async_create_client(
+    hass: HomeAssistant,
+    solver: str | None = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    station_id: Any = None,
+) -> GasBuddy:
+    """Return a new GasBuddy client using Home Assistant's shared session."""
+    return GasBuddy(
+        station_id=station_id,
+        solver_url=solver,
+        cache_file=f"{hass.config.config_dir}/{CACHE_FILE_NAME}",
+        timeout=timeout,
+        session=async_get_clientsession(hass),
+    )
@@ -0,0 +1,107 @@
+"""Single-flight coalescing of identical GasBuddy requests."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from .breaker import GasBuddyCircuitBreaker, classify_error
+from .geocode import GasBuddyGeocodeCache
+from .metrics import GasBuddyCallCounter, GasBuddyRequestMetrics
+from .spatial import GasBuddyStationIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GasBuddyRequestCoalescer:
+    """Share one in-flight GasBuddy request between identical callers.
+
+    Requests are keyed by operation, the client's solver URL, subject (the
+    station ID the client was created for, for ``price_lookup``) and keyword
+    arguments, so requests through different solvers are never shared. A
+    caller that asks for a request already in flight waits for that request
+    instead of sending its own; every caller receives its own shallow copy
+    of the result, or the same exception. A failure the client flagged as a
+    Cloudflare block is raised as ``CloudflareBlocked``. Only requests that
+    actually go upstream are recorded in ``calls`` and ``metrics``, and
+    their results are passed to ``geocodes`` to learn postal code locations
+    and to ``stations`` to index them. Requests are only sent while
+    ``breaker`` allows them; otherwise ``CircuitOpenError`` is raised.
+    """
+
+    def __init__(
+        self,
+        calls: GasBuddyCallCounter | None = None,
+        geocodes: GasBuddyGeocodeCache | None = None,
+        breaker: GasBuddyCircuitBreaker | None = None,
+        metrics: GasBuddyRequestMetrics | None = None,
+        stations: GasBuddyStationIndex | None = None,
+    ) -> None:
+        """Initialize."""
+        self.calls = calls if calls is not None else GasBuddyCallCounter()
+        self.metrics = metrics if metrics is not None else GasBuddyRequestMetrics()
+        self.breaker = breaker if breaker is not None else GasBuddyCircuitBreaker()
+        self.geocodes = geocodes
+        self.stations = stations
+        self._inflight: dict[tuple[Any, ...], asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def async_request(
+        self, api: GasBuddy, operation: str, subject: Any = None, **kwargs: Any
+    ) -> Any:
+        """Call ``operation`` on the client, joining an identical request in flight."""
+        key = (
+            operation,
+            getattr(api, "_solver", None) or None,
+            subject,
+            tuple(sorted(kwargs.items())),
+        )
+        if (future := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            _LOGGER.debug("Joining in-flight %s request", operation)
+            try:
+                return copy.copy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task is not None and task.cancelling()):
+                    raise
+            # The caller we joined was cancelled, so send the request ourselves.
+            return await self.async_request(api, operation, subject, **kwargs)
+
+        self.breaker.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.calls.record()
+        start = time.monotonic()
+        try:
+            result = await getattr(api, operation)(**kwargs)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            future.cancel()
+            raise
+        except Exception as ex:
+            error = classify_error(api, ex)
+            self.metrics.record(operation, api, time.monotonic() - start, error=error)
+            self.breaker.record(error)
+            future.set_exception(error)
+            # Mark the exception retrieved in case nobody joined.
+            future.exception()
+            if error is ex:
+                raise
+            raise error from ex
+        else:
+            self.metrics.record(operation, api, time.monotonic() - start)
+            self.breaker.record()
+            future.set_result(result)
+            if self.geocodes is not None:
+                self.geocodes.async_observe(result, kwargs.get("zipcode"))
+            if self.stations is not None:
+                self.stations.async_observe(result)
+            return copy.copy(result)
+        finally:
+            del self._inflight[key]
@@ -21,8 +21,9 @@ from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
+    EntitySelector,
+    EntitySelectorConfig,
     ObjectSelector,
     SelectOptionDict,
     SelectSelector,
@@ -30,40 +31,64 @@ from homeassistant.helpers.selector import (
     SelectSelectorMode,
 )
 
+from .breaker import CircuitOpenError
 from .const import (
-    CACHE_FILE_NAME,
+    CONF_ADAPTIVE_POLLING,
     CONF_BRAND_ADJUSTMENTS,
     CONF_CHEAPEST,
+    CONF_DETOUR_PENALTY,
     CONF_EV_CHARGING,
     CONF_EXCLUDE_BRANDS,
     CONF_EXCLUDE_STATIONS,
     CONF_FETCH_GAS,
     CONF_FUEL_KEY,
+    CONF_FUELS,
     CONF_GPS,
     CONF_INCLUDE_BRANDS,
     CONF_INCLUDE_STATIONS,
+    CONF_INDEX_RADIUS,
     CONF_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
     CONF_NAME,
+    CONF_POLYGON,
     CONF_POSTAL,
     CONF_PRICE_TYPE,
+    CONF_RADIUS,
+    CONF_RANK_SENSORS,
+    CONF_REQUEST_BUDGET,
+    CONF_RESPONSE_CACHE_SIZE,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_ROUTE,
+    CONF_ROUTE_ENTITY,
     CONF_SHOW_DISCOUNTED,
     CONF_SOLVER,
+    CONF_STARTUP_CONCURRENCY,
     CONF_STATION_ID,
     CONF_TIMEOUT,
+    CONF_TOP_K,
     CONF_UOM,
     CONFIG_VER,
+    DEFAULT_DETOUR_PENALTY,
+    DEFAULT_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_NAME,
+    DEFAULT_REGION_RADIUS,
+    DEFAULT_REQUEST_BUDGET,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_STARTUP_CONCURRENCY,
     DEFAULT_TIMEOUT,
+    DEFAULT_TOP_K,
     DOMAIN,
     FUEL_KEY_CHOICES,
+    MAX_INDEX_RADIUS,
+    MAX_TOP_K,
     PRICE_TYPE_CHOICES,
 )
-
-
-def _cache_path(hass: HomeAssistant) -> str:
-    """Return the shared CSRF-token cache file path."""
-    return f"{hass.config.config_dir}/{CACHE_FILE_NAME}"
-
+from .coordinator import LazyRedact
+from .hub import async_get_client, async_get_coalescer, async_get_geocodes
 
 _LOGGER = logging.getLogger(__name__)
 _STATION_ID_RE = re.compile(r"^\d{1,20}$")
@@ -142,14 +167,10 @@ async def validate_station(
         raise InvalidStation("Station ID cannot be 'hub'")
 
     price_error = None
-    gb = py_gasbuddy.GasBuddy(
-        solver_url=solver,
-        station_id=station,
-        cache_file=_cache_path(hass),
-        session=async_get_clientsession(hass),
-    )
+    gb = async_get_client(hass, solver, station_id=station)
+    requests = async_get_coalescer(hass)
     try:
-        check = await gb.price_lookup()
+        check = await requests.async_request(gb, "price_lookup", station)
         if "errors" not in check:
             gas_lat = check.get("latitude")
             gas_lon = check.get("longitude")
@@ -164,9 +185,10 @@ async def validate_station(
                 CONF_LATITUDE: gas_lat,
                 CONF_LONGITUDE: gas_lon,
             }
-    except CSRFTokenMissing as ex:
+    except (CSRFTokenMissing, CircuitOpenError) as ex:
         # Forward-compat: a future py_gasbuddy release may propagate
-        # this exception instead of swallowing it.
+        # this exception instead of swallowing it. The hub circuit
+        # breaker raises CircuitOpenError while the block lasts.
         raise CloudflareBlocked from ex
     except (APIError, LibraryError) as ex:
         # The EV path below would hit the same wall, so surface a
@@ -179,14 +201,12 @@ async def validate_station(
         price_error = ex
 
     try:
-        ev_gb = py_gasbuddy.GasBuddy(
-            solver_url=solver,
-            cache_file=_cache_path(hass),
-            session=async_get_clientsession(hass),
-        )
+        ev_gb = async_get_client(hass, solver=solver)
         val_lat = lat if lat is not None else hass.config.latitude
         val_lon = lon if lon is not None else hass.config.longitude
-        ev_res = await ev_gb.ev_stations_nearby(
+        ev_res = await requests.async_request(
+            ev_gb,
+            "ev_stations_nearby",
             lat=val_lat,
             lon=val_lon,
             radius=100,
@@ -239,13 +259,16 @@ async def _get_station_list(  # noqa: PLR0914
         solver = user_input[CONF_SOLVER]
         _LOGGER.debug("Solver URL configured: %s", bool(solver))
 
+    requests = async_get_coalescer(hass)
     try:
-        stations = await py_gasbuddy.GasBuddy(
-            solver_url=solver,
-            cache_file=_cache_path(hass),
-            session=async_get_clientsession(hass),
-        ).location_search(lat=lat, lon=lon, zipcode=postal)
-    except MissingSearchData as ex:
+        stations = await requests.async_request(
+            async_get_client(hass, solver=solver),
+            "location_search",
+            lat=lat,
+            lon=lon,
+            zipcode=postal,
+        )
+    except (MissingSearchData, CircuitOpenError) as ex:
         _LOGGER.warning("Error searching for stations: %s", ex)
         raise SearchFailed from ex
 
@@ -264,13 +287,20 @@ async def _get_station_list(  # noqa: PLR0914
     search_lat = lat
     search_lon = lon
 
-    if search_lat is None and postal is not None:
+    if (
+        search_lat is None
+        and postal is not None
+        and (geocodes := async_get_geocodes(hass)) is not None
+        and (location := geocodes.get(postal)) is not None
+    ):
+        search_lat, search_lon = location
+    elif search_lat is None and postal is not None:
         try:
-            res = await py_gasbuddy.GasBuddy(
-                solver_url=solver,
-                cache_file=_cache_path(hass),
-                session=async_get_clientsession(hass),
-            ).price_lookup_service(zipcode=postal)
+            res = await requests.async_request(
+                async_get_client(hass, solver=solver),
+                "price_lookup_service",
+                zipcode=postal,
+            )
             if res.get("results"):
                 search_lat = res["results"][0].get("latitude")
                 search_lon = res["results"][0].get("longitude")
@@ -281,12 +311,10 @@ async def _get_station_list(  # noqa: PLR0914
 
     if search_lat is not None and search_lon is not None:
         try:
-            ev_gb = py_gasbuddy.GasBuddy(
-                solver_url=solver,
-                cache_file=_cache_path(hass),
-                session=async_get_clientsession(hass),
-            )
-            ev_res = await ev_gb.ev_stations_nearby(
+            ev_gb = async_get_client(hass, solver=solver)
+            ev_res = await requests.async_request(
+                ev_gb,
+                "ev_stations_nearby",
                 lat=search_lat,
                 lon=search_lon,
                 radius=10,
@@ -313,7 +341,7 @@ async def _get_station_list(  # noqa: PLR0914
     if len(stations_list) == 0:
         stations_list["not_found"] = "No stations in search area."
 
-    _LOGGER.debug("stations_list: %s", stations_list)
+    _LOGGER.debug("stations_list: %s", LazyRedact(stations_list))
     return stations_list
 
 
@@ -330,15 +358,12 @@ async def _get_nearby_brands_and_stations(
         lat = hass.config.latitude
         lon = hass.config.longitude
 
-    gb = py_gasbuddy.GasBuddy(
-        solver_url=solver,
-        cache_file=_cache_path(hass),
-        timeout=timeout,
-        session=async_get_clientsession(hass),
-    )
+    gb = async_get_client(hass, solver=solver, timeout=timeout)
     try:
-        result = await gb.price_lookup_service(lat=lat, lon=lon, zipcode=postal, limit=20)
-    except CSRFTokenMissing as ex:
+        result = await async_get_coalescer(hass).async_request(
+            gb, "price_lookup_service", lat=lat, lon=lon, zipcode=postal, limit=20
+        )
+    except (CSRFTokenMissing, CircuitOpenError) as ex:
         raise CloudflareBlocked from ex
     except (APIError, LibraryError) as ex:
         if _csrf_blocked_via_state(gb):
@@ -459,6 +484,21 @@ def _get_schema_cheapest(  # pylint: disable-next=unused-argument
                 mode=SelectSelectorMode.DROPDOWN,
             )
         ),
+        vol.Optional(CONF_TOP_K, default=_get_default(CONF_TOP_K, DEFAULT_TOP_K)): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_TOP_K)
+        ),
+        vol.Optional(CONF_RANK_SENSORS, default=_get_default(CONF_RANK_SENSORS, False)): cv.boolean,
+        vol.Optional(CONF_INDEX_RADIUS, default=_get_default(CONF_INDEX_RADIUS, 0)): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=MAX_INDEX_RADIUS)
+        ),
+        vol.Optional(CONF_ROUTE, default=_get_default(CONF_ROUTE, [])): ObjectSelector(),
+        vol.Optional(
+            CONF_ROUTE_ENTITY,
+            description={"suggested_value": _get_default(CONF_ROUTE_ENTITY)},
+        ): EntitySelector(EntitySelectorConfig(domain=["device_tracker", "person"])),
+        vol.Optional(
+            CONF_DETOUR_PENALTY, default=_get_default(CONF_DETOUR_PENALTY, DEFAULT_DETOUR_PENALTY)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0)),
     })
 
 
@@ -545,6 +585,81 @@ def _get_schema_options(  # pylint: disable-next=unused-argument
     })
 
 
+def _get_schema_region(
+    hass: HomeAssistant, user_input: dict[str, Any] | None, default_dict: dict[str, Any]
+) -> Any:
+    """Get a schema for a region."""
+    if user_input is None:
+        user_input = {}
+
+    def _get_default(key: str, fallback_default: Any = None) -> Any | None:
+        """Get default value for key."""
+        return user_input.get(key, default_dict.get(key, fallback_default))
+
+    return vol.Schema({
+        vol.Required(CONF_NAME, default=_get_default(CONF_NAME, "Region")): vol.All(
+            cv.string, vol.Strip, vol.Length(max=100)
+        ),
+        vol.Required(
+            CONF_LATITUDE, default=_get_default(CONF_LATITUDE, hass.config.latitude)
+        ): cv.latitude,
+        vol.Required(
+            CONF_LONGITUDE, default=_get_default(CONF_LONGITUDE, hass.config.longitude)
+        ): cv.longitude,
+        vol.Required(
+            CONF_RADIUS, default=_get_default(CONF_RADIUS, DEFAULT_REGION_RADIUS)
+        ): vol.All(vol.Coerce(float), vol.Range(min=1, max=100)),
+        vol.Optional(CONF_POLYGON, default=_get_default(CONF_POLYGON, [])): ObjectSelector(),
+        vol.Required(CONF_FUELS, default=_get_default(CONF_FUELS, ["regular_gas"])): SelectSelector(
+            SelectSelectorConfig(
+                options=[SelectOptionDict(value=k, label=v) for k, v in FUEL_KEY_CHOICES.items()],
+                multiple=True,
+                mode=SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Required(CONF_INTERVAL, default=_get_default(CONF_INTERVAL, DEFAULT_INTERVAL)): vol.All(
+            vol.Coerce(int), vol.Range(min=300)
+        ),
+        vol.Required(
+            CONF_REQUEST_BUDGET, default=_get_default(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET)
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+    })
+
+
+def _validate_polygon(polygon: Any, minimum: int = 3) -> list[list[float]] | None:
+    """Return a polygon, or a route, as ``[lat, lon]`` pairs, or None if it is not one."""
+    if not polygon:
+        return []
+    if not isinstance(polygon, list) or len(polygon) < minimum:
+        return None
+    vertices = []
+    for vertex in polygon:
+        if not (
+            isinstance(vertex, list | tuple)
+            and len(vertex) == 2
+            and all(isinstance(value, int | float) for value in vertex)
+        ):
+            return None
+        lat, lon = float(vertex[0]), float(vertex[1])
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return None
+        vertices.append([lat, lon])
+    return vertices
+
+
+def _route_settings(user_input: dict[str, Any]) -> dict[str, Any] | None:
+    """Return a cheapest tracker's route settings, or None if the route is invalid."""
+    if (route := _validate_polygon(user_input.get(CONF_ROUTE), minimum=2)) is None:
+        return None
+    settings: dict[str, Any] = {
+        CONF_ROUTE: route,
+        CONF_DETOUR_PENALTY: user_input.get(CONF_DETOUR_PENALTY, DEFAULT_DETOUR_PENALTY),
+    }
+    if route_entity := user_input.get(CONF_ROUTE_ENTITY):
+        settings[CONF_ROUTE_ENTITY] = route_entity
+    return settings
+
+
 # ── Main Config Flow (Hub only) ────────────────────────────────────────────
 
 
@@ -617,7 +732,7 @@ class GasBuddyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         cls, config_entry: ConfigEntry
     ) -> dict[str, type[ConfigSubentryFlow]]:
         """Return subentries supported by this integration."""
-        return {"station": GasBuddySubentryFlowHandler}
+        return {"station": GasBuddySubentryFlowHandler, "region": GasBuddyRegionFlowHandler}
 
     @staticmethod
     @callback
@@ -911,7 +1026,14 @@ class GasBuddySubentryFlowHandler(ConfigSubentryFlow):
                 CONF_CHEAPEST: True,
                 CONF_FUEL_KEY: user_input[CONF_FUEL_KEY],
                 CONF_PRICE_TYPE: user_input[CONF_PRICE_TYPE],
+                CONF_TOP_K: user_input.get(CONF_TOP_K, DEFAULT_TOP_K),
+                CONF_RANK_SENSORS: user_input.get(CONF_RANK_SENSORS, False),
+                CONF_INDEX_RADIUS: user_input.get(CONF_INDEX_RADIUS, 0),
             }
+            if (route := _route_settings(user_input)) is None:
+                self._errors[CONF_ROUTE] = "invalid_route"
+                return await self._show_config_cheapest(user_input)
+            data.update(route)
             postal = (user_input.get(CONF_POSTAL) or "").strip()
             if postal:
                 if not _POSTAL_RE.match(postal):
@@ -935,6 +1057,11 @@ class GasBuddySubentryFlowHandler(ConfigSubentryFlow):
                 CONF_CHEAPEST: True,
                 CONF_FUEL_KEY: self._data[CONF_FUEL_KEY],
                 CONF_PRICE_TYPE: self._data[CONF_PRICE_TYPE],
+                CONF_TOP_K: self._data[CONF_TOP_K],
+                CONF_RANK_SENSORS: self._data[CONF_RANK_SENSORS],
+                CONF_INDEX_RADIUS: self._data[CONF_INDEX_RADIUS],
+                CONF_ROUTE: self._data[CONF_ROUTE],
+                CONF_DETOUR_PENALTY: self._data[CONF_DETOUR_PENALTY],
                 CONF_EXCLUDE_BRANDS: user_input.get(CONF_EXCLUDE_BRANDS, []),
                 CONF_INCLUDE_BRANDS: user_input.get(CONF_INCLUDE_BRANDS, []),
                 CONF_EXCLUDE_STATIONS: user_input.get(CONF_EXCLUDE_STATIONS, []),
@@ -947,6 +1074,8 @@ class GasBuddySubentryFlowHandler(ConfigSubentryFlow):
             }
             if CONF_POSTAL in self._data:
                 subentry_data[CONF_POSTAL] = self._data[CONF_POSTAL]
+            if CONF_ROUTE_ENTITY in self._data:
+                subentry_data[CONF_ROUTE_ENTITY] = self._data[CONF_ROUTE_ENTITY]
 
             return self.async_create_entry(
                 title=subentry_data[CONF_NAME],
@@ -999,7 +1128,15 @@ class GasBuddySubentryFlowHandler(ConfigSubentryFlow):
                 CONF_NAME: user_input[CONF_NAME],
                 CONF_FUEL_KEY: user_input[CONF_FUEL_KEY],
                 CONF_PRICE_TYPE: user_input[CONF_PRICE_TYPE],
+                CONF_TOP_K: user_input.get(CONF_TOP_K, DEFAULT_TOP_K),
+                CONF_RANK_SENSORS: user_input.get(CONF_RANK_SENSORS, False),
+                CONF_INDEX_RADIUS: user_input.get(CONF_INDEX_RADIUS, 0),
             }
+            if (route := _route_settings(user_input)) is None:
+                self._errors[CONF_ROUTE] = "invalid_route"
+                return await self._show_reconfig_cheapest_form(user_input)
+            new_data.pop(CONF_ROUTE_ENTITY, None)
+            new_data.update(route)
             postal = (user_input.get(CONF_POSTAL) or "").strip()
             if postal:
                 if not _POSTAL_RE.match(postal):
@@ -1133,6 +1270,52 @@ class GasBuddySubentryFlowHandler(ConfigSubentryFlow):
         )
 
 
+# ── Region Subentry Flow ────────────────────────────────────────────────────
+
+
+class GasBuddyRegionFlowHandler(ConfigSubentryFlow):
+    """Flow for managing GasBuddy region subentries."""
+
+    async def async_step_user(self, user_input: dict[str, Any] | None = None) -> SubentryFlowResult:
+        """Handle adding a region."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if (polygon := _validate_polygon(user_input.get(CONF_POLYGON))) is None:
+                errors[CONF_POLYGON] = "invalid_polygon"
+            else:
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data={**user_input, CONF_POLYGON: polygon},
+                )
+        return self.async_show_form(
+            step_id="user",
+            data_schema=_get_schema_region(self.hass, user_input, {}),
+            errors=errors,
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> SubentryFlowResult:
+        """Handle reconfiguration of a region."""
+        subentry = self._get_reconfigure_subentry()
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if (polygon := _validate_polygon(user_input.get(CONF_POLYGON))) is None:
+                errors[CONF_POLYGON] = "invalid_polygon"
+            else:
+                return self.async_update_and_abort(
+                    self._get_entry(),
+                    subentry,
+                    data={**subentry.data, **user_input, CONF_POLYGON: polygon},
+                    title=user_input[CONF_NAME],
+                )
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=_get_schema_region(self.hass, user_input, dict(subentry.data)),
+            errors=errors,
+        )
+
+
 # ── Options Flow (Hub settings) ────────────────────────────────────────────
 
 
@@ -1158,6 +1341,22 @@ class GasBuddyOptionsFlow(config_entries.OptionsFlow):
                 CONF_SOLVER: self.config_entry.data.get(CONF_SOLVER, ""),
                 CONF_TIMEOUT: self.config_entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
                 CONF_BRAND_ADJUSTMENTS: self.config_entry.data.get(CONF_BRAND_ADJUSTMENTS, {}),
+                CONF_STARTUP_CONCURRENCY: self.config_entry.data.get(
+                    CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY
+                ),
+                CONF_ADAPTIVE_POLLING: self.config_entry.data.get(CONF_ADAPTIVE_POLLING, False),
+                CONF_MIN_INTERVAL: self.config_entry.data.get(
+                    CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL
+                ),
+                CONF_MAX_INTERVAL: self.config_entry.data.get(
+                    CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL
+                ),
+                CONF_RESPONSE_CACHE_TTL: self.config_entry.data.get(
+                    CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL
+                ),
+                CONF_RESPONSE_CACHE_SIZE: self.config_entry.data.get(
+                    CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE
+                ),
             }
         self._errors = {}
         if user_input is not None:
@@ -1165,10 +1364,18 @@ class GasBuddyOptionsFlow(config_entries.OptionsFlow):
             user_input.setdefault(CONF_SOLVER, "")
             user_input.setdefault(CONF_TIMEOUT, DEFAULT_TIMEOUT)
             user_input.setdefault(CONF_BRAND_ADJUSTMENTS, {})
+            user_input.setdefault(CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY)
+            user_input.setdefault(CONF_ADAPTIVE_POLLING, False)
+            user_input.setdefault(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+            user_input.setdefault(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+            user_input.setdefault(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL)
+            user_input.setdefault(CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE)
             if user_input.get(CONF_SOLVER):
                 url_valid = validate_url(user_input[CONF_SOLVER])
                 if not url_valid:
                     self._errors[CONF_SOLVER] = "invalid_url"
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                self._errors[CONF_MAX_INTERVAL] = "invalid_interval_bounds"
 
             if not self._errors:
                 self._data.update(user_input)
@@ -1196,6 +1403,24 @@ class GasBuddyOptionsFlow(config_entries.OptionsFlow):
             vol.Optional(
                 CONF_BRAND_ADJUSTMENTS, default=self._data[CONF_BRAND_ADJUSTMENTS]
             ): ObjectSelector(),
+            vol.Optional(
+                CONF_STARTUP_CONCURRENCY, default=self._data[CONF_STARTUP_CONCURRENCY]
+            ): vol.All(cv.positive_int, vol.Range(min=1, max=20)),
+            vol.Optional(
+                CONF_ADAPTIVE_POLLING, default=self._data[CONF_ADAPTIVE_POLLING]
+            ): cv.boolean,
+            vol.Optional(CONF_MIN_INTERVAL, default=self._data[CONF_MIN_INTERVAL]): vol.All(
+                cv.positive_int, vol.Range(min=300, max=86400)
+            ),
+            vol.Optional(CONF_MAX_INTERVAL, default=self._data[CONF_MAX_INTERVAL]): vol.All(
+                cv.positive_int, vol.Range(min=300, max=86400)
+            ),
+            vol.Optional(
+                CONF_RESPONSE_CACHE_TTL, default=self._data[CONF_RESPONSE_CACHE_TTL]
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+            vol.Optional(
+                CONF_RESPONSE_CACHE_SIZE, default=self._data[CONF_RESPONSE_CACHE_SIZE]
+            ): vol.All(cv.positive_int, vol.Range(min=1, max=10000)),
         })
 
         return self.async_show_form(
@@ -5,8 +5,9 @@ from __future__ import annotations
 from typing import Final
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
 
-from .entity import GasBuddySensorEntityDescription
+from .entity import GasBuddyHubSensorEntityDescription, GasBuddySensorEntityDescription
 
 # config flow
 CONF_STATION_ID = "station_id"
@@ -28,16 +29,137 @@ CONF_EXCLUDE_STATIONS = "exclude_stations"
 CONF_INCLUDE_STATIONS = "include_stations"
 CONF_BRAND_ADJUSTMENTS = "brand_adjustments"
 CONF_SHOW_DISCOUNTED = "show_discounted"
+CONF_STARTUP_CONCURRENCY = "startup_concurrency"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_RESPONSE_CACHE_TTL = "response_cache_ttl"
+CONF_RESPONSE_CACHE_SIZE = "response_cache_size"
+CONF_TOP_K = "top_k"
+CONF_RANK_SENSORS = "rank_sensors"
+CONF_RADIUS = "radius"
+CONF_POLYGON = "polygon"
+CONF_FUELS = "fuels"
+CONF_REQUEST_BUDGET = "request_budget"
+CONF_INDEX_RADIUS = "index_radius"
+CONF_ROUTE = "route"
+CONF_ROUTE_ENTITY = "route_entity"
+CONF_DETOUR_PENALTY = "detour_penalty"
 DEFAULT_INTERVAL = 3600
 DEFAULT_NAME = "Gas Station"
 DEFAULT_TIMEOUT = 60000
-CONFIG_VER = 9
+DEFAULT_STARTUP_CONCURRENCY = 4
+DEFAULT_MIN_INTERVAL = 900
+DEFAULT_MAX_INTERVAL = 14400
+DEFAULT_RESPONSE_CACHE_TTL = 300
+DEFAULT_RESPONSE_CACHE_SIZE = 128
+DEFAULT_TOP_K = 3
+MAX_TOP_K = 10
+DEFAULT_REGION_RADIUS = 10
+DEFAULT_REQUEST_BUDGET = 20
+MAX_INDEX_RADIUS = 50
+DEFAULT_DETOUR_PENALTY = 0.01
+CONFIG_VER = 10
 
 # CSRF token cache, shared across the coordinator, config flow, and services
 # so they all benefit from a single fetched token (and don't each hammer the
 # CSRF endpoint on installs where Cloudflare is rate-limiting).
 CACHE_FILE_NAME = ".storage/gasbuddy_cache"
 
+# Long-lived API clients kept per hub, least recently used dropped first.
+CLIENT_POOL_SIZE = 32
+
+# Hub-level price batching: station lookups that come due within
+# BATCH_WINDOW seconds are grouped by location and answered with one
+# area query per BATCH_RADIUS_MILES cluster. Slices for stations that
+# were not due yet are reused for BATCH_MAX_AGE seconds.
+BATCH_WINDOW = 1.0
+BATCH_RADIUS_MILES = 5.0
+BATCH_LIMIT = 99
+BATCH_MAX_AGE = 300
+
+# Last-known-good station data, restored at startup so sensors come up with
+# cached prices while the live refresh runs in the background.
+SNAPSHOT_STORE_KEY = "gasbuddy_snapshots"
+SNAPSHOT_STORE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+
+# Postal code locations learned from station responses, kept in .storage.
+GEOCODE_STORE_KEY = "gasbuddy_geocode"
+GEOCODE_STORE_VERSION = 1
+GEOCODE_SAVE_DELAY = 60
+GEOCODE_MAX_CODES = 2000
+GEOCODE_MAX_STATIONS = 20
+
+# Price history kept in .storage: up to HISTORY_CAPACITY samples per station
+# and fuel, at most one per HISTORY_SPACING seconds so a week always fits
+# whatever the polling interval, summarised over HISTORY_WINDOWS.
+HISTORY_STORE_KEY = "gasbuddy_history"
+HISTORY_STORE_VERSION = 1
+HISTORY_SAVE_DELAY = 300
+HISTORY_SPACING = 600
+HISTORY_CAPACITY = 1008
+HISTORY_WINDOWS = {"24h": 86400, "7d": 604800}
+
+# Hub-level EV station cache: nearby searches are widened to at least
+# EV_CACHE_RADIUS_MILES / EV_CACHE_LIMIT, kept for EV_CACHE_TTL seconds and
+# indexed by EV_CACHE_CELL_DEG grid cells.
+EV_CACHE_TTL = 1800
+EV_CACHE_CELL_DEG = 0.5
+EV_CACHE_RADIUS_MILES = 10.0
+EV_CACHE_LIMIT = 50
+
+# Cheapest gas trackers at the same postal code, or at coordinates equal to
+# AREA_PRECISION decimal places, share one area query of AREA_LIMIT stations
+# for up to AREA_MAX_AGE seconds.
+AREA_LIMIT = 20
+AREA_PRECISION = 3
+AREA_MAX_AGE = 300
+
+# Regions are tiled into query points REGION_TILE_MILES apart, each looked up
+# with REGION_TILE_LIMIT stations, REGION_CONCURRENCY at a time. Region
+# sensors report these statistics of every station's price per fuel.
+REGION_TILE_MILES = 3.0
+REGION_TILE_LIMIT = 50
+REGION_CONCURRENCY = 4
+REGION_STATS = {"min": "Min", "median": "Median", "p90": "P90"}
+
+# Route trackers look up points ROUTE_SAMPLE_MILES apart along their route,
+# spread further apart on long routes so no refresh needs more than
+# ROUTE_MAX_SAMPLES lookups, ROUTE_CONCURRENCY at a time. Points are rounded
+# to ROUTE_SNAP_DECIMALS places so the same drive reuses the same lookups.
+# A followed entity's positions are kept ROUTE_TRAIL_MILES apart for
+# ROUTE_TRAIL_WINDOW seconds, at most ROUTE_TRAIL_POINTS of them.
+ROUTE_SAMPLE_MILES = 3.0
+ROUTE_MAX_SAMPLES = 8
+ROUTE_CONCURRENCY = 4
+ROUTE_SNAP_DECIMALS = 2
+ROUTE_TRAIL_MILES = 0.5
+ROUTE_TRAIL_WINDOW = 86400
+ROUTE_TRAIL_POINTS = 500
+
+# Every gas station record the hub receives is kept in a grid of
+# STATION_INDEX_CELL_DEG cells, up to STATION_INDEX_CAPACITY stations.
+STATION_INDEX_CELL_DEG = 0.05
+STATION_INDEX_CAPACITY = 5000
+
+# Adaptive polling: stations are polled ADAPTIVE_POLLS_PER_CHANGE times per
+# observed price change, judged from the last ADAPTIVE_HISTORY changes.
+ADAPTIVE_POLLS_PER_CHANGE = 2
+ADAPTIVE_HISTORY = 10
+
+# Upstream request counters report over a rolling day.
+METRICS_WINDOW = 86400
+# Upper bounds, in seconds, of the request latency histogram buckets.
+METRICS_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+# While GasBuddy blocks requests, the hub pauses them for BREAKER_BASE_DELAY
+# seconds, doubling per blocked probe up to BREAKER_MAX_DELAY, each delay
+# spread by +/- BREAKER_JITTER.
+BREAKER_BASE_DELAY = 60
+BREAKER_MAX_DELAY = 3600
+BREAKER_JITTER = 0.2
+
 # hass.data attributes
 ATTR_DEVICE_ID = "device_id"
 ATTR_IMAGEURL = "image_url"
@@ -45,7 +167,16 @@ ATTR_LIMIT = "limit"
 ATTR_RADIUS = "radius"
 ATTR_POSTAL_CODE = "zipcode"
 ATTR_SOLVER = "solver"
+ATTR_TIMEOUT = "timeout"
+ATTR_LOOKUP_STATS = "lookup_stats"
+ATTR_FUEL = "fuel"
+ATTR_HOURS = "hours"
+ATTR_MAX_PRICE = "max_price"
+ATTR_PRICE_TYPE = "price_type"
+ATTR_MAX_AGE = "max_age"
 COORDINATOR = "coordinator"
+HUB = "hub"
+REGIONS = "regions"
 SERVICES = "services"
 DOMAIN = "gasbuddy"
 VERSION = "1.0"
@@ -58,6 +189,16 @@ SERVICE_LOOKUP_ZIP = "lookup_zip"
 SERVICE_EV_LOOKUP_GPS = "ev_lookup_gps"
 SERVICE_EV_LOOKUP_ZIP = "ev_lookup_zip"
 SERVICE_CLEAR_CACHE = "clear_cache"
+SERVICE_PRICE_HISTORY = "get_price_history"
+SERVICE_QUERY_REGION = "query_region"
+SERVICE_CHEAPEST_NEARBY = "cheapest_nearby"
+
+# GPS lookup services: entities are looked up SERVICE_CONCURRENCY at a time,
+# and entities whose coordinates match to SERVICE_GRID_DECIMALS decimal
+# places (about 1 km) share one lookup.
+SERVICE_CONCURRENCY = 4
+SERVICE_GRID_DECIMALS = 2
+DEFAULT_SERVICE_TIMEOUT = 60
 
 # sensor constants
 UNIT_OF_MEASURE = {
@@ -402,6 +543,55 @@ SENSOR_TYPES: Final[dict[str, GasBuddySensorEntityDescription]] = {
     ),
 }
 
+# Diagnostic sensors of the hub device, fed by the hub's request metrics.
+HUB_SENSOR_TYPES: Final[tuple[GasBuddyHubSensorEntityDescription, ...]] = (
+    GasBuddyHubSensorEntityDescription(
+        key="upstream_requests",
+        name="Upstream Requests",
+        icon="mdi:cloud-upload",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda hub: hub.calls.calls_per_day,
+        attrs_fn=lambda hub: {"total": hub.calls.total, **hub.metrics.paths},
+    ),
+    GasBuddyHubSensorEntityDescription(
+        key="request_errors",
+        name="Request Errors",
+        icon="mdi:cloud-alert",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda hub: hub.metrics.errors,
+        attrs_fn=lambda hub: {
+            operation: metrics.error for operation, metrics in hub.metrics.operations.items()
+        },
+    ),
+    GasBuddyHubSensorEntityDescription(
+        key="request_timeouts",
+        name="Request Timeouts",
+        icon="mdi:timer-alert",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda hub: hub.metrics.timeouts,
+        attrs_fn=lambda hub: {
+            operation: metrics.timeout for operation, metrics in hub.metrics.operations.items()
+        },
+    ),
+    GasBuddyHubSensorEntityDescription(
+        key="request_latency",
+        name="Request Latency p95",
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=lambda hub: hub.metrics.percentile(0.95),
+        attrs_fn=lambda hub: {
+            operation: {"p50": metrics.percentile(0.5), "p95": metrics.percentile(0.95)}
+            for operation, metrics in hub.metrics.operations.items()
+        },
+    ),
+)
+
 
 class CoordinatorsDict(dict):  # noqa: FURB189
     """Custom dict to support legacy test assertions and coordinator methods."""
@@ -1,10 +1,17 @@
 """Update coordinator for GasBuddy."""
 
+from __future__ import annotations
+
+import bisect
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+import heapq
 import json
 import logging
 import math
-import operator
+import time
+from types import MappingProxyType
 from typing import Any
 
 from py_gasbuddy import GasBuddy
@@ -14,14 +21,23 @@ from py_gasbuddy.exceptions import APIError, CSRFTokenMissing, LibraryError
 
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .breaker import CircuitOpenError, is_blocked
+from .coalesce import GasBuddyRequestCoalescer
 from .const import (
+    ADAPTIVE_HISTORY,
+    ADAPTIVE_POLLS_PER_CHANGE,
+    AREA_LIMIT,
     CACHE_FILE_NAME,
+    CONF_ADAPTIVE_POLLING,
     CONF_BRAND_ADJUSTMENTS,
     CONF_CHEAPEST,
+    CONF_DETOUR_PENALTY,
     CONF_EV_CHARGING,
     CONF_EXCLUDE_BRANDS,
     CONF_EXCLUDE_STATIONS,
@@ -29,16 +45,31 @@ from .const import (
     CONF_FUEL_KEY,
     CONF_INCLUDE_BRANDS,
     CONF_INCLUDE_STATIONS,
+    CONF_INDEX_RADIUS,
     CONF_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
     CONF_NAME,
     CONF_POSTAL,
     CONF_PRICE_TYPE,
+    CONF_ROUTE,
+    CONF_ROUTE_ENTITY,
     CONF_SOLVER,
     CONF_STATION_ID,
     CONF_TIMEOUT,
+    CONF_TOP_K,
+    DEFAULT_DETOUR_PENALTY,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_TIMEOUT,
+    DEFAULT_TOP_K,
     DOMAIN,
+    FUEL_KEY_CHOICES,
+    UNIT_OF_MEASURE,
 )
+from .hub import GasBuddyHub
+from .route import RouteTrail, async_route_lookup, route_detours, route_samples
+from .scoring import score_stations
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -84,6 +115,251 @@ def _redact(data: Any) -> str:
         return str(_redact_recursive(data))
 
 
+class LazyRedact:
+    """Redact data for a log message only when the message is emitted.
+
+    Pass an instance as a logging argument instead of calling ``_redact``
+    directly; the payload is only walked and serialised if a handler
+    actually formats the record, so debug calls cost nothing when debug
+    logging is off.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Any) -> None:
+        """Initialize."""
+        self._data = data
+
+    def __str__(self) -> str:
+        """Return the redacted data."""
+        return _redact(self._data)
+
+
+class BrandAdjustmentIndex:
+    """Brand price adjustments compiled into normalised lookup tables.
+
+    Keys of the hub's brand adjustments are matched against a station's
+    brand IDs first and then, case-insensitively, against its brand names.
+    Invalid amounts are reported once here and skipped during lookups.
+    """
+
+    __slots__ = ("by_id", "by_name")
+
+    def __init__(self, adjustments: Mapping[Any, Any] | None) -> None:
+        """Initialize."""
+        self.by_id: dict[str, float | None] = {}
+        self.by_name: dict[str, float | None] = {}
+        for key, value in (adjustments or {}).items():
+            try:
+                amount: float | None = float(value)
+            except (ValueError, TypeError) as ex:
+                _LOGGER.warning("Invalid price adjustment for brand %s: %s", key, ex)
+                amount = None
+            self.by_id.setdefault(str(key), amount)
+            self.by_name.setdefault(str(key).lower(), amount)
+
+    def lookup(self, data: dict) -> float:
+        """Return the adjustment for a station's brands, or 0.0 when none applies."""
+        if not self.by_id:
+            return 0.0
+        brands = data.get("brands") or []
+        for brand in brands:
+            if (brand_id := brand.get("brandId")) and (
+                amount := self.by_id.get(str(brand_id))
+            ) is not None:
+                return amount
+        for brand in brands:
+            if (name := brand.get("name")) and (
+                amount := self.by_name.get(name.lower())
+            ) is not None:
+                return amount
+        return 0.0
+
+
+class StationFilter:
+    """A cheapest tracker's brand and station filters compiled into sets.
+
+    Station and brand IDs are compared as strings. A station passes when it
+    is not excluded, is included when an include list is set, has no
+    excluded brand and, when brands are included, has one of them.
+    """
+
+    __slots__ = ("exclude_brands", "exclude_stations", "include_brands", "include_stations")
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        """Initialize."""
+        self.exclude_brands = frozenset(map(str, data.get(CONF_EXCLUDE_BRANDS) or ()))
+        self.include_brands = frozenset(map(str, data.get(CONF_INCLUDE_BRANDS) or ()))
+        self.exclude_stations = frozenset(map(str, data.get(CONF_EXCLUDE_STATIONS) or ()))
+        self.include_stations = frozenset(map(str, data.get(CONF_INCLUDE_STATIONS) or ()))
+
+    def __bool__(self) -> bool:
+        """Return True if any filter is set."""
+        return bool(
+            self.exclude_brands
+            or self.include_brands
+            or self.exclude_stations
+            or self.include_stations
+        )
+
+    def __call__(self, station: dict) -> bool:
+        """Return True if the station passes the filters."""
+        station_id = str(station.get("station_id") or station.get("id") or "")
+        if station_id in self.exclude_stations:
+            return False
+        if self.include_stations and station_id not in self.include_stations:
+            return False
+        if self.exclude_brands or self.include_brands:
+            brand_ids = {
+                str(brand_id)
+                for brand in station.get("brands") or ()
+                if (brand_id := brand.get("brandId"))
+            }
+            if not self.exclude_brands.isdisjoint(brand_ids):
+                return False
+            if self.include_brands and self.include_brands.isdisjoint(brand_ids):
+                return False
+        return True
+
+
+PRICE_FIELDS = ("price", "cash_price", "deal_price")
+
+# Data keys that only feed the sensor of the same key. A change to any other
+# key (station details, EV network, pricing or hours, ...) can show up in
+# every sensor's attributes, so it notifies all of them.
+ISOLATED_KEYS = frozenset({
+    *FUEL_KEY_CHOICES,
+    "last_updated",
+    "open_status",
+    "name",
+    "station_address",
+    "ev_level1",
+    "ev_level2",
+    "ev_dc_fast",
+    "ev_j1772",
+    "ev_j1772_power",
+    "ev_ccs",
+    "ev_ccs_power",
+    "ev_chademo",
+    "ev_chademo_power",
+    "ev_nacs",
+    "ev_nacs_power",
+    "ev_status",
+    "ev_access_code",
+    "ev_cards_accepted",
+    "ev_date_last_confirmed",
+})
+
+
+@dataclass(frozen=True, slots=True)
+class StationView:
+    """Sensor values derived once from a single refresh of station data.
+
+    ``prices`` maps each fuel to its price fields, each holding the display
+    price and the brand-adjusted display price, both already converted from
+    cents per liter where needed.
+    """
+
+    source: dict[str, Any] = field(repr=False, compare=False)
+    index: BrandAdjustmentIndex = field(repr=False, compare=False)
+    adjustment: float
+    address: str | None
+    amenities: str | None
+    unit: str | None
+    currency: str | None
+    attribution: Mapping[str, str]
+    prices: Mapping[str, Mapping[str, tuple[float, float]]]
+
+    @classmethod
+    def build(cls, data: dict[str, Any], index: BrandAdjustmentIndex) -> StationView:
+        """Derive the view from station data."""
+        adjustment = index.lookup(data)
+        scale = 100 if data.get("unit_of_measure") == "cents_per_liter" else 1
+        uom = data.get("unit_of_measure")
+        currency = data.get("currency")
+
+        attribution: dict[str, str] = {}
+        prices: dict[str, Mapping[str, tuple[float, float]]] = {}
+        for fuel in FUEL_KEY_CHOICES:
+            if not isinstance(node := data.get(fuel), dict):
+                continue
+            if credit := node.get("credit"):
+                attribution[fuel] = f"{credit} via GasBuddy"
+            prices[fuel] = MappingProxyType({
+                price_field: (price / scale, (price + adjustment) / scale)
+                for price_field in PRICE_FIELDS
+                if (price := node.get(price_field)) is not None
+            })
+
+        amenities = None
+        if amenities_list := data.get("amenities"):
+            amenities = ", ".join(a["name"] for a in amenities_list if a.get("name"))
+
+        return cls(
+            source=data,
+            index=index,
+            adjustment=adjustment,
+            address=format_address(data.get("address")),
+            amenities=amenities,
+            unit=(
+                f"{currency}/{UNIT_OF_MEASURE.get(uom, uom)}"
+                if uom is not None and currency is not None
+                else None
+            ),
+            currency=currency,
+            attribution=MappingProxyType(attribution),
+            prices=MappingProxyType(prices),
+        )
+
+
+class PriceChangeTracker:
+    """Estimate how often a station's prices change.
+
+    A change is recorded whenever the price fields of a fuel differ from the
+    previous refresh, timestamped with the ``last_updated`` GasBuddy reports
+    for that fuel. The polling interval is the mean gap between the recent
+    changes divided by ``ADAPTIVE_POLLS_PER_CHANGE``; a station that has been
+    quiet for longer than its usual gap backs off further.
+    """
+
+    def __init__(self, history: int = ADAPTIVE_HISTORY) -> None:
+        """Initialize."""
+        self._history = history
+        self._prices: dict[str, tuple[Any, ...]] = {}
+        self._changes: list[float] = []
+
+    def observe(self, data: dict[str, Any]) -> None:
+        """Record the price changes in a refresh."""
+        for fuel in FUEL_KEY_CHOICES:
+            if not isinstance(node := data.get(fuel), dict):
+                continue
+            prices = tuple(node.get(price_field) for price_field in PRICE_FIELDS)
+            previous = self._prices.get(fuel)
+            if previous == prices:
+                continue
+            self._prices[fuel] = prices
+            # The first refresh only seeds the prices to compare against.
+            if previous is None or all(price is None for price in prices):
+                continue
+            changed = dt_util.parse_datetime(str(node.get("last_updated") or ""))
+            when = changed.timestamp() if changed is not None else time.time()
+            if when not in self._changes:
+                bisect.insort(self._changes, when)
+                del self._changes[: -self._history]
+
+    def interval(self, base: timedelta, minimum: timedelta, maximum: timedelta) -> timedelta:
+        """Return the polling interval suggested by the observed changes.
+
+        Until two changes have been seen the configured ``base`` is kept as is.
+        """
+        if len(self._changes) < 2:
+            return base
+        gap = (self._changes[-1] - self._changes[0]) / (len(self._changes) - 1)
+        gap = max(gap, time.time() - self._changes[-1])
+        suggested = timedelta(seconds=gap / ADAPTIVE_POLLS_PER_CHANGE)
+        return min(max(suggested, minimum), maximum)
+
+
 def _cache_path(hass: HomeAssistant) -> str:
     """Return the path to the CSRF token cache file."""
     return f"{hass.config.config_dir}/{CACHE_FILE_NAME}"
@@ -111,7 +387,11 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     def __init__(
-        self, hass: HomeAssistant, config: ConfigEntry, subentry: ConfigSubentry | None = None
+        self,
+        hass: HomeAssistant,
+        config: ConfigEntry,
+        subentry: ConfigSubentry | None = None,
+        hub: GasBuddyHub | None = None,
     ) -> None:
         """Initialize."""
         self._config = config
@@ -119,17 +399,60 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
             subentry = next(iter(config.subentries.values()))
         assert subentry is not None
         self._subentry: ConfigSubentry = subentry
+        self._hub = hub
+        self._requests = hub.requests if hub is not None else GasBuddyRequestCoalescer()
         self.hass = hass
         self.interval = self._get_interval()
         self._data: dict[Any, Any] = {}
+        # The last data that was fully fetched, served while GasBuddy blocks requests.
+        self._last_good: dict[Any, Any] = {}
+        # Seconds spent in each upstream phase of the latest refresh.
+        self.timings: dict[str, float] = {}
+        # Set by an explicit refresh, so it is not answered from cached slices.
+        self._refresh_requested = False
+        self._brand_source: Mapping[Any, Any] | None = None
+        self._brand_index: BrandAdjustmentIndex | None = None
+        # Editing a subentry reloads the entry, so its filters are compiled once.
+        self._station_filter = StationFilter(subentry.data)
+        self._view: StationView | None = None
+        self._tracker = PriceChangeTracker()
+        # Data and status the listeners were last notified of.
+        self._notified: tuple[dict[str, Any], tuple[Any, ...]] | None = None
         self._cache_file = _cache_path(hass)
-        self._api = GasBuddy(
-            solver_url=self._get_hub_setting(CONF_SOLVER),
-            station_id=self._subentry.data.get(CONF_STATION_ID),
-            cache_file=self._cache_file,
-            timeout=self._get_hub_setting(CONF_TIMEOUT, DEFAULT_TIMEOUT),
-            session=async_get_clientsession(hass),
-        )
+        if hub is not None:
+            self._api = hub.clients.async_get(
+                self._get_hub_setting(CONF_SOLVER), self._subentry.data.get(CONF_STATION_ID)
+            )
+        else:
+            self._api = GasBuddy(
+                solver_url=self._get_hub_setting(CONF_SOLVER),
+                station_id=self._subentry.data.get(CONF_STATION_ID),
+                cache_file=self._cache_file,
+                timeout=self._get_hub_setting(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+                session=async_get_clientsession(hass),
+            )
+
+        if (
+            hub is not None
+            and not self._subentry.data.get(CONF_CHEAPEST)
+            and self._subentry.data.get(CONF_FETCH_GAS, True)
+        ):
+            hub.batcher.async_register(
+                self._subentry.data.get(CONF_STATION_ID),
+                self._subentry.data.get(CONF_LATITUDE),
+                self._subentry.data.get(CONF_LONGITUDE),
+            )
+
+        # Positions of the followed entity, for trackers in route mode.
+        self._trail: RouteTrail | None = None
+        if self._subentry.data.get(CONF_CHEAPEST) and (
+            route_entity := self._subentry.data.get(CONF_ROUTE_ENTITY)
+        ):
+            self._trail = RouteTrail()
+            self._async_trail_add(hass.states.get(route_entity))
+            config.async_on_unload(
+                async_track_state_change_event(hass, route_entity, self._async_route_moved)
+            )
 
         _LOGGER.debug("Data will be update every %s", self.interval)
 
@@ -141,6 +464,15 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
             update_interval=self.interval,
         )
 
+        # Warm start: serve the last good data until the live refresh lands.
+        self.stale = False
+        self.stale_since: str | None = None
+        if hub is not None and (snapshot := hub.snapshots.get(self._subentry.subentry_id)):
+            self._data, self.stale_since = snapshot
+            self._last_good = self._data
+            self.stale = True
+            _LOGGER.debug("Restored snapshot for %s saved at %s", subentry.title, self.stale_since)
+
     @property
     def data(self) -> dict[str, Any]:
         """Return data."""
@@ -150,6 +482,49 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
     def data(self, value: dict[str, Any]) -> None:
         """Set data."""
         self._data = value
+        self._view = None
+
+    @property
+    def view(self) -> StationView | None:
+        """Return sensor values derived from the current data, built once per refresh."""
+        if not (data := self._data):
+            return None
+        index = self._get_brand_index()
+        if (view := self._view) is None or view.source is not data or view.index is not index:
+            view = self._view = StationView.build(data, index)
+        return view
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh that fetches fresh data rather than a cached slice."""
+        self._refresh_requested = True
+        await super().async_request_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose sensor data changed since the last notification.
+
+        Sensors register with their data key as context. When only isolated
+        keys changed, just those sensors are updated; anything else, or a
+        change in availability or staleness, updates every listener.
+        """
+        changed = self._async_changed_keys()
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+
+    @callback
+    def _async_changed_keys(self) -> set[str] | None:
+        """Return the data keys changed since the last notification, or None for all."""
+        status = (self.last_update_success, self.stale, self.stale_since)
+        previous, self._notified = self._notified, (dict(self._data or {}), status)
+        if previous is None or previous[1] != status:
+            return None
+        old, new = previous[0], self._notified[0]
+        changed = {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+        if not changed <= ISOLATED_KEYS:
+            return None
+        _LOGGER.debug("Notifying sensors for changed keys: %s", sorted(changed))
+        return changed
 
     def _get_hub_setting(self, key: str, default: Any = None) -> Any:
         """Get a setting from the hub config entry, falling back to subentry data."""
@@ -160,13 +535,50 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
         val = self._subentry.data.get(key)
         return val if val is not None else default
 
-    async def _async_update_data(self) -> dict:  # noqa: PLR0914
+    async def _async_update_data(self) -> dict:
+        """Update data, serving the last good data while GasBuddy blocks requests."""
+        breaker = self._requests.breaker
+        if not breaker.allows_requests:
+            if self._last_good:
+                return self._async_serve_stale()
+            raise UpdateFailed(str(CircuitOpenError(breaker.retry_in)))
+        try:
+            return await self._async_fetch_data()
+        except (UpdateFailed, CircuitOpenError) as ex:
+            # A failed fetch may have overwritten the data part way through.
+            self._data = self._last_good
+            cause = ex.__cause__ if isinstance(ex, UpdateFailed) else ex
+            blocked = isinstance(cause, CircuitOpenError) or (
+                breaker.failures and is_blocked(cause)
+            )
+            if self._last_good and blocked:
+                return self._async_serve_stale()
+            if isinstance(ex, CircuitOpenError):
+                raise UpdateFailed(str(ex)) from ex
+            raise
+
+    @callback
+    def _async_serve_stale(self) -> dict:
+        """Return the last good data, marked stale, without contacting GasBuddy."""
+        if not self.stale:
+            self.stale = True
+            last = self._last_good.get("last_updated")
+            self.stale_since = last.isoformat() if isinstance(last, datetime) else last
+        _LOGGER.debug(
+            "GasBuddy is blocking requests; serving %s data from %s",
+            self._subentry.title,
+            self.stale_since,
+        )
+        return self._last_good
+
+    async def _async_fetch_data(self) -> dict:  # noqa: PLR0914
         """Update data via library."""
-        self._api.solver_url = self._get_hub_setting(CONF_SOLVER)
-        self._api.timeout = self._get_hub_setting(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        self.timings = {}
 
         if self._subentry.data.get(CONF_CHEAPEST):
-            return await self._async_update_cheapest()
+            data = await self._async_update_cheapest()
+            self._async_adapt_interval(data)
+            return self._async_save_snapshot(data)
 
         ev_charging_enabled = self._subentry.data.get(CONF_EV_CHARGING, False)
         fetch_gas = self._subentry.data.get(CONF_FETCH_GAS, True)
@@ -194,12 +606,12 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
             }
             _LOGGER.debug(
                 "fetch_gas disabled — bootstrapping EV-only data: %s",
-                _redact(self._data),
+                LazyRedact(self._data),
             )
         else:
             try:
-                self._data = await self._api.price_lookup()
-                _LOGGER.debug("Gas station data: %s", _redact(self._data))
+                self._data = await self._async_price_lookup()
+                _LOGGER.debug("Gas station data: %s", LazyRedact(self._data))
                 config_lat = self._subentry.data.get(CONF_LATITUDE)
                 config_lon = self._subentry.data.get(CONF_LONGITUDE)
                 if config_lat is not None and config_lon is not None:
@@ -219,14 +631,14 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
                             lat = self.hass.config.latitude
                         if lon is None:
                             lon = self.hass.config.longitude
-                        ev_res = await self._api.ev_stations_nearby(
+                        ev_res = await self._async_ev_stations_nearby(
                             lat=lat,
                             lon=lon,
                             radius=100,
                             limit=100,
                         )
 
-                        _LOGGER.debug("EV station fallback search result: %s", _redact(ev_res))
+                        _LOGGER.debug("EV station fallback search result: %s", LazyRedact(ev_res))
 
                         matching = next(
                             (
@@ -291,14 +703,15 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
 
         # Query EV station details if enabled
         if ev_charging_enabled and CONF_LATITUDE in self._data and CONF_LONGITUDE in self._data:
+            ev_start = time.monotonic()
             try:
-                ev_res = await self._api.ev_stations_nearby(
+                ev_res = await self._async_ev_stations_nearby(
                     lat=self._data[CONF_LATITUDE],
                     lon=self._data[CONF_LONGITUDE],
                     radius=5,
                     limit=10,
                 )
-                _LOGGER.debug("EV station search result: %s", _redact(ev_res))
+                _LOGGER.debug("EV station search result: %s", LazyRedact(ev_res))
                 stations = (ev_res or {}).get("stations", [])
                 if stations:
                     matching = next(
@@ -351,19 +764,137 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
                         self._data["ev_distance_miles"] = matching.get("distance_miles")
             except Exception as ev_ex:
                 _LOGGER.warning("Failed to fetch EV station data: %s", ev_ex, exc_info=True)
+            self.timings["ev_lookup"] = time.monotonic() - ev_start
 
         self._data["last_updated"] = datetime.now(UTC)
-        _LOGGER.debug("Final coordinator data: %s", _redact(self._data))
-        return self._data
+        _LOGGER.debug("Final coordinator data: %s", LazyRedact(self._data))
+        self._async_adapt_interval(self._data)
+        return self._async_save_snapshot(self._data)
+
+    @callback
+    def _async_adapt_interval(self, data: dict) -> None:
+        """Retune the polling interval from observed price changes, if enabled."""
+        if self._hub is None or not self._get_hub_setting(CONF_ADAPTIVE_POLLING, False):
+            return
+        self._tracker.observe(data)
+        self.update_interval = self._tracker.interval(
+            self.interval,
+            timedelta(seconds=self._get_hub_setting(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)),
+            timedelta(seconds=self._get_hub_setting(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)),
+        )
+        _LOGGER.debug("Next refresh of %s in %s", self._subentry.title, self.update_interval)
+
+    @callback
+    def _async_save_snapshot(self, data: dict) -> dict:
+        """Persist fresh data as the last known good snapshot and record its prices."""
+        self.stale = False
+        self.stale_since = None
+        self._last_good = data
+        if self._hub is not None:
+            self._hub.snapshots.async_save(self._subentry.subentry_id, data)
+            self._hub.history.async_record(self._subentry.subentry_id, data)
+        return data
+
+    async def _async_price_lookup(self) -> dict:
+        """Look up the station, through the hub batcher when one is available."""
+        start = time.monotonic()
+        try:
+            if self._hub is None:
+                return await self._requests.async_request(
+                    self._api, "price_lookup", self._subentry.data.get(CONF_STATION_ID)
+                )
+            refresh, self._refresh_requested = self._refresh_requested, False
+            return await self._hub.batcher.async_price_lookup(
+                self._api,
+                self._subentry.data.get(CONF_STATION_ID),
+                self._subentry.data.get(CONF_LATITUDE),
+                self._subentry.data.get(CONF_LONGITUDE),
+                refresh=refresh,
+            )
+        finally:
+            self.timings["price_lookup"] = time.monotonic() - start
 
-    async def _async_update_cheapest(self) -> dict:  # noqa: PLR0914
+    async def _async_ev_stations_nearby(
+        self, lat: float, lon: float, radius: float, limit: int
+    ) -> dict:
+        """Search nearby EV stations, through the hub EV cache when one is available."""
+        if self._hub is None:
+            return await self._requests.async_request(
+                self._api, "ev_stations_nearby", lat=lat, lon=lon, radius=radius, limit=limit
+            )
+        return await self._hub.ev_cache.async_stations_nearby(self._api, lat, lon, radius, limit)
+
+    async def _async_update_cheapest(self) -> dict:
         """Find and return the cheapest nearby station for the configured fuel and price type."""
-        self._api.solver_url = self._get_hub_setting(CONF_SOLVER)
-        self._api.timeout = self._get_hub_setting(CONF_TIMEOUT, DEFAULT_TIMEOUT)
 
         fuel_key = self._subentry.data.get(CONF_FUEL_KEY, "regular_gas")
         price_type = self._subentry.data.get(CONF_PRICE_TYPE, "best")
 
+        waypoints = self._route_waypoints()
+        stations = [s for s in await self._async_find_stations(waypoints) if s.get(fuel_key)]
+        if not stations:
+            raise UpdateFailed("No stations with prices found for selected fuel")
+
+        if self._station_filter:
+            stations = list(filter(self._station_filter, stations))
+        if not stations:
+            raise UpdateFailed("No stations with prices found for selected fuel after filtering")
+
+        brands = self._get_brand_index()
+        adjustments = [brands.lookup(s) for s in stations]
+        detours: list[float] = []
+        if waypoints:
+            # Each mile off the route costs the penalty, like a brand adjustment.
+            penalty = self._subentry.data.get(CONF_DETOUR_PENALTY, DEFAULT_DETOUR_PENALTY)
+            detours = route_detours(stations, waypoints)
+            adjustments = [
+                adjustment + penalty * detour
+                for adjustment, detour in zip(adjustments, detours, strict=True)
+            ]
+        scores = score_stations(stations, fuel_key, price_type, adjustments)
+        # One pass over the stations keeps only the K cheapest on a heap; the
+        # position breaks ties in favour of the station GasBuddy listed first.
+        top_k = self._subentry.data.get(CONF_TOP_K, DEFAULT_TOP_K)
+        ranked = heapq.nsmallest(
+            top_k,
+            (
+                (price, position, s)
+                for position, (price, s) in enumerate(zip(scores, stations, strict=True))
+                if math.isfinite(price)
+            ),
+        )
+        if not ranked:
+            raise UpdateFailed(
+                "No stations with a valid price found for selected fuel and price type"
+            )
+        # Area results can be shared with other trackers, so never modify them.
+        cheapest = dict(ranked[0][2])
+        cheapest["runner_ups"] = [
+            {
+                "rank": rank,
+                CONF_STATION_ID: str(s.get("station_id") or s.get("id") or ""),
+                "name": s.get("name"),
+                "address": format_address(s.get("address")),
+                "price": round(
+                    (price - (penalty * detours[position] if detours else 0.0))
+                    / (100 if s.get("unit_of_measure") == "cents_per_liter" else 1),
+                    3,
+                ),
+                **({"detour_miles": round(detours[position], 1)} if detours else {}),
+            }
+            for rank, (price, position, s) in enumerate(ranked[1:], start=2)
+        ]
+        if detours:
+            cheapest["detour_miles"] = round(detours[ranked[0][1]], 1)
+        cheapest["last_updated"] = datetime.now(UTC)
+        if addr := cheapest.get("address"):
+            if formatted := format_address(addr):
+                cheapest["station_address"] = formatted
+        _LOGGER.debug("Cheapest gas station: %s", LazyRedact(cheapest))
+        return cheapest
+
+    async def _async_find_stations(self, waypoints: list[tuple[float, float]] | None) -> list[dict]:
+        """Look up the candidate stations of a cheapest tracker, along its route if it has one."""
         postal = self._subentry.data.get(CONF_POSTAL)
         lat: float | None = None
         lon: float | None = None
@@ -373,113 +904,117 @@ class GasBuddyUpdateCoordinator(DataUpdateCoordinator):
             config_lon = self._subentry.data.get(CONF_LONGITUDE)
             lon = config_lon if config_lon is not None else self.hass.config.longitude
 
+        start = time.monotonic()
         try:
-            result = await self._api.price_lookup_service(
-                lat=lat,
-                lon=lon,
-                zipcode=postal,
-                limit=20,
-            )
+            if waypoints:
+                samples = route_samples(waypoints)
+                stations = await async_route_lookup(self._async_area_lookup, samples)
+                for sample_lat, sample_lon in samples:
+                    stations = self._merge_indexed(stations, sample_lat, sample_lon, None)
+            else:
+                result = await self._async_area_lookup(lat, lon, postal)
+                stations = self._merge_indexed(result.get("results") or [], lat, lon, postal)
         except (APIError, LibraryError, CSRFTokenMissing) as ex:
             raise UpdateFailed(f"Cheapest gas lookup failed: {ex}") from ex
+        finally:
+            self.timings["area_lookup"] = time.monotonic() - start
 
-        stations = [s for s in (result.get("results") or []) if s.get(fuel_key)]
-        if not stations:
-            raise UpdateFailed("No stations with prices found for selected fuel")
+        return stations
 
-        exclude_brands = self._subentry.data.get(CONF_EXCLUDE_BRANDS) or []
-        include_brands = self._subentry.data.get(CONF_INCLUDE_BRANDS) or []
-        exclude_stations = self._subentry.data.get(CONF_EXCLUDE_STATIONS) or []
-        include_stations = self._subentry.data.get(CONF_INCLUDE_STATIONS) or []
+    async def _async_area_lookup(
+        self, lat: float | None, lon: float | None, postal: str | None = None
+    ) -> dict:
+        """Look up the stations around a point, through the hub's area cache when available."""
+        if self._hub is not None:
+            return await self._hub.areas.async_price_lookup(
+                self._api, lat, lon, postal, self.update_interval.total_seconds()
+            )
+        return await self._requests.async_request(
+            self._api,
+            "price_lookup_service",
+            lat=lat,
+            lon=lon,
+            zipcode=postal,
+            limit=AREA_LIMIT,
+        )
 
-        filtered_stations = []
-        for s in stations:
-            station_id = str(s.get("station_id") or s.get("id") or "")
-            station_brand_ids = [
-                str(b.get("brandId")) for b in s.get("brands", []) if b.get("brandId")
-            ]
+    def _route_waypoints(self) -> list[tuple[float, float]] | None:
+        """Return the route of a tracker in route mode, or None to search one area.
 
-            if exclude_stations and station_id in exclude_stations:
-                continue
-            if include_stations and station_id not in include_stations:
-                continue
-            if exclude_brands and any(b_id in exclude_brands for b_id in station_brand_ids):
-                continue
-            if include_brands and not any(b_id in include_brands for b_id in station_brand_ids):
-                continue
+        A configured route wins; otherwise the followed entity's recent
+        positions are used, or its current position until it has moved.
+        """
+        if route := self._subentry.data.get(CONF_ROUTE):
+            return [(float(lat), float(lon)) for lat, lon in route]
+        if self._trail is None:
+            return None
+        return self._trail.points(time.time()) or None
 
-            filtered_stations.append(s)
+    @callback
+    def _async_route_moved(self, event: Event[EventStateChangedData]) -> None:
+        """Record a new position of the followed entity."""
+        self._async_trail_add(event.data["new_state"])
 
-        stations = filtered_stations
-        if not stations:
-            raise UpdateFailed("No stations with prices found for selected fuel after filtering")
+    @callback
+    def _async_trail_add(self, state: State | None) -> None:
+        """Add an entity state's position to the trail, if it has one."""
+        if state is None:
+            return
+        lat, lon = state.attributes.get("latitude"), state.attributes.get("longitude")
+        if lat is not None and lon is not None:
+            self._trail.add(lat, lon, state.last_updated.timestamp())
 
-        def _sort_key(s: dict) -> float:
-            node = s.get(fuel_key) or {}
-            adjustment = self.get_brand_adjustment(s)
-
-            def adjust(val: float | None) -> float:
-                if val is None:
-                    return float("inf")
-                return val + adjustment
-
-            if price_type == "best":
-                candidates = [node.get("deal_price"), node.get("cash_price"), node.get("price")]
-                vals = [adjust(p) for p in candidates if p is not None]
-                return min(vals) if vals else float("inf")
-            if price_type == "deal":
-                return adjust(node.get("deal_price"))
-            field = "cash_price" if price_type == "cash" else "price"
-            return adjust(node.get(field))
-
-        keyed = [(s, _sort_key(s)) for s in stations]
-        finite = [(s, k) for s, k in keyed if math.isfinite(k)]
-        if not finite:
-            raise UpdateFailed(
-                "No stations with a valid price found for selected fuel and price type"
+    def _merge_indexed(
+        self,
+        results: list[dict],
+        lat: float | None,
+        lon: float | None,
+        postal: str | None,
+    ) -> list[dict]:
+        """Add stations from the hub's station index to an area lookup's results.
+
+        Only stations within the tracker's index radius that were seen
+        within its update interval are added, after the looked-up ones.
+        """
+        radius = self._subentry.data.get(CONF_INDEX_RADIUS)
+        if self._hub is None or not radius:
+            return results
+        if lat is None or lon is None:
+            if (point := self._hub.geocodes.get(postal)) is None:
+                return results
+            lat, lon = point
+        known = {str(s.get("station_id") or s.get("id")) for s in results}
+        indexed = [
+            station
+            for _, station in self._hub.stations.nearby(
+                lat, lon, radius, self.interval.total_seconds()
             )
-        cheapest = min(finite, key=operator.itemgetter(1))[0]
-        cheapest["last_updated"] = datetime.now(UTC)
-        if addr := cheapest.get("address"):
-            if formatted := format_address(addr):
-                cheapest["station_address"] = formatted
-        _LOGGER.debug("Cheapest gas station: %s", _redact(cheapest))
-        return cheapest
+            if str(station.get("station_id") or station.get("id")) not in known
+        ]
+        _LOGGER.debug(
+            "Added %d indexed station(s) within %s miles to %d looked up",
+            len(indexed),
+            radius,
+            len(results),
+        )
+        return [*results, *indexed]
 
     def get_brand_adjustment(self, data: dict | None = None) -> float:
         """Get the brand price adjustment for the current or specified station."""
-        if data is None:
-            data = self.data
-        if not data:
-            return 0.0
+        if data is not None:
+            return self._get_brand_index().lookup(data) if data else 0.0
 
-        brand_adjustments = self._get_hub_setting(CONF_BRAND_ADJUSTMENTS, {})
-        if not brand_adjustments:
+        if (view := self.view) is None:
             return 0.0
+        return view.adjustment
 
-        station_brand_ids = [
-            str(b.get("brandId")) for b in data.get("brands", []) if b.get("brandId")
-        ]
-        station_brand_names = [b.get("name") for b in data.get("brands", []) if b.get("name")]
-
-        for b_id in station_brand_ids:
-            if b_id in brand_adjustments:
-                try:
-                    return float(brand_adjustments[b_id])
-                except (ValueError, TypeError) as ex:
-                    _LOGGER.warning("Invalid price adjustment for brand ID %s: %s", b_id, ex)
-
-        for b_name in station_brand_names:
-            matching_adjustments = [
-                val for key, val in brand_adjustments.items() if str(key).lower() == b_name.lower()
-            ]
-            if matching_adjustments:
-                try:
-                    return float(matching_adjustments[0])
-                except (ValueError, TypeError) as ex:
-                    _LOGGER.warning("Invalid price adjustment for brand name %s: %s", b_name, ex)
-
-        return 0.0
+    def _get_brand_index(self) -> BrandAdjustmentIndex:
+        """Return the compiled brand adjustments, rebuilding them when the hub options change."""
+        source = self._get_hub_setting(CONF_BRAND_ADJUSTMENTS)
+        if self._brand_index is None or source is not self._brand_source:
+            self._brand_source = source
+            self._brand_index = BrandAdjustmentIndex(source)
+        return self._brand_index
 
     async def clear_cache(self) -> None:
         """Clear cache file."""
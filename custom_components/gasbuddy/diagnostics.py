@@ -10,7 +10,7 @@ from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
 
-from .const import CONF_POSTAL, CONF_SOLVER, COORDINATOR, DOMAIN
+from .const import CONF_POSTAL, CONF_SOLVER, COORDINATOR, DOMAIN, HUB, REGIONS
 
 REDACT_KEYS = {
     CONF_SOLVER,
@@ -39,11 +39,29 @@ async def async_get_config_entry_diagnostics(
     """Return diagnostics for a config entry."""
     diag: dict[str, Any] = {}
     diag["config"] = config_entry.as_dict()
-    coordinators = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {}).get(COORDINATOR)
+    runtime = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {})
+    coordinators = runtime.get(COORDINATOR)
     if coordinators is not None:
         diag["coordinator_data"] = {
             subentry_id: coord.data or {} for subentry_id, coord in coordinators.items()
         }
+        diag["update_intervals"] = {
+            subentry_id: coord.update_interval.total_seconds()
+            for subentry_id, coord in coordinators.items()
+            if coord.update_interval is not None
+        }
+    if regions := runtime.get(REGIONS):
+        diag["region_data"] = {
+            subentry_id: region.data or {} for subentry_id, region in regions.items()
+        }
+    if (hub := runtime.get(HUB)) is not None:
+        diag["upstream_calls"] = {
+            "last_24h": hub.calls.calls_per_day,
+            "total": hub.calls.total,
+        }
+        diag["circuit_breaker"] = hub.breaker.as_dict()
+        diag["request_metrics"] = hub.metrics.as_dict()
+        diag["indexed_stations"] = len(hub.stations)
     return async_redact_data(diag, REDACT_KEYS)
 
 
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import SensorEntityDescription
 
@@ -15,3 +17,12 @@ class GasBuddySensorEntityDescription(SensorEntityDescription):
     deal: bool | None = None
     price: bool | None = True
     cheapest_only: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class GasBuddyHubSensorEntityDescription(SensorEntityDescription):
+    """Class describing GasBuddy hub diagnostic sensor entities."""
+
+    # Both are called with the GasBuddyHub.
+    value_fn: Callable[[Any], Any]
+    attrs_fn: Callable[[Any], dict[str, Any]] | None = None
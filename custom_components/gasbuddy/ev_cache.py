@@ -0,0 +1,195 @@
+"""Hub-level area cache of EV charging station records for GasBuddy."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import math
+import operator
+import time
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from homeassistant.core import HomeAssistant
+
+from .coalesce import GasBuddyRequestCoalescer
+from .const import EV_CACHE_CELL_DEG, EV_CACHE_LIMIT, EV_CACHE_RADIUS_MILES, EV_CACHE_TTL
+from .geo import MILES_PER_DEGREE, distance_miles
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Area:
+    """A fetched EV search circle and the stations it returned."""
+
+    lat: float
+    lon: float
+    radius: float
+    fetched_at: float
+    stations: list[dict[str, Any]] = field(repr=False)
+
+    def covers(self, lat: float, lon: float, radius: float) -> bool:
+        """Return True if this area holds every station of the given circle."""
+        return distance_miles(self.lat, self.lon, lat, lon) + radius <= self.radius
+
+
+@dataclass
+class _InFlight:
+    """An EV search that is being fetched right now."""
+
+    lat: float
+    lon: float
+    radius: float
+    future: asyncio.Future = field(repr=False)
+
+
+class GasBuddyEVCache:
+    """Answer nearby EV station searches from fresh, covering area queries.
+
+    Every fetched search circle is kept for ``ttl`` seconds and indexed by
+    the grid cells its bounding box touches. A later search is answered
+    from the cache when a fresh circle fully covers it; the cached stations
+    are filtered to the requested radius, re-sorted by distance from the
+    new centre and cut to the requested limit.
+
+    Searches smaller than ``radius`` miles or ``limit`` stations are widened
+    before they are sent, so neighbouring stations share one request. When
+    a response is cut short by its limit, the circle is only trusted up to
+    the farthest station it returned.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        ttl: float = EV_CACHE_TTL,
+        cell: float = EV_CACHE_CELL_DEG,
+        radius: float = EV_CACHE_RADIUS_MILES,
+        limit: int = EV_CACHE_LIMIT,
+        requests: GasBuddyRequestCoalescer | None = None,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.requests = requests if requests is not None else GasBuddyRequestCoalescer()
+        self._ttl = ttl
+        self._cell = cell
+        self._radius = radius
+        self._limit = limit
+        self._cells: dict[tuple[int, int], list[_Area]] = {}
+        self._inflight: list[_InFlight] = []
+        self.hits = 0
+        self.misses = 0
+
+    async def async_stations_nearby(
+        self,
+        api: GasBuddy,
+        lat: float,
+        lon: float,
+        radius: float,
+        limit: int,
+    ) -> dict[str, Any]:
+        """Return EV stations within ``radius`` miles, like ``ev_stations_nearby``."""
+        if (cached := self._lookup(lat, lon, radius, limit)) is not None:
+            self.hits += 1
+            return cached
+
+        for inflight in list(self._inflight):
+            if distance_miles(inflight.lat, inflight.lon, lat, lon) + radius > inflight.radius:
+                continue
+            # A failed shared search leaves nothing cached, so we fall
+            # through to our own fetch below.
+            await asyncio.shield(inflight.future)
+            if (cached := self._lookup(lat, lon, radius, limit)) is not None:
+                self.hits += 1
+                return cached
+
+        self.misses += 1
+        return await self._async_fetch(api, lat, lon, radius, limit)
+
+    def _lookup(self, lat: float, lon: float, radius: float, limit: int) -> dict[str, Any] | None:
+        """Return a cached answer if a fresh area covers the search."""
+        now = time.monotonic()
+        for area in self._cells.get(self._cell_of(lat, lon), ()):
+            if now - area.fetched_at > self._ttl or not area.covers(lat, lon, radius):
+                continue
+            return self._answer(area.stations, lat, lon, radius, limit)
+        return None
+
+    async def _async_fetch(
+        self, api: GasBuddy, lat: float, lon: float, radius: float, limit: int
+    ) -> dict[str, Any]:
+        """Fetch a widened search, cache it and answer the original one."""
+        fetch_radius = max(radius, self._radius)
+        fetch_limit = max(limit, self._limit)
+        inflight = _InFlight(lat, lon, fetch_radius, self.hass.loop.create_future())
+        self._inflight.append(inflight)
+        try:
+            result = await self.requests.async_request(
+                api,
+                "ev_stations_nearby",
+                lat=lat,
+                lon=lon,
+                radius=fetch_radius,
+                limit=fetch_limit,
+            )
+        finally:
+            self._inflight.remove(inflight)
+            inflight.future.set_result(None)
+
+        stations = [
+            station
+            for station in (result or {}).get("stations") or []
+            if station.get("latitude") is not None and station.get("longitude") is not None
+        ]
+        covered = fetch_radius
+        total = (result or {}).get("total")
+        if len(stations) >= fetch_limit or (total is not None and total > len(stations)):
+            # Results come back nearest first, so a truncated response is
+            # still complete up to the farthest station it includes.
+            covered = max(
+                (distance_miles(lat, lon, s["latitude"], s["longitude"]) for s in stations),
+                default=0.0,
+            )
+        self._store(_Area(lat, lon, covered, time.monotonic(), stations))
+        _LOGGER.debug(
+            "Cached %d EV station(s) within %.1f miles of a search centre",
+            len(stations),
+            covered,
+        )
+        return self._answer(stations, lat, lon, radius, limit)
+
+    def _store(self, area: _Area) -> None:
+        """Index an area under every grid cell its bounding box touches."""
+        now = time.monotonic()
+        for key, areas in list(self._cells.items()):
+            areas[:] = [a for a in areas if now - a.fetched_at <= self._ttl]
+            if not areas:
+                del self._cells[key]
+
+        lat_span = area.radius / MILES_PER_DEGREE
+        lon_span = lat_span / max(math.cos(math.radians(area.lat)), 0.01)
+        south, west = self._cell_of(area.lat - lat_span, area.lon - lon_span)
+        north, east = self._cell_of(area.lat + lat_span, area.lon + lon_span)
+        for row in range(south, north + 1):
+            for col in range(west, east + 1):
+                self._cells.setdefault((row, col), []).append(area)
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        """Return the grid cell of a coordinate."""
+        return math.floor(lat / self._cell), math.floor(lon / self._cell)
+
+    @staticmethod
+    def _answer(
+        stations: list[dict[str, Any]], lat: float, lon: float, radius: float, limit: int
+    ) -> dict[str, Any]:
+        """Cut cached stations down to a search, nearest first."""
+        nearby = []
+        for station in stations:
+            distance = distance_miles(lat, lon, station["latitude"], station["longitude"])
+            if distance <= radius:
+                nearby.append((distance, {**station, "distance_miles": round(distance, 2)}))
+        nearby.sort(key=operator.itemgetter(0))
+        return {"stations": [station for _, station in nearby[:limit]], "total": len(nearby)}
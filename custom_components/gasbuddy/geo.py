@@ -0,0 +1,91 @@
+"""Geographic helpers for GasBuddy."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from itertools import pairwise
+import math
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = math.pi * EARTH_RADIUS_MILES / 180
+
+
+def distance_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in miles."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def point_in_polygon(lat: float, lon: float, polygon: Sequence[Sequence[float]]) -> bool:
+    """Return True if a point lies inside a polygon of ``[lat, lon]`` vertices."""
+    inside = False
+    j = len(polygon) - 1
+    for i, (lat_i, lon_i) in enumerate(polygon):
+        lat_j, lon_j = polygon[j]
+        if (lon_i > lon) != (lon_j > lon) and lat < (lat_j - lat_i) * (lon - lon_i) / (
+            lon_j - lon_i
+        ) + lat_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def grid_points(
+    south: float, west: float, north: float, east: float, spacing: float
+) -> list[tuple[float, float]]:
+    """Return the centres of a grid of ``spacing`` mile cells over a bounding box."""
+    lat_step = spacing / MILES_PER_DEGREE
+    lon_step = lat_step / max(math.cos(math.radians((south + north) / 2)), 0.01)
+    rows = max(1, math.ceil((north - south) / lat_step))
+    cols = max(1, math.ceil((east - west) / lon_step))
+    # Centre the grid on the box so both edges get the same margin.
+    lat0 = (south + north) / 2 - (rows - 1) * lat_step / 2
+    lon0 = (west + east) / 2 - (cols - 1) * lon_step / 2
+    return [
+        (lat0 + row * lat_step, lon0 + col * lon_step) for row in range(rows) for col in range(cols)
+    ]
+
+
+def sample_polyline(points: Sequence[Sequence[float]], spacing: float) -> list[tuple[float, float]]:
+    """Return points every ``spacing`` miles along a polyline, including both ends."""
+    samples = [(float(points[0][0]), float(points[0][1]))]
+    # Distance along the line since the last sample.
+    travelled = 0.0
+    for (lat1, lon1), (lat2, lon2) in pairwise(points):
+        length = distance_miles(lat1, lon1, lat2, lon2)
+        offset = spacing - travelled
+        while offset <= length:
+            fraction = offset / length
+            samples.append((lat1 + (lat2 - lat1) * fraction, lon1 + (lon2 - lon1) * fraction))
+            offset += spacing
+        travelled = length - (offset - spacing)
+    last = (float(points[-1][0]), float(points[-1][1]))
+    if samples[-1] != last:
+        samples.append(last)
+    return samples
+
+
+def distance_to_polyline(lat: float, lon: float, points: Sequence[Sequence[float]]) -> float:
+    """Return the distance in miles from a point to the nearest part of a polyline.
+
+    Segments are measured on a flat projection around the point, which is
+    accurate to well under a percent over the few miles a detour spans.
+    """
+    lon_scale = MILES_PER_DEGREE * math.cos(math.radians(lat))
+    projected = [
+        ((p_lat - lat) * MILES_PER_DEGREE, (p_lon - lon) * lon_scale) for p_lat, p_lon in points
+    ]
+    if len(projected) == 1:
+        return math.hypot(*projected[0])
+    best = math.inf
+    for (y1, x1), (y2, x2) in pairwise(projected):
+        d_y, d_x = y2 - y1, x2 - x1
+        length_sq = d_y * d_y + d_x * d_x
+        # Position of the point's projection along the segment, clamped to it.
+        t = 0.0 if not length_sq else max(0.0, min(1.0, -(y1 * d_y + x1 * d_x) / length_sq))
+        best = min(best, math.hypot(y1 + t * d_y, x1 + t * d_x))
+    return best
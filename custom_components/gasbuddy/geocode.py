@@ -0,0 +1,135 @@
+"""Persistent postal code to coordinate cache for GasBuddy."""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    GEOCODE_MAX_CODES,
+    GEOCODE_MAX_STATIONS,
+    GEOCODE_SAVE_DELAY,
+    GEOCODE_STORE_KEY,
+    GEOCODE_STORE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_ZIP_PLUS_FOUR_RE = re.compile(r"^(\d{5})-?\d{4}$")
+
+# Station key used for the first result of a postal code search when none
+# of the returned stations carries that postal code in its address.
+_SEARCH_KEY = "search"
+
+
+def normalize_postal_code(zipcode: Any) -> str:
+    """Return a postal code without whitespace, uppercased, ZIP+4 cut to five digits."""
+    code = "".join(str(zipcode).split()).upper()
+    if match := _ZIP_PLUS_FOUR_RE.match(code):
+        return match.group(1)
+    return code
+
+
+class GasBuddyGeocodeCache:
+    """Remember where postal codes are, learned from station responses.
+
+    Every station in a GasBuddy response that has coordinates and a postal
+    code in its address is recorded under that code, up to
+    ``GEOCODE_MAX_STATIONS`` per code; the centroid of those stations is the
+    code's location. Codes are kept in ``.storage`` so postal code lookups
+    can skip the geocoding round trip after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, GEOCODE_STORE_VERSION, GEOCODE_STORE_KEY)
+        self._codes: dict[str, dict[str, list[float]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        """Load postal codes from disk."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as ex:  # noqa: BLE001
+            _LOGGER.warning("Unable to load GasBuddy postal codes, starting cold: %s", ex)
+            stored = None
+        self._codes = dict((stored or {}).get("codes") or {})
+        _LOGGER.debug("Loaded %d postal code location(s)", len(self._codes))
+
+    def get(self, zipcode: Any) -> tuple[float, float] | None:
+        """Return the centroid of a postal code's known stations."""
+        if not (stations := self._codes.get(normalize_postal_code(zipcode))):
+            self.misses += 1
+            return None
+        self.hits += 1
+        points = list(stations.values())
+        return (
+            sum(point[0] for point in points) / len(points),
+            sum(point[1] for point in points) / len(points),
+        )
+
+    @callback
+    def async_observe(self, result: Any, zipcode: Any = None) -> None:
+        """Record the stations of a GasBuddy response.
+
+        ``result`` is either a single station or a response with a
+        ``results`` list. ``zipcode`` is the postal code that was searched,
+        if any.
+        """
+        if not isinstance(result, dict):
+            return
+        stations = result.get("results") if "results" in result else [result]
+        changed = False
+        for station in stations or []:
+            if not isinstance(station, dict):
+                continue
+            lat, lon = station.get("latitude"), station.get("longitude")
+            code = (station.get("address") or {}).get("postalCode")
+            if lat is None or lon is None or not code:
+                continue
+            changed |= self._add(
+                normalize_postal_code(code), str(station.get("station_id")), lat, lon
+            )
+
+        if zipcode is not None and stations and normalize_postal_code(zipcode) not in self._codes:
+            first = stations[0] if isinstance(stations[0], dict) else {}
+            if first.get("latitude") is not None and first.get("longitude") is not None:
+                changed |= self._add(
+                    normalize_postal_code(zipcode),
+                    _SEARCH_KEY,
+                    first["latitude"],
+                    first["longitude"],
+                )
+
+        if changed:
+            self._store.async_delay_save(self._data_to_save, GEOCODE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the postal codes to disk now instead of waiting for the delayed save."""
+        await self._store.async_save(self._data_to_save())
+
+    def _add(self, code: str, station_id: str, lat: float, lon: float) -> bool:
+        """Record a station location under a postal code; return True if it changed."""
+        stations = self._codes.setdefault(code, {})
+        point = [lat, lon]
+        if stations.get(station_id) == point:
+            return False
+        if station_id not in stations and len(stations) >= GEOCODE_MAX_STATIONS:
+            return False
+        if station_id != _SEARCH_KEY:
+            # Real stations in the code replace the search result stand-in.
+            stations.pop(_SEARCH_KEY, None)
+        stations[station_id] = point
+        while len(self._codes) > GEOCODE_MAX_CODES:
+            del self._codes[next(iter(self._codes))]
+        return True
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"codes": self._codes}
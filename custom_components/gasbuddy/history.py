@@ -0,0 +1,218 @@
+"""Per-station price history for GasBuddy, kept outside the recorder."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    FUEL_KEY_CHOICES,
+    HISTORY_CAPACITY,
+    HISTORY_SAVE_DELAY,
+    HISTORY_SPACING,
+    HISTORY_STORE_KEY,
+    HISTORY_STORE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_SECONDS_PER_DAY = 86400
+
+
+class PriceRing:
+    """Fixed-size ring buffer of ``(timestamp, price)`` samples.
+
+    Timestamps and prices live in two ``array('d')`` buffers. Once full,
+    each new sample overwrites the oldest one.
+    """
+
+    __slots__ = ("_prices", "_start", "_times", "capacity")
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize."""
+        self.capacity = capacity
+        self._times = array("d")
+        self._prices = array("d")
+        self._start = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return len(self._times)
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """Yield the samples oldest first."""
+        size = len(self._times)
+        for offset in range(size):
+            index = (self._start + offset) % size
+            yield self._times[index], self._prices[index]
+
+    @property
+    def last(self) -> tuple[float, float] | None:
+        """Return the newest sample, or None when empty."""
+        if not (size := len(self._times)):
+            return None
+        index = (self._start - 1) % size
+        return self._times[index], self._prices[index]
+
+    def replace_last(self, price: float) -> None:
+        """Replace the price of the newest sample."""
+        self._prices[(self._start - 1) % len(self._prices)] = price
+
+    def append(self, timestamp: float, price: float) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        if len(self._times) < self.capacity:
+            self._times.append(timestamp)
+            self._prices.append(price)
+            return
+        self._times[self._start] = timestamp
+        self._prices[self._start] = price
+        self._start = (self._start + 1) % self.capacity
+
+    def since(self, cutoff: float) -> list[tuple[float, float]]:
+        """Return the samples taken at or after ``cutoff``, oldest first."""
+        size = len(self._times)
+        samples = []
+        for offset in range(size - 1, -1, -1):
+            index = (self._start + offset) % size
+            if self._times[index] < cutoff:
+                break
+            samples.append((self._times[index], self._prices[index]))
+        samples.reverse()
+        return samples
+
+    def as_list(self) -> list[list[float]]:
+        """Return the samples, oldest first, for storage."""
+        return [[timestamp, price] for timestamp, price in self]
+
+
+def price_stats(samples: list[tuple[float, float]]) -> dict[str, Any] | None:
+    """Return min, max, mean and least-squares slope per day of samples."""
+    if not samples:
+        return None
+    prices = [price for _, price in samples]
+    mean = sum(prices) / len(prices)
+    slope = None
+    if len(samples) > 1:
+        mean_time = sum(timestamp for timestamp, _ in samples) / len(samples)
+        variance = sum((timestamp - mean_time) ** 2 for timestamp, _ in samples)
+        if variance:
+            covariance = sum(
+                (timestamp - mean_time) * (price - mean) for timestamp, price in samples
+            )
+            slope = round(covariance / variance * _SECONDS_PER_DAY, 4)
+    return {
+        "min": min(prices),
+        "max": max(prices),
+        "mean": round(mean, 4),
+        "slope": slope,
+        "samples": len(samples),
+    }
+
+
+class GasBuddyPriceHistory:
+    """Keep a ring buffer of display prices per station and fuel.
+
+    Every good refresh of a station adds its regular (credit) price of each
+    fuel, converted from cents per liter where needed, stamped with the
+    time of the refresh. Samples are at least ``spacing`` seconds apart, so
+    a full buffer spans ``capacity * spacing`` seconds however often the
+    station polls; a refresh sooner than that updates the newest sample's
+    price instead. Buffers are keyed by subentry ID and persisted to
+    ``.storage`` so trends survive restarts without the recorder.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        capacity: int = HISTORY_CAPACITY,
+        spacing: float = HISTORY_SPACING,
+    ) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, HISTORY_STORE_VERSION, HISTORY_STORE_KEY)
+        self._capacity = capacity
+        self._spacing = spacing
+        self._stations: dict[str, dict[str, PriceRing]] = {}
+
+    async def async_load(self) -> None:
+        """Load price history from disk."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as ex:  # noqa: BLE001
+            _LOGGER.warning("Unable to load GasBuddy price history, starting cold: %s", ex)
+            stored = None
+        self._stations = {}
+        for subentry_id, fuels in ((stored or {}).get("stations") or {}).items():
+            for fuel, samples in fuels.items():
+                ring = self._ring(subentry_id, fuel)
+                for timestamp, price in samples:
+                    ring.append(timestamp, price)
+        _LOGGER.debug("Loaded price history of %d station(s)", len(self._stations))
+
+    def get(self, subentry_id: str, fuel: str, seconds: float) -> list[tuple[float, float]]:
+        """Return a station's samples of a fuel from the last ``seconds``."""
+        if (ring := self._stations.get(subentry_id, {}).get(fuel)) is None:
+            return []
+        return ring.since(time.time() - seconds)
+
+    def fuels(self, subentry_id: str) -> list[str]:
+        """Return the fuels with history for a station."""
+        return list(self._stations.get(subentry_id, {}))
+
+    @callback
+    def async_record(self, subentry_id: str, data: dict[str, Any]) -> None:
+        """Add the prices of a station's fresh data."""
+        scale = 100 if data.get("unit_of_measure") == "cents_per_liter" else 1
+        now = time.time()
+        recorded = False
+        for fuel in FUEL_KEY_CHOICES:
+            node = data.get(fuel)
+            if not isinstance(node, dict) or (price := node.get("price")) is None:
+                continue
+            price /= scale
+            ring = self._ring(subentry_id, fuel)
+            if (last := ring.last) is None or now - last[0] >= self._spacing:
+                ring.append(now, price)
+            elif last[1] != price:
+                ring.replace_last(price)
+            else:
+                continue
+            recorded = True
+        if recorded:
+            self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the price history to disk now instead of waiting for the delayed save."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_prune(self, subentry_ids: set[str]) -> None:
+        """Drop the history of subentries that no longer exist."""
+        removed = set(self._stations) - subentry_ids
+        if not removed:
+            return
+        for subentry_id in removed:
+            del self._stations[subentry_id]
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    def _ring(self, subentry_id: str, fuel: str) -> PriceRing:
+        """Return a station's ring buffer of a fuel, creating it if needed."""
+        fuels = self._stations.setdefault(subentry_id, {})
+        if (ring := fuels.get(fuel)) is None:
+            ring = fuels[fuel] = PriceRing(self._capacity)
+        return ring
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "stations": {
+                subentry_id: {fuel: ring.as_list() for fuel, ring in fuels.items()}
+                for subentry_id, fuels in self._stations.items()
+            }
+        }
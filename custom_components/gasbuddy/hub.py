@@ -0,0 +1,128 @@
+"""Hub-scoped runtime state for GasBuddy."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .area import GasBuddyAreaSnapshots
+from .batch import GasBuddyPriceBatcher
+from .breaker import GasBuddyCircuitBreaker
+from .client import GasBuddyClientPool, async_create_client
+from .coalesce import GasBuddyRequestCoalescer
+from .const import CONF_TIMEOUT, DEFAULT_TIMEOUT, DOMAIN, HUB
+from .ev_cache import GasBuddyEVCache
+from .geocode import GasBuddyGeocodeCache
+from .history import GasBuddyPriceHistory
+from .metrics import GasBuddyCallCounter, GasBuddyRequestMetrics
+from .snapshot import GasBuddySnapshotStore
+from .spatial import GasBuddyStationIndex
+
+
+class GasBuddyHub:
+    """Runtime state shared by every station coordinator of a hub entry."""
+
+    def __init__(self, hass: HomeAssistant, config: ConfigEntry) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._config = config
+        self.calls = GasBuddyCallCounter()
+        self.metrics = GasBuddyRequestMetrics()
+        self.clients = GasBuddyClientPool(
+            hass, timeout=config.data.get(CONF_TIMEOUT) or DEFAULT_TIMEOUT
+        )
+        self.geocodes = GasBuddyGeocodeCache(hass)
+        self.breaker = GasBuddyCircuitBreaker()
+        self.stations = GasBuddyStationIndex()
+        self.requests = GasBuddyRequestCoalescer(
+            calls=self.calls,
+            geocodes=self.geocodes,
+            breaker=self.breaker,
+            metrics=self.metrics,
+            stations=self.stations,
+        )
+        self.batcher = GasBuddyPriceBatcher(hass, requests=self.requests)
+        self.ev_cache = GasBuddyEVCache(hass, requests=self.requests)
+        self.areas = GasBuddyAreaSnapshots(requests=self.requests)
+        self.snapshots = GasBuddySnapshotStore(hass)
+        self.history = GasBuddyPriceHistory(hass)
+
+    async def async_load(self) -> None:
+        """Load persisted hub state."""
+        await self.snapshots.async_load()
+        await self.geocodes.async_load()
+        await self.history.async_load()
+        self.snapshots.async_prune(set(self._config.subentries))
+        self.history.async_prune(set(self._config.subentries))
+
+    async def async_unload(self) -> None:
+        """Write persisted hub state before the entry unloads.
+
+        A reload builds new stores that read from disk, so pending delayed
+        saves must land first or recent changes are lost.
+        """
+        await self.snapshots.async_flush()
+        await self.geocodes.async_flush()
+        await self.history.async_flush()
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> GasBuddyHub | None:
+    """Return the loaded hub, if any."""
+    for runtime in hass.data.get(DOMAIN, {}).values():
+        if isinstance(runtime, dict) and (hub := runtime.get(HUB)) is not None:
+            return hub
+    return None
+
+
+@callback
+def async_get_coalescer(hass: HomeAssistant) -> GasBuddyRequestCoalescer:
+    """Return the loaded hub's coalescer, or a private one when no hub is loaded."""
+    if (hub := async_get_hub(hass)) is not None:
+        return hub.requests
+    return GasBuddyRequestCoalescer()
+
+
+@callback
+def async_get_geocodes(hass: HomeAssistant) -> GasBuddyGeocodeCache | None:
+    """Return the loaded hub's postal code cache, if any."""
+    if (hub := async_get_hub(hass)) is not None:
+        return hub.geocodes
+    return None
+
+
+@callback
+def async_get_history(hass: HomeAssistant) -> GasBuddyPriceHistory | None:
+    """Return the loaded hub's price history, if any."""
+    if (hub := async_get_hub(hass)) is not None:
+        return hub.history
+    return None
+
+
+@callback
+def async_get_stations(hass: HomeAssistant) -> GasBuddyStationIndex | None:
+    """Return the loaded hub's station index, if any."""
+    if (hub := async_get_hub(hass)) is not None:
+        return hub.stations
+    return None
+
+
+@callback
+def async_get_client(
+    hass: HomeAssistant,
+    solver: str | None = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    station_id: Any = None,
+) -> GasBuddy:
+    """Return a pooled client from the loaded hub, or a new one when no hub is loaded.
+
+    Pooled clients use the hub's timeout; ``timeout`` only applies to a new one.
+    Pass ``station_id`` for a client whose ``price_lookup()`` queries that station.
+    """
+    if (hub := async_get_hub(hass)) is not None:
+        return hub.clients.async_get(solver, station_id)
+    return async_create_client(hass, solver, timeout, station_id)
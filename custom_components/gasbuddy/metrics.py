@@ -0,0 +1,157 @@
+"""Upstream request metrics for GasBuddy."""
+
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from py_gasbuddy import GasBuddy
+
+from homeassistant.core import callback
+
+from .breaker import is_timeout
+from .const import METRICS_LATENCY_BUCKETS, METRICS_WINDOW
+
+
+class GasBuddyCallCounter:
+    """Count upstream GasBuddy requests over a rolling window."""
+
+    def __init__(self, window: float = METRICS_WINDOW) -> None:
+        """Initialize."""
+        self._window = window
+        self._calls: deque[float] = deque()
+        self.total = 0
+
+    @callback
+    def record(self) -> None:
+        """Record one upstream request."""
+        self._calls.append(time.monotonic())
+        self.total += 1
+
+    @property
+    def calls_per_day(self) -> int:
+        """Return the number of upstream requests made in the last window."""
+        cutoff = time.monotonic() - self._window
+        while self._calls and self._calls[0] < cutoff:
+            self._calls.popleft()
+        return len(self._calls)
+
+
+def _percentile(buckets: list[int], latency_max: float, quantile: float) -> float | None:
+    """Return the upper bound of the histogram bucket holding a quantile."""
+    if not (count := sum(buckets)):
+        return None
+    rank = quantile * count
+    seen = 0
+    for bound, hits in zip(METRICS_LATENCY_BUCKETS, buckets, strict=False):
+        seen += hits
+        if seen >= rank:
+            return min(bound, latency_max)
+    return latency_max
+
+
+@dataclass(slots=True)
+class OperationMetrics:
+    """Outcomes and latency histogram of one GasBuddy operation."""
+
+    success: int = 0
+    error: int = 0
+    timeout: int = 0
+    # One bucket per METRICS_LATENCY_BUCKETS bound plus one for slower requests.
+    latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+    )
+    latency_max: float = 0.0
+
+    @property
+    def count(self) -> int:
+        """Return the number of requests sent."""
+        return self.success + self.error + self.timeout
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return an upper estimate of a latency quantile in seconds."""
+        return _percentile(self.latency_buckets, self.latency_max, quantile)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        bounds = [f"<={bound:g}s" for bound in METRICS_LATENCY_BUCKETS]
+        return {
+            "success": self.success,
+            "error": self.error,
+            "timeout": self.timeout,
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+            "latency_max": round(self.latency_max, 3),
+            "latency_buckets": dict(
+                zip(
+                    [*bounds, f">{METRICS_LATENCY_BUCKETS[-1]:g}s"],
+                    self.latency_buckets,
+                    strict=True,
+                )
+            ),
+        }
+
+
+class GasBuddyRequestMetrics:
+    """Collect per-operation metrics of the requests sent to GasBuddy.
+
+    Every request that goes upstream is recorded once with its latency and
+    outcome: a result, a timeout or another error. Requests are also
+    counted by whether they went through the FlareSolverr solver or
+    directly.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.operations: dict[str, OperationMetrics] = {}
+        self.paths = {"direct": 0, "solver": 0}
+
+    @callback
+    def record(
+        self,
+        operation: str,
+        api: GasBuddy,
+        elapsed: float,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record one upstream request."""
+        metrics = self.operations.setdefault(operation, OperationMetrics())
+        if error is None:
+            metrics.success += 1
+        elif is_timeout(error):
+            metrics.timeout += 1
+        else:
+            metrics.error += 1
+        metrics.latency_buckets[bisect.bisect_left(METRICS_LATENCY_BUCKETS, elapsed)] += 1
+        metrics.latency_max = max(metrics.latency_max, elapsed)
+        self.paths["solver" if getattr(api, "_solver", None) else "direct"] += 1
+
+    @property
+    def errors(self) -> int:
+        """Return the number of failed requests, timeouts excluded."""
+        return sum(metrics.error for metrics in self.operations.values())
+
+    @property
+    def timeouts(self) -> int:
+        """Return the number of timed out requests."""
+        return sum(metrics.timeout for metrics in self.operations.values())
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return an upper estimate of a latency quantile over every operation."""
+        buckets = [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+        for metrics in self.operations.values():
+            buckets = [a + b for a, b in zip(buckets, metrics.latency_buckets, strict=True)]
+        latency_max = max((m.latency_max for m in self.operations.values()), default=0.0)
+        return _percentile(buckets, latency_max, quantile)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "operations": {
+                operation: metrics.as_dict() for operation, metrics in self.operations.items()
+            },
+            "paths": dict(self.paths),
+        }
@@ -0,0 +1,341 @@
+"""Track every station in a region with a single GasBuddy coordinator."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import starmap
+import logging
+import math
+import time
+from typing import Any
+
+from py_gasbuddy.exceptions import APIError, CSRFTokenMissing, LibraryError
+
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .breaker import CircuitOpenError
+from .const import (
+    CONF_FUELS,
+    CONF_INTERVAL,
+    CONF_POLYGON,
+    CONF_RADIUS,
+    CONF_REQUEST_BUDGET,
+    CONF_SOLVER,
+    DEFAULT_INTERVAL,
+    DEFAULT_REGION_RADIUS,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+    FUEL_KEY_CHOICES,
+    REGION_CONCURRENCY,
+    REGION_TILE_LIMIT,
+    REGION_TILE_MILES,
+    UNIT_OF_MEASURE,
+)
+from .coordinator import format_address
+from .geo import MILES_PER_DEGREE, distance_miles, grid_points, point_in_polygon
+from .hub import GasBuddyHub
+
+_LOGGER = logging.getLogger(__name__)
+
+_LOOKUP_ERRORS = (APIError, LibraryError, CSRFTokenMissing, CircuitOpenError, TimeoutError)
+
+
+class RegionArea:
+    """A circle, or a polygon of ``[lat, lon]`` vertices, to track stations in."""
+
+    __slots__ = ("lat", "lon", "polygon", "radius")
+
+    def __init__(
+        self,
+        lat: float,
+        lon: float,
+        radius: float,
+        polygon: Sequence[Sequence[float]] | None = None,
+    ) -> None:
+        """Initialize."""
+        self.lat = lat
+        self.lon = lon
+        self.radius = radius
+        self.polygon = [(float(vertex[0]), float(vertex[1])) for vertex in polygon or ()]
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Return True if a point lies in the area."""
+        if self.polygon:
+            return point_in_polygon(lat, lon, self.polygon)
+        return distance_miles(self.lat, self.lon, lat, lon) <= self.radius
+
+    def tiles(self, spacing: float = REGION_TILE_MILES) -> list[tuple[float, float]]:
+        """Return query points ``spacing`` miles apart that cover the area."""
+        if self.polygon:
+            south = min(vertex[0] for vertex in self.polygon)
+            north = max(vertex[0] for vertex in self.polygon)
+            west = min(vertex[1] for vertex in self.polygon)
+            east = max(vertex[1] for vertex in self.polygon)
+        else:
+            lat_span = self.radius / MILES_PER_DEGREE
+            lon_span = lat_span / max(math.cos(math.radians(self.lat)), 0.01)
+            south, north = self.lat - lat_span, self.lat + lat_span
+            west, east = self.lon - lon_span, self.lon + lon_span
+        points = grid_points(south, west, north, east, spacing)
+        lat_half = spacing / MILES_PER_DEGREE / 2
+        lon_half = lat_half / max(math.cos(math.radians((south + north) / 2)), 0.01)
+        # Keep every cell that touches the area at its centre or a corner.
+        return [
+            (lat, lon)
+            for lat, lon in points
+            if any(
+                self.contains(lat + d_lat, lon + d_lon)
+                for d_lat, d_lon in (
+                    (0, 0),
+                    (-lat_half, -lon_half),
+                    (-lat_half, lon_half),
+                    (lat_half, -lon_half),
+                    (lat_half, lon_half),
+                )
+            )
+        ] or [(self.lat, self.lon)]
+
+
+@dataclass(slots=True)
+class RegionStation:
+    """The latest prices of one station in a region."""
+
+    station_id: str
+    name: str | None
+    address: str | None
+    latitude: float
+    longitude: float
+    # Display price per fuel, converted from cents per liter where needed.
+    prices: dict[str, float] = field(repr=False)
+    seen: float = field(repr=False, compare=False)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the station for service responses."""
+        return {
+            "station_id": self.station_id,
+            "name": self.name,
+            "address": self.address,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "prices": dict(self.prices),
+        }
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Return a percentile of sorted values, interpolating between neighbours."""
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RegionIndex:
+    """Latest prices of every station seen in a region, keyed by station ID.
+
+    Stations returned by several overlapping tiles are stored once; the most
+    recent record wins. Per-fuel price lists are sorted once after a change
+    and reused by every statistic and query until the next change.
+    """
+
+    __slots__ = ("_sorted", "_stations")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._stations: dict[str, RegionStation] = {}
+        self._sorted: dict[str, list[tuple[float, str]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stations indexed."""
+        return len(self._stations)
+
+    def update(self, stations: Iterable[dict[str, Any]], area: RegionArea, seen: float) -> int:
+        """Record the stations of a lookup that lie in the area; return how many."""
+        recorded = 0
+        for station in stations:
+            lat, lon = station.get("latitude"), station.get("longitude")
+            station_id = str(station.get("station_id") or station.get("id") or "")
+            if lat is None or lon is None or not station_id or not area.contains(lat, lon):
+                continue
+            scale = 100 if station.get("unit_of_measure") == "cents_per_liter" else 1
+            prices = {
+                fuel: price / scale
+                for fuel in FUEL_KEY_CHOICES
+                if isinstance(node := station.get(fuel), dict)
+                and (price := node.get("price")) is not None
+            }
+            self._stations[station_id] = RegionStation(
+                station_id,
+                station.get("name"),
+                format_address(station.get("address")),
+                lat,
+                lon,
+                prices,
+                seen,
+            )
+            recorded += 1
+        if recorded:
+            self._sorted.clear()
+        return recorded
+
+    def expire(self, cutoff: float) -> int:
+        """Drop stations last seen before ``cutoff``; return how many."""
+        expired = [sid for sid, station in self._stations.items() if station.seen < cutoff]
+        for station_id in expired:
+            del self._stations[station_id]
+        if expired:
+            self._sorted.clear()
+        return len(expired)
+
+    def _prices(self, fuel: str) -> list[tuple[float, str]]:
+        """Return ``(price, station_id)`` of every station selling a fuel, cheapest first."""
+        if (ordered := self._sorted.get(fuel)) is None:
+            ordered = self._sorted[fuel] = sorted(
+                (price, station_id)
+                for station_id, station in self._stations.items()
+                if (price := station.prices.get(fuel)) is not None
+            )
+        return ordered
+
+    def stats(self, fuel: str) -> dict[str, Any] | None:
+        """Return the min, median and 90th percentile price of a fuel."""
+        if not (ordered := self._prices(fuel)):
+            return None
+        prices = [price for price, _ in ordered]
+        return {
+            "min": prices[0],
+            "median": round(_percentile(prices, 0.5), 3),
+            "p90": round(_percentile(prices, 0.9), 3),
+            "stations": len(prices),
+            "cheapest": ordered[0][1],
+        }
+
+    def query(self, fuel: str, limit: int, max_price: float | None = None) -> list[dict[str, Any]]:
+        """Return up to ``limit`` stations selling a fuel, cheapest first."""
+        results = []
+        for price, station_id in self._prices(fuel):
+            if len(results) >= limit or (max_price is not None and price > max_price):
+                break
+            results.append({**self._stations[station_id].as_dict(), "price": price})
+        return results
+
+    def get(self, station_id: str | None) -> RegionStation | None:
+        """Return an indexed station."""
+        return self._stations.get(station_id)
+
+
+class GasBuddyRegionCoordinator(DataUpdateCoordinator):
+    """Poll a region's tiles and keep the latest price of every station in it.
+
+    The region is covered by query points ``REGION_TILE_MILES`` apart. Each
+    refresh looks up at most ``request_budget`` of them, in rotation, so
+    a large region is covered over several polls at a fixed upstream cost;
+    every lookup goes through the hub's coalescer and circuit breaker.
+    Stations not returned for two full rotations are dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: ConfigEntry,
+        subentry: ConfigSubentry,
+        hub: GasBuddyHub,
+    ) -> None:
+        """Initialize."""
+        self._subentry = subentry
+        self._hub = hub
+        data = subentry.data
+        self.area = RegionArea(
+            data.get(CONF_LATITUDE, hass.config.latitude),
+            data.get(CONF_LONGITUDE, hass.config.longitude),
+            data.get(CONF_RADIUS, DEFAULT_REGION_RADIUS),
+            data.get(CONF_POLYGON),
+        )
+        self.tiles = self.area.tiles()
+        self.fuels: list[str] = list(data.get(CONF_FUELS) or ["regular_gas"])
+        self.index = RegionIndex()
+        self._budget = max(
+            1, min(data.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET), len(self.tiles))
+        )
+        self._cursor = 0
+        self._unit: str | None = None
+        self._api = hub.clients.async_get(config.data.get(CONF_SOLVER))
+        interval = timedelta(seconds=data.get(CONF_INTERVAL, DEFAULT_INTERVAL))
+        # A station missing from two full rotations has left the area's results.
+        self._max_age = 2 * math.ceil(len(self.tiles) / self._budget) * interval.total_seconds()
+        _LOGGER.debug(
+            "Region %s covered by %d tile(s), %d per refresh",
+            subentry.title,
+            len(self.tiles),
+            self._budget,
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config,
+            name=f"{DOMAIN} region",
+            update_interval=interval,
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Look up the next tiles and summarise the index."""
+        batch = [
+            self.tiles[(self._cursor + offset) % len(self.tiles)] for offset in range(self._budget)
+        ]
+        self._cursor = (self._cursor + self._budget) % len(self.tiles)
+        semaphore = asyncio.Semaphore(REGION_CONCURRENCY)
+
+        async def _lookup(lat: float, lon: float) -> Any:
+            async with semaphore:
+                return await self._hub.requests.async_request(
+                    self._api, "price_lookup_service", lat=lat, lon=lon, limit=REGION_TILE_LIMIT
+                )
+
+        results = await asyncio.gather(*starmap(_lookup, batch), return_exceptions=True)
+        now = time.monotonic()
+        errors = []
+        for result in results:
+            if isinstance(result, _LOOKUP_ERRORS):
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                stations = (result or {}).get("results") or []
+                self.index.update(stations, self.area, now)
+                self._observe_unit(stations)
+        if len(errors) == len(results):
+            raise UpdateFailed(f"Region lookup failed: {errors[0]}") from errors[0]
+        if errors:
+            _LOGGER.debug("%d of %d region tile lookup(s) failed", len(errors), len(results))
+
+        expired = self.index.expire(now - self._max_age)
+        _LOGGER.debug(
+            "Region %s indexes %d station(s) after %d lookup(s), %d expired",
+            self._subentry.title,
+            len(self.index),
+            len(results) - len(errors),
+            expired,
+        )
+        return {
+            "stations": len(self.index),
+            "tiles": len(self.tiles),
+            "tiles_refreshed": len(results) - len(errors),
+            "unit": self._unit,
+            "fuels": {fuel: self.index.stats(fuel) for fuel in self.fuels},
+            "last_updated": datetime.now(UTC),
+        }
+
+    def _observe_unit(self, stations: list[dict[str, Any]]) -> None:
+        """Remember the region's price unit from the first station that has one."""
+        if self._unit is not None:
+            return
+        for station in stations:
+            uom, currency = station.get("unit_of_measure"), station.get("currency")
+            if uom is not None and currency is not None:
+                self._unit = f"{currency}/{UNIT_OF_MEASURE.get(uom, uom)}"
+                return
@@ -0,0 +1,57 @@
+"""In-memory LRU+TTL cache of GasBuddy service responses."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import copy
+import time
+from typing import Any
+
+from .const import DEFAULT_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_TTL
+
+
+class GasBuddyResponseCache:
+    """Remember recent lookup results by normalised arguments.
+
+    Entries expire ``ttl`` seconds after they were stored, and the least
+    recently used entry is dropped once ``size`` entries exist. A ``ttl`` of
+    zero disables the cache. Callers get their own shallow copy of a cached
+    result, like callers joining a coalesced request.
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_RESPONSE_CACHE_TTL, size: int = DEFAULT_RESPONSE_CACHE_SIZE
+    ) -> None:
+        """Initialize."""
+        self._ttl = ttl
+        self._size = size
+        self._entries: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[Any, ...]) -> Any:
+        """Return a fresh cached result, or None."""
+        if (entry := self._entries.get(key)) is None or time.monotonic() - entry[0] > self._ttl:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.copy(entry[1])
+
+    def set(self, key: tuple[Any, ...], result: Any) -> None:
+        """Store a result, evicting the least recently used entry if full."""
+        if self._ttl <= 0 or self._size <= 0:
+            return
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        return len(self._entries)
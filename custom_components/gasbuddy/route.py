@@ -0,0 +1,133 @@
+"""Find the cheapest station along a route for GasBuddy cheapest trackers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from itertools import pairwise, starmap
+import logging
+from typing import Any
+
+from py_gasbuddy.exceptions import APIError, CSRFTokenMissing, LibraryError
+
+from .breaker import CircuitOpenError
+from .const import (
+    ROUTE_CONCURRENCY,
+    ROUTE_MAX_SAMPLES,
+    ROUTE_SAMPLE_MILES,
+    ROUTE_SNAP_DECIMALS,
+    ROUTE_TRAIL_MILES,
+    ROUTE_TRAIL_POINTS,
+    ROUTE_TRAIL_WINDOW,
+)
+from .geo import distance_miles, distance_to_polyline, sample_polyline
+
+_LOGGER = logging.getLogger(__name__)
+
+_LOOKUP_ERRORS = (APIError, LibraryError, CSRFTokenMissing, CircuitOpenError, TimeoutError)
+
+
+class RouteTrail:
+    """Recent positions of a followed entity, at least ``spacing`` miles apart."""
+
+    __slots__ = ("_points", "_spacing", "_window")
+
+    def __init__(
+        self,
+        spacing: float = ROUTE_TRAIL_MILES,
+        window: float = ROUTE_TRAIL_WINDOW,
+        size: int = ROUTE_TRAIL_POINTS,
+    ) -> None:
+        """Initialize."""
+        self._spacing = spacing
+        self._window = window
+        self._points: deque[tuple[float, float, float]] = deque(maxlen=size)
+
+    def add(self, lat: float, lon: float, when: float) -> bool:
+        """Record a position seen at ``when``; return True if it was kept."""
+        if self._points:
+            last_lat, last_lon, _ = self._points[-1]
+            if distance_miles(last_lat, last_lon, lat, lon) < self._spacing:
+                return False
+        self._points.append((lat, lon, when))
+        return True
+
+    def points(self, now: float) -> list[tuple[float, float]]:
+        """Return the positions seen within the window, oldest first."""
+        while self._points and self._points[0][2] < now - self._window:
+            self._points.popleft()
+        return [(lat, lon) for lat, lon, _ in self._points]
+
+
+def route_samples(
+    waypoints: Sequence[Sequence[float]],
+    spacing: float = ROUTE_SAMPLE_MILES,
+    limit: int = ROUTE_MAX_SAMPLES,
+) -> list[tuple[float, float]]:
+    """Return the query points that cover a route, at most ``limit`` of them.
+
+    Points are spread ``spacing`` miles apart, or further on routes too
+    long for ``limit`` points, and rounded so that driving the same road
+    again produces the same query points.
+    """
+    length = sum(distance_miles(*start, *end) for start, end in pairwise(waypoints))
+    if limit > 1:
+        spacing = max(spacing, length / (limit - 1))
+    samples = sample_polyline(waypoints, spacing) if length else [tuple(waypoints[0])]
+    snapped = dict.fromkeys(
+        (round(lat, ROUTE_SNAP_DECIMALS), round(lon, ROUTE_SNAP_DECIMALS)) for lat, lon in samples
+    )
+    return list(snapped)[:limit]
+
+
+def route_detours(
+    stations: Sequence[dict[str, Any]], waypoints: Sequence[Sequence[float]]
+) -> list[float]:
+    """Return the miles each station adds to the route: there and back from the nearest point.
+
+    Stations without coordinates cannot be placed on the route and get an
+    infinite detour.
+    """
+    detours = []
+    for station in stations:
+        lat, lon = station.get("latitude"), station.get("longitude")
+        if lat is None or lon is None:
+            detours.append(float("inf"))
+        else:
+            detours.append(2 * distance_to_polyline(lat, lon, waypoints))
+    return detours
+
+
+async def async_route_lookup(
+    lookup: Callable[[float, float], Awaitable[dict[str, Any]]],
+    samples: Sequence[tuple[float, float]],
+) -> list[dict[str, Any]]:
+    """Look up every query point and merge the stations, each station once.
+
+    Up to ``ROUTE_CONCURRENCY`` lookups run at a time. A lookup that fails
+    with a GasBuddy error is skipped as long as another one succeeded;
+    otherwise the first error is raised.
+    """
+    semaphore = asyncio.Semaphore(ROUTE_CONCURRENCY)
+
+    async def _bounded(lat: float, lon: float) -> dict[str, Any]:
+        async with semaphore:
+            return await lookup(lat, lon)
+
+    results = await asyncio.gather(*starmap(_bounded, samples), return_exceptions=True)
+    merged: dict[str, dict[str, Any]] = {}
+    errors = []
+    for result in results:
+        if isinstance(result, _LOOKUP_ERRORS):
+            errors.append(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            for station in result.get("results") or []:
+                merged.setdefault(str(station.get("station_id") or station.get("id")), station)
+    if len(errors) == len(results):
+        raise errors[0]
+    if errors:
+        _LOGGER.debug("%d of %d route lookup(s) failed", len(errors), len(results))
+    return list(merged.values())
@@ -0,0 +1,36 @@
+"""Price scoring of cheapest gas candidates."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import math
+from typing import Any
+
+# Price fields considered by each price type; the lowest adjusted one wins.
+SCORING_FIELDS = {
+    "best": ("deal_price", "cash_price", "price"),
+    "deal": ("deal_price",),
+    "cash": ("cash_price",),
+}
+_DEFAULT_FIELDS = ("price",)
+
+
+def score_stations(
+    stations: Sequence[dict[str, Any]],
+    fuel_key: str,
+    price_type: str,
+    adjustments: Sequence[float],
+) -> list[float]:
+    """Return each station's adjusted price for the price type.
+
+    Stations without a price for the type score ``inf``. Candidate sets are
+    a few dozen stations at most, too small for NumPy to pay off, so they
+    are scored in a single pass in Python.
+    """
+    fields = SCORING_FIELDS.get(price_type, _DEFAULT_FIELDS)
+    scores = []
+    for station, adjustment in zip(stations, adjustments, strict=True):
+        node = station.get(fuel_key) or {}
+        prices = [price for field in fields if (price := node.get(field)) is not None]
+        scores.append(min(prices) + adjustment if prices else math.inf)
+    return scores
@@ -6,10 +6,11 @@ import dataclasses
 import logging
 from typing import Any
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.const import ATTR_ATTRIBUTION, ATTR_LATITUDE, ATTR_LONGITUDE
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import ATTR_ATTRIBUTION, ATTR_ENTITY_PICTURE, ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util.dt import as_utc, parse_datetime
@@ -19,19 +20,30 @@ from .const import (
     CONF_CHEAPEST,
     CONF_EV_CHARGING,
     CONF_FETCH_GAS,
+    CONF_FUEL_KEY,
     CONF_GPS,
     CONF_NAME,
+    CONF_RANK_SENSORS,
     CONF_SHOW_DISCOUNTED,
     CONF_STATION_ID,
+    CONF_TOP_K,
     CONF_UOM,
     COORDINATOR,
+    DEFAULT_TOP_K,
     DOMAIN,
     FUEL_KEY_CHOICES,
+    HISTORY_WINDOWS,
+    HUB,
+    HUB_SENSOR_TYPES,
+    REGION_STATS,
+    REGIONS,
     SENSOR_TYPES,
-    UNIT_OF_MEASURE,
 )
-from .coordinator import GasBuddyUpdateCoordinator, format_address
-from .entity import GasBuddySensorEntityDescription
+from .coordinator import GasBuddyUpdateCoordinator
+from .entity import GasBuddyHubSensorEntityDescription, GasBuddySensorEntityDescription
+from .history import GasBuddyPriceHistory, price_stats
+from .hub import GasBuddyHub
+from .region import GasBuddyRegionCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +55,7 @@ async def async_setup_entry(
     coordinators: dict[str, GasBuddyUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id][
         COORDINATOR
     ]
+    hub: GasBuddyHub | None = hass.data[DOMAIN][entry.entry_id].get(HUB)
 
     for subentry in entry.subentries.values():
         if subentry.subentry_type != "station":
@@ -97,14 +110,71 @@ async def async_setup_entry(
             mod_desc = dataclasses.replace(description, entity_registry_enabled_default=enabled)
             sensors.append(GasBuddySensor(mod_desc, coordinator, entry, subentry))
 
+        if subentry.data.get(CONF_CHEAPEST) and subentry.data.get(CONF_RANK_SENSORS):
+            sensors.extend(
+                GasBuddyRankSensor(coordinator, entry, subentry, rank)
+                for rank in range(2, subentry.data.get(CONF_TOP_K, DEFAULT_TOP_K) + 1)
+            )
+
+        if hub is not None and fetch_gas:
+            trend_fuels = (
+                [subentry.data.get(CONF_FUEL_KEY, "regular_gas")]
+                if subentry.data.get(CONF_CHEAPEST)
+                else FUEL_KEY_CHOICES
+            )
+            sensors.extend(
+                GasBuddyTrendSensor(coordinator, entry, subentry, hub.history, fuel, window)
+                for fuel in trend_fuels
+                for window in HISTORY_WINDOWS
+            )
+
         async_add_entities(sensors, False, config_subentry_id=subentry.subentry_id)
 
+    regions: dict[str, GasBuddyRegionCoordinator] = hass.data[DOMAIN][entry.entry_id].get(
+        REGIONS, {}
+    )
+    for subentry_id, region in regions.items():
+        async_add_entities(
+            (
+                GasBuddyRegionSensor(region, entry.subentries[subentry_id], fuel, stat)
+                for fuel in region.fuels
+                for stat in REGION_STATS
+            ),
+            False,
+            config_subentry_id=subentry_id,
+        )
+
+    if hub is not None:
+        async_add_entities(
+            GasBuddyHubSensor(description, hub, entry) for description in HUB_SENSOR_TYPES
+        )
+
 
 class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-many-instance-attributes
     """Implementation of a GasBuddy sensor."""
 
     coordinator: GasBuddyUpdateCoordinator
 
+    # Station details rarely change but would be stored again with every
+    # price change; they stay on the state, just not in the recorder.
+    _unrecorded_attributes = frozenset({
+        ATTR_ENTITY_PICTURE,
+        ATTR_LATITUDE,
+        ATTR_LONGITUDE,
+        "access_hours",
+        "address",
+        "amenities",
+        "formatted_price",
+        "network",
+        "phone",
+        "pricing",
+        "runner_ups",
+        "star_rating",
+        "station_address",
+        "station_name",
+        "website",
+    })
+
     def __init__(
         self,
         sensor_description: GasBuddySensorEntityDescription,
@@ -113,7 +183,7 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
         subentry: ConfigSubentry | None = None,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=sensor_description.key)
         self._config = config
         if subentry is None and config.subentries:
             subentry = next(iter(config.subentries.values()))
@@ -131,6 +201,12 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
         self._cash = sensor_description.cash
         self._deal = sensor_description.deal
         self._price = sensor_description.price
+        if self._deal:
+            self._price_field = "deal_price"
+        elif self._cash:
+            self._price_field = "cash_price"
+        else:
+            self._price_field = "price"
 
         self._attr_icon = sensor_description.icon
         self._attr_name = f"{self._subentry.data.get(CONF_NAME, subentry.title)} {self._name}"
@@ -178,23 +254,13 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
                 return val.lower()
             return val
 
-        if self._deal:
-            price = data[self._type].get("deal_price")
-        elif self._cash:
-            price = data[self._type].get("cash_price")
-        else:
-            price = data[self._type].get("price")
-
-        if price is None:
+        view = self.coordinator.view
+        if (prices := view.prices.get(self._type, {}).get(self._price_field)) is None:
             return None
 
-        adjustment = self.coordinator.get_brand_adjustment()
-        display_price = price
+        display_price, discounted_price = prices
         if self._get_setting(CONF_SHOW_DISCOUNTED, False):
-            display_price = price + adjustment
-
-        if data.get("unit_of_measure") == "cents_per_liter":
-            self._state = display_price / 100
+            self._state = discounted_price
         else:
             self._state = display_price
 
@@ -204,18 +270,13 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
     @property
     def native_unit_of_measurement(self) -> Any:
         """Return the unit of measurement."""
-        if not (data := self.coordinator.data) or not self._price:
+        if not self.coordinator.data or not self._price:
             return None
 
-        uom = data.get("unit_of_measure")
-        currency = data.get("currency")
-
+        view = self.coordinator.view
         if self._get_setting(CONF_UOM):
-            if uom is not None and currency is not None:
-                return f"{currency}/{UNIT_OF_MEASURE.get(uom, uom)}"
-        elif currency is not None:
-            return currency
-        return None
+            return view.unit
+        return view.currency
 
     def _ev_attributes(self, data: dict) -> dict[str, Any] | None:
         """Return EV and non-price sensor attributes."""
@@ -260,8 +321,9 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
         if self._type not in data:
             return None
 
-        if credit := data[self._type].get("credit"):
-            attrs[ATTR_ATTRIBUTION] = f"{credit} via GasBuddy"
+        view = self.coordinator.view
+        if attribution := view.attribution.get(self._type):
+            attrs[ATTR_ATTRIBUTION] = attribution
 
         attrs["last_updated"] = data[self._type].get("last_updated")
         attrs[CONF_STATION_ID] = data.get(CONF_STATION_ID)
@@ -274,30 +336,32 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
             attrs["phone"] = phone
         if rating := data.get("star_rating"):
             attrs["star_rating"] = rating
-        if addr := data.get("address"):
-            if formatted := format_address(addr):
-                attrs["address"] = formatted
-        if amenities := data.get("amenities"):
-            attrs["amenities"] = ", ".join(a["name"] for a in amenities if a.get("name"))
+        if view.address:
+            attrs["address"] = view.address
+        if view.amenities is not None:
+            attrs["amenities"] = view.amenities
 
         if self._get_setting(CONF_GPS):
             attrs[ATTR_LATITUDE] = data.get(ATTR_LATITUDE)
             attrs[ATTR_LONGITUDE] = data.get(ATTR_LONGITUDE)
 
-        if self._deal:
-            price = data[self._type].get("deal_price")
-        elif self._cash:
-            price = data[self._type].get("cash_price")
-        else:
-            price = data[self._type].get("price")
+        if self.coordinator.stale:
+            attrs["stale"] = True
+            attrs["stale_since"] = self.coordinator.stale_since
 
-        if price is not None:
-            adjustment = self.coordinator.get_brand_adjustment()
-            if adjustment != 0.0:
-                if data.get("unit_of_measure") == "cents_per_liter":
-                    attrs["discounted_price"] = (price + adjustment) / 100
-                else:
-                    attrs["discounted_price"] = price + adjustment
+        if (
+            self._price_field == "price"
+            and self._type == self._subentry.data.get(CONF_FUEL_KEY)
+            and (runner_ups := data.get("runner_ups")) is not None
+        ):
+            attrs["runner_ups"] = runner_ups
+            if (detour := data.get("detour_miles")) is not None:
+                attrs["detour_miles"] = detour
+
+        if view.adjustment != 0.0 and (
+            prices := view.prices.get(self._type, {}).get(self._price_field)
+        ):
+            attrs["discounted_price"] = prices[1]
 
         return attrs
 
@@ -335,3 +399,271 @@ class GasBuddySensor(CoordinatorEntity, SensorEntity):  # pylint: disable=too-ma
     def should_poll(self) -> bool:
         """No need to poll. Coordinator notifies entity of updates."""
         return False
+
+
+class GasBuddyRankSensor(CoordinatorEntity, SensorEntity):
+    """Adjusted price of a runner-up station of a cheapest gas tracker."""
+
+    coordinator: GasBuddyUpdateCoordinator
+
+    _attr_icon = "mdi:podium"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        coordinator: GasBuddyUpdateCoordinator,
+        config: ConfigEntry,
+        subentry: ConfigSubentry,
+        rank: int,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, context="runner_ups")
+        self._config = config
+        self._subentry = subentry
+        self._rank = rank
+        old_entry_id = subentry.data.get("old_entry_id")
+        self._unique_id = old_entry_id if old_entry_id is not None else subentry.subentry_id
+        self._attr_name = f"{subentry.data.get(CONF_NAME, subentry.title)} Rank {rank}"
+        self._attr_unique_id = f"Rank {rank}_{self._unique_id}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a port description for device registry."""
+        return DeviceInfo(
+            manufacturer="GasBuddy",
+            name=self._subentry.data.get(CONF_NAME, self._subentry.title),
+            identifiers={(DOMAIN, self._unique_id)},
+        )
+
+    @property
+    def _runner_up(self) -> dict[str, Any] | None:
+        """Return this rank's station, if the latest refresh found one."""
+        for runner_up in (self.coordinator.data or {}).get("runner_ups") or []:
+            if runner_up.get("rank") == self._rank:
+                return runner_up
+        return None
+
+    @property
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        if (runner_up := self._runner_up) is None:
+            return None
+        return runner_up.get("price")
+
+    @property
+    def native_unit_of_measurement(self) -> Any:
+        """Return the unit of measurement."""
+        if (view := self.coordinator.view) is None:
+            return None
+        if self._subentry.data.get(CONF_UOM):
+            return view.unit
+        return view.currency
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return sensor attributes."""
+        if (runner_up := self._runner_up) is None:
+            return None
+        return {
+            key: value for key, value in runner_up.items() if key != "price" and value is not None
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._runner_up is not None and self.coordinator.last_update_success
+
+
+class GasBuddyTrendSensor(CoordinatorEntity, SensorEntity):
+    """Mean price of a fuel over a window of a station's price history."""
+
+    coordinator: GasBuddyUpdateCoordinator
+
+    _attr_icon = "mdi:chart-line"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: GasBuddyUpdateCoordinator,
+        config: ConfigEntry,
+        subentry: ConfigSubentry,
+        history: GasBuddyPriceHistory,
+        fuel: str,
+        window: str,
+    ) -> None:
+        """Initialize the sensor."""
+        # Every good refresh stamps last_updated and adds a history sample.
+        super().__init__(coordinator, context="last_updated")
+        self._config = config
+        self._subentry = subentry
+        self._history = history
+        self._fuel = fuel
+        self._window = window
+        old_entry_id = subentry.data.get("old_entry_id")
+        self._unique_id = old_entry_id if old_entry_id is not None else subentry.subentry_id
+        fuel_name = SENSOR_TYPES[fuel].name
+        self._attr_name = (
+            f"{subentry.data.get(CONF_NAME, subentry.title)} {fuel_name} {window} Trend"
+        )
+        self._attr_unique_id = f"{fuel_name} {window} Trend_{self._unique_id}"
+        self._stats: dict[str, Any] | None = None
+        self._update_stats()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a port description for device registry."""
+        return DeviceInfo(
+            manufacturer="GasBuddy",
+            name=self._subentry.data.get(CONF_NAME, self._subentry.title),
+            identifiers={(DOMAIN, self._unique_id)},
+        )
+
+    @callback
+    def _update_stats(self) -> None:
+        """Summarise the history window once per refresh."""
+        self._stats = price_stats(
+            self._history.get(self._subentry.subentry_id, self._fuel, HISTORY_WINDOWS[self._window])
+        )
+        self._attr_native_value = self._stats["mean"] if self._stats else None
+        self._attr_extra_state_attributes = (
+            {
+                "min": self._stats["min"],
+                "max": self._stats["max"],
+                "slope_per_day": self._stats["slope"],
+                "samples": self._stats["samples"],
+            }
+            if self._stats
+            else {}
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_stats()
+        super()._handle_coordinator_update()
+
+    @property
+    def native_unit_of_measurement(self) -> Any:
+        """Return the unit of measurement."""
+        if (view := self.coordinator.view) is None:
+            return None
+        if self._subentry.data.get(CONF_UOM):
+            return view.unit
+        return view.currency
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._stats is not None
+
+
+class GasBuddyRegionSensor(CoordinatorEntity, SensorEntity):
+    """A price statistic of a fuel over every station in a region."""
+
+    coordinator: GasBuddyRegionCoordinator
+
+    _attr_icon = "mdi:map-marker-radius"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        coordinator: GasBuddyRegionCoordinator,
+        subentry: ConfigSubentry,
+        fuel: str,
+        stat: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._subentry = subentry
+        self._fuel = fuel
+        self._stat = stat
+        self._attr_name = f"{subentry.title} {SENSOR_TYPES[fuel].name} {REGION_STATS[stat]}"
+        self._attr_unique_id = f"{fuel}_{stat}_{subentry.subentry_id}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a port description for device registry."""
+        return DeviceInfo(
+            manufacturer="GasBuddy",
+            name=self._subentry.title,
+            identifiers={(DOMAIN, self._subentry.subentry_id)},
+        )
+
+    @property
+    def _stats(self) -> dict[str, Any]:
+        """Return the latest statistics of this sensor's fuel, empty if none."""
+        return ((self.coordinator.data or {}).get("fuels") or {}).get(self._fuel) or {}
+
+    @property
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        return self._stats.get(self._stat)
+
+    @property
+    def native_unit_of_measurement(self) -> Any:
+        """Return the unit of measurement."""
+        return (self.coordinator.data or {}).get("unit")
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return sensor attributes."""
+        stats = self._stats
+        attrs: dict[str, Any] = {"stations": stats.get("stations")}
+        if (
+            self._stat == "min"
+            and (cheapest := self.coordinator.index.get(stats.get("cheapest"))) is not None
+        ):
+            attrs[CONF_STATION_ID] = cheapest.station_id
+            attrs["station_name"] = cheapest.name
+            attrs["station_address"] = cheapest.address
+        return attrs
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return bool(self._stats) and self.coordinator.last_update_success
+
+
+class GasBuddyHubSensor(SensorEntity):
+    """Diagnostic sensor of the hub's requests to GasBuddy."""
+
+    entity_description: GasBuddyHubSensorEntityDescription
+
+    def __init__(
+        self,
+        sensor_description: GasBuddyHubSensorEntityDescription,
+        hub: GasBuddyHub,
+        config: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = sensor_description
+        self._hub = hub
+        self._config = config
+        self._attr_name = f"{config.title} {sensor_description.name}"
+        self._attr_unique_id = f"{sensor_description.key}_{config.entry_id}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a port description for device registry."""
+        return DeviceInfo(
+            manufacturer="GasBuddy",
+            name=self._config.title,
+            identifiers={(DOMAIN, self._config.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._hub)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return sensor attributes."""
+        if (attrs_fn := self.entity_description.attrs_fn) is None:
+            return None
+        return attrs_fn(self._hub)
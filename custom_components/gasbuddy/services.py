@@ -1,9 +1,12 @@
 """GasBuddy services."""
 
+import asyncio
+from collections.abc import Awaitable, Callable
 import logging
 import re
+import time
+from typing import Any
 
-from py_gasbuddy import GasBuddy
 from py_gasbuddy.exceptions import APIError, CSRFTokenMissing, LibraryError
 import voluptuous as vol
 
@@ -18,23 +21,53 @@ from homeassistant.core import (
 )
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import config_validation as cv, device_registry as dr
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 
 from .const import (
     ATTR_DEVICE_ID,
+    ATTR_FUEL,
+    ATTR_HOURS,
     ATTR_LIMIT,
+    ATTR_LOOKUP_STATS,
+    ATTR_MAX_AGE,
+    ATTR_MAX_PRICE,
     ATTR_POSTAL_CODE,
+    ATTR_PRICE_TYPE,
     ATTR_RADIUS,
     ATTR_SOLVER,
-    CACHE_FILE_NAME,
+    ATTR_TIMEOUT,
+    CONF_RESPONSE_CACHE_SIZE,
+    CONF_RESPONSE_CACHE_TTL,
     COORDINATOR,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_SERVICE_TIMEOUT,
     DOMAIN,
+    FUEL_KEY_CHOICES,
+    PRICE_TYPE_CHOICES,
+    REGIONS,
+    SERVICE_CHEAPEST_NEARBY,
     SERVICE_CLEAR_CACHE,
+    SERVICE_CONCURRENCY,
     SERVICE_EV_LOOKUP_GPS,
     SERVICE_EV_LOOKUP_ZIP,
+    SERVICE_GRID_DECIMALS,
     SERVICE_LOOKUP_GPS,
     SERVICE_LOOKUP_ZIP,
+    SERVICE_PRICE_HISTORY,
+    SERVICE_QUERY_REGION,
 )
+from .coordinator import LazyRedact, format_address
+from .geocode import normalize_postal_code
+from .history import price_stats
+from .hub import (
+    async_get_client,
+    async_get_coalescer,
+    async_get_geocodes,
+    async_get_history,
+    async_get_stations,
+)
+from .response_cache import GasBuddyResponseCache
 
 _SOLVER_URL_RE = re.compile(
     r"^https?://"
@@ -54,12 +87,22 @@ def _require_valid_solver(solver: str | None) -> None:
         raise ServiceValidationError("Invalid FlareSolverr URL")
 
 
-_LOGGER = logging.getLogger(__name__)
+def _device_subentry(dev_reg: dr.DeviceRegistry, device_id: str) -> str | None:
+    """Return the subentry ID a device belongs to."""
+    if (device_entry := dev_reg.async_get(device_id)) is None:
+        return None
+    return next(
+        (
+            sub_id
+            for sub_ids in device_entry.config_entries_subentries.values()
+            for sub_id in sub_ids
+            if sub_id is not None
+        ),
+        None,
+    )
 
 
-def _cache_path(hass: HomeAssistant) -> str:
-    """Return the shared CSRF-token cache file path."""
-    return f"{hass.config.config_dir}/{CACHE_FILE_NAME}"
+_LOGGER = logging.getLogger(__name__)
 
 
 class GasBuddyServices:
@@ -73,6 +116,10 @@ class GasBuddyServices:
         """Initialize with hass object."""
         self.hass = hass
         self._config = config
+        self.cache = GasBuddyResponseCache(
+            config.data.get(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL),
+            config.data.get(CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE),
+        )
 
     @callback
     def async_register(self) -> None:
@@ -85,6 +132,9 @@ class GasBuddyServices:
                 vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
                 vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1, max=99)),
                 vol.Optional(ATTR_SOLVER): cv.string,
+                vol.Optional(ATTR_TIMEOUT, default=DEFAULT_SERVICE_TIMEOUT): vol.All(
+                    vol.Coerce(float), vol.Range(min=1, max=300)
+                ),
             }),
             supports_response=SupportsResponse.ONLY,
         )
@@ -108,6 +158,9 @@ class GasBuddyServices:
                 vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1, max=99)),
                 vol.Optional(ATTR_RADIUS): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
                 vol.Optional(ATTR_SOLVER): cv.string,
+                vol.Optional(ATTR_TIMEOUT, default=DEFAULT_SERVICE_TIMEOUT): vol.All(
+                    vol.Coerce(float), vol.Range(min=1, max=300)
+                ),
             }),
             supports_response=SupportsResponse.ONLY,
         )
@@ -131,6 +184,53 @@ class GasBuddyServices:
                 vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
             }),
         )
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_PRICE_HISTORY,
+            self._price_history,
+            schema=vol.Schema({
+                vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+                vol.Optional(ATTR_FUEL): vol.In(FUEL_KEY_CHOICES),
+                vol.Optional(ATTR_HOURS, default=24): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=168)
+                ),
+            }),
+            supports_response=SupportsResponse.ONLY,
+        )
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_QUERY_REGION,
+            self._query_region,
+            schema=vol.Schema({
+                vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+                vol.Optional(ATTR_FUEL, default="regular_gas"): vol.In(FUEL_KEY_CHOICES),
+                vol.Optional(ATTR_LIMIT, default=10): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=1000)
+                ),
+                vol.Optional(ATTR_MAX_PRICE): vol.Coerce(float),
+            }),
+            supports_response=SupportsResponse.ONLY,
+        )
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_CHEAPEST_NEARBY,
+            self._cheapest_nearby,
+            schema=vol.Schema({
+                vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+                vol.Optional(ATTR_FUEL, default="regular_gas"): vol.In(FUEL_KEY_CHOICES),
+                vol.Optional(ATTR_PRICE_TYPE, default="best"): vol.In(PRICE_TYPE_CHOICES),
+                vol.Optional(ATTR_RADIUS, default=5): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=100)
+                ),
+                vol.Optional(ATTR_LIMIT, default=5): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=100)
+                ),
+                vol.Optional(ATTR_MAX_AGE, default=60): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=1440)
+                ),
+            }),
+            supports_response=SupportsResponse.ONLY,
+        )
 
     @callback
     def async_unregister(self) -> None:
@@ -140,6 +240,68 @@ class GasBuddyServices:
         self.hass.services.async_remove(DOMAIN, SERVICE_EV_LOOKUP_GPS)
         self.hass.services.async_remove(DOMAIN, SERVICE_EV_LOOKUP_ZIP)
         self.hass.services.async_remove(DOMAIN, SERVICE_CLEAR_CACHE)
+        self.hass.services.async_remove(DOMAIN, SERVICE_PRICE_HISTORY)
+        self.hass.services.async_remove(DOMAIN, SERVICE_QUERY_REGION)
+        self.hass.services.async_remove(DOMAIN, SERVICE_CHEAPEST_NEARBY)
+
+    async def _async_lookup_entities(
+        self,
+        entity_ids: list[str],
+        lookup: Callable[[float, float], Awaitable[Any]],
+        timeout: float,
+        key: tuple[Any, ...],
+    ) -> tuple[list[tuple[str, Any, Exception | None]], dict[str, dict[str, Any]]]:
+        """Run a lookup for every entity's coordinates concurrently.
+
+        Entities whose coordinates round to the same grid cell share one
+        lookup, and a cell answered recently is served from the response
+        cache under ``key`` plus the cell. Returns ``(entity_id, result,
+        error)`` per entity, where ``result`` and ``error`` are both ``None``
+        when the entity has no coordinates, plus per-entity timing and
+        cache-hit stats.
+        """
+        semaphore = asyncio.Semaphore(SERVICE_CONCURRENCY)
+        cells: dict[tuple[float, float], asyncio.Task] = {}
+        stats: dict[str, dict[str, Any]] = {}
+
+        async def _bounded(cell: tuple[float, float], lat: float, lon: float) -> Any:
+            async with semaphore, asyncio.timeout(timeout):
+                result = await lookup(lat, lon)
+            self.cache.set((*key, cell), result)
+            return result
+
+        async def _entity(entity_id: str) -> tuple[str, Any, Exception | None]:
+            start = time.monotonic()
+            entity = self.hass.states.get(entity_id)
+            if (
+                not entity
+                or ATTR_LATITUDE not in entity.attributes
+                or ATTR_LONGITUDE not in entity.attributes
+            ):
+                return entity_id, None, None
+            lat = entity.attributes[ATTR_LATITUDE]
+            lon = entity.attributes[ATTR_LONGITUDE]
+            cell = (round(lat, SERVICE_GRID_DECIMALS), round(lon, SERVICE_GRID_DECIMALS))
+            cached = cell in cells
+            if not cached and (result := self.cache.get((*key, cell))) is not None:
+                cached, error = True, None
+            else:
+                if not cached:
+                    cells[cell] = self.hass.async_create_task(
+                        _bounded(cell, lat, lon), eager_start=False
+                    )
+                try:
+                    result, error = await cells[cell], None
+                except Exception as ex:  # noqa: BLE001
+                    result, error = None, ex
+            stats[entity_id] = {
+                "elapsed": round(time.monotonic() - start, 3),
+                "cached": cached,
+            }
+            return entity_id, result, error
+
+        outcomes = await asyncio.gather(*(_entity(entity_id) for entity_id in entity_ids))
+        return outcomes, stats
 
     # Setup services
     async def _price_lookup_gps(self, service: ServiceCall) -> ServiceResponse:
@@ -156,32 +318,30 @@ class GasBuddyServices:
             solver = service.data[ATTR_SOLVER]
 
         _require_valid_solver(solver)
-        results = {}
-        api = GasBuddy(
-            solver_url=solver,
-            cache_file=_cache_path(self.hass),
-            session=async_get_clientsession(self.hass),
+        results: dict[str, Any] = {}
+        api = async_get_client(self.hass, solver=solver)
+        requests = async_get_coalescer(self.hass)
+
+        async def _lookup(lat: float, lon: float) -> Any:
+            return await requests.async_request(
+                api, "price_lookup_service", lat=lat, lon=lon, limit=limit
+            )
+
+        outcomes, stats = await self._async_lookup_entities(
+            entity_ids, _lookup, service.data[ATTR_TIMEOUT], (SERVICE_LOOKUP_GPS, solver, limit)
         )
-        for entity_id in entity_ids:
-            try:
-                entity = self.hass.states.get(entity_id)
-                if (
-                    entity
-                    and ATTR_LATITUDE in entity.attributes
-                    and ATTR_LONGITUDE in entity.attributes
-                ):
-                    lat = entity.attributes[ATTR_LATITUDE]
-                    lon = entity.attributes[ATTR_LONGITUDE]
-                    results[entity_id] = await api.price_lookup_service(
-                        lat=lat, lon=lon, limit=limit
-                    )
-                else:
-                    _LOGGER.warning("Entity %s lacks latitude/longitude coordinates", entity_id)
-                    results[entity_id] = {}
-            except (APIError, LibraryError, CSRFTokenMissing) as ex:
-                _LOGGER.error("Error checking prices: %s", ex)
+        for entity_id, result, error in outcomes:
+            if isinstance(error, (APIError, LibraryError, CSRFTokenMissing, TimeoutError)):
+                _LOGGER.error("Error checking prices: %s", error)
+            elif error is not None:
+                raise error
+            elif result is None:
+                _LOGGER.warning("Entity %s lacks latitude/longitude coordinates", entity_id)
+                results[entity_id] = {}
+            else:
+                results[entity_id] = {**result, ATTR_LOOKUP_STATS: stats[entity_id]}
 
-        _LOGGER.debug("GPS price lookup: %s", results)
+        _LOGGER.debug("GPS price lookup: %s", LazyRedact(results))
         return results
 
     async def _price_lookup_zip(self, service: ServiceCall) -> ServiceResponse:
@@ -197,17 +357,24 @@ class GasBuddyServices:
             solver = service.data[ATTR_SOLVER]
 
         _require_valid_solver(solver)
+        key = (SERVICE_LOOKUP_ZIP, solver, normalize_postal_code(zipcode), limit)
+        if (results := self.cache.get(key)) is not None:
+            _LOGGER.debug("ZIP Code price lookup served from cache")
+            return results
         results = {}
         try:
-            results = await GasBuddy(
-                solver_url=solver,
-                cache_file=_cache_path(self.hass),
-                session=async_get_clientsession(self.hass),
-            ).price_lookup_service(zipcode=zipcode, limit=limit)
+            results = await async_get_coalescer(self.hass).async_request(
+                async_get_client(self.hass, solver=solver),
+                "price_lookup_service",
+                zipcode=zipcode,
+                limit=limit,
+            )
         except (APIError, LibraryError, CSRFTokenMissing) as ex:
             _LOGGER.error("Error checking prices: %s", ex)
+        else:
+            self.cache.set(key, results)
 
-        _LOGGER.debug("ZIP Code price lookup: %s", results)
+        _LOGGER.debug("ZIP Code price lookup: %s", LazyRedact(results))
         return results
 
     async def _ev_lookup_gps(self, service: ServiceCall) -> ServiceResponse:
@@ -226,34 +393,36 @@ class GasBuddyServices:
             solver = service.data[ATTR_SOLVER]
 
         _require_valid_solver(solver)
-        results = {}
-        api = GasBuddy(
-            solver_url=solver,
-            cache_file=_cache_path(self.hass),
-            session=async_get_clientsession(self.hass),
+        results: dict[str, Any] = {}
+        api = async_get_client(self.hass, solver=solver)
+        requests = async_get_coalescer(self.hass)
+
+        async def _lookup(lat: float, lon: float) -> Any:
+            return await requests.async_request(
+                api, "ev_stations_nearby", lat=lat, lon=lon, radius=radius, limit=limit
+            )
+
+        outcomes, stats = await self._async_lookup_entities(
+            entity_ids,
+            _lookup,
+            service.data[ATTR_TIMEOUT],
+            (SERVICE_EV_LOOKUP_GPS, solver, radius, limit),
         )
-        for entity_id in entity_ids:
-            try:
-                entity = self.hass.states.get(entity_id)
-                if (
-                    entity
-                    and ATTR_LATITUDE in entity.attributes
-                    and ATTR_LONGITUDE in entity.attributes
-                ):
-                    lat = entity.attributes[ATTR_LATITUDE]
-                    lon = entity.attributes[ATTR_LONGITUDE]
-                    res = await api.ev_stations_nearby(lat=lat, lon=lon, radius=radius, limit=limit)
-                    results[entity_id] = res.get("stations", [])
-                else:
-                    _LOGGER.warning("Entity %s lacks latitude/longitude coordinates", entity_id)
-                    results[entity_id] = []
-            except Exception as ex:  # noqa: BLE001
-                _LOGGER.error("Error checking EV stations for %s: %s", entity_id, ex)
+        for entity_id, result, error in outcomes:
+            if error is not None:
+                _LOGGER.error("Error checking EV stations for %s: %s", entity_id, error)
                 results[entity_id] = []
+            elif result is None:
+                _LOGGER.warning("Entity %s lacks latitude/longitude coordinates", entity_id)
+                results[entity_id] = []
+            else:
+                results[entity_id] = result.get("stations", [])
 
         _LOGGER.debug(
-            "GPS EV station lookup for entities completed. Station counts per entity: %s",
+            "GPS EV station lookup for entities completed. Station counts per entity: %s,"
+            " lookup stats: %s",
             {ent_id: len(stations) for ent_id, stations in results.items()},
+            stats,
         )
         return results
 
@@ -273,22 +442,30 @@ class GasBuddyServices:
             solver = service.data[ATTR_SOLVER]
 
         _require_valid_solver(solver)
+        key = (SERVICE_EV_LOOKUP_ZIP, solver, normalize_postal_code(zipcode), radius, limit)
+        if (results := self.cache.get(key)) is not None:
+            _LOGGER.debug("ZIP Code EV station lookup served from cache")
+            return results
         results = {}
-        api = GasBuddy(
-            solver_url=solver,
-            cache_file=_cache_path(self.hass),
-            session=async_get_clientsession(self.hass),
-        )
+        api = async_get_client(self.hass, solver=solver)
+        requests = async_get_coalescer(self.hass)
+        geocodes = async_get_geocodes(self.hass)
         try:
-            res = await api.price_lookup_service(zipcode=zipcode)
             lat = None
             lon = None
-            if res.get("results"):
-                lat = res["results"][0].get("latitude")
-                lon = res["results"][0].get("longitude")
+            if geocodes is not None and (location := geocodes.get(zipcode)) is not None:
+                lat, lon = location
+            else:
+                res = await requests.async_request(api, "price_lookup_service", zipcode=zipcode)
+                if res.get("results"):
+                    lat = res["results"][0].get("latitude")
+                    lon = res["results"][0].get("longitude")
             if lat is not None and lon is not None:
-                res = await api.ev_stations_nearby(lat=lat, lon=lon, radius=radius, limit=limit)
+                res = await requests.async_request(
+                    api, "ev_stations_nearby", lat=lat, lon=lon, radius=radius, limit=limit
+                )
                 results = {"stations": res.get("stations", [])}
+                self.cache.set(key, results)
             else:
                 results = {"stations": [], "error": "Location coordinates not found for zip code"}
         except Exception as ex:  # noqa: BLE001
@@ -304,6 +481,7 @@ class GasBuddyServices:
 
     async def _clear_cache(self, service: ServiceCall) -> None:
         """Clear cache file."""
+        self.cache.clear()
         data = service.data
         for device in data[ATTR_DEVICE_ID]:
             device_id = device
@@ -329,3 +507,100 @@ class GasBuddyServices:
             if coordinators:
                 coordinator = next(iter(coordinators.values()))
                 await coordinator.clear_cache()
+
+    async def _price_history(self, service: ServiceCall) -> ServiceResponse:
+        """Return the recorded price history of station devices."""
+        if (history := async_get_history(self.hass)) is None:
+            raise ServiceValidationError("GasBuddy price history is not loaded")
+        seconds = service.data[ATTR_HOURS] * 3600
+        dev_reg = dr.async_get(self.hass)
+        results: dict[str, Any] = {}
+        for device_id in service.data[ATTR_DEVICE_ID]:
+            if (subentry_id := _device_subentry(dev_reg, device_id)) is None:
+                raise ServiceValidationError(f"Device ID {device_id} is not a GasBuddy station")
+            fuels = (
+                [service.data[ATTR_FUEL]]
+                if ATTR_FUEL in service.data
+                else history.fuels(subentry_id)
+            )
+            results[device_id] = {}
+            for fuel in fuels:
+                samples = history.get(subentry_id, fuel, seconds)
+                results[device_id][fuel] = {
+                    "samples": [
+                        {"time": dt_util.utc_from_timestamp(timestamp).isoformat(), "price": price}
+                        for timestamp, price in samples
+                    ],
+                    "stats": price_stats(samples),
+                }
+        return results
+
+    async def _query_region(self, service: ServiceCall) -> ServiceResponse:
+        """Return the cheapest stations of a fuel in region devices."""
+        regions = {
+            subentry_id: region
+            for runtime in self.hass.data.get(DOMAIN, {}).values()
+            if isinstance(runtime, dict)
+            for subentry_id, region in runtime.get(REGIONS, {}).items()
+        }
+        fuel = service.data[ATTR_FUEL]
+        dev_reg = dr.async_get(self.hass)
+        results: dict[str, Any] = {}
+        for device_id in service.data[ATTR_DEVICE_ID]:
+            if (region := regions.get(_device_subentry(dev_reg, device_id))) is None:
+                raise ServiceValidationError(f"Device ID {device_id} is not a GasBuddy region")
+            results[device_id] = {
+                "stats": region.index.stats(fuel),
+                "stations": region.index.query(
+                    fuel, service.data[ATTR_LIMIT], service.data.get(ATTR_MAX_PRICE)
+                ),
+            }
+        return results
+
+    async def _cheapest_nearby(self, service: ServiceCall) -> ServiceResponse:
+        """Return the cheapest stations near entities from the hub's station index."""
+        if (index := async_get_stations(self.hass)) is None:
+            raise ServiceValidationError("No GasBuddy hub is loaded")
+        fuel = service.data[ATTR_FUEL]
+        max_age = service.data[ATTR_MAX_AGE] * 60
+        results: dict[str, Any] = {}
+        for entity_id in service.data[ATTR_ENTITY_ID]:
+            entity = self.hass.states.get(entity_id)
+            if (
+                not entity
+                or ATTR_LATITUDE not in entity.attributes
+                or ATTR_LONGITUDE not in entity.attributes
+            ):
+                _LOGGER.warning("Entity %s lacks latitude/longitude coordinates", entity_id)
+                results[entity_id] = {}
+                continue
+            stations, total = index.cheapest(
+                entity.attributes[ATTR_LATITUDE],
+                entity.attributes[ATTR_LONGITUDE],
+                service.data[ATTR_RADIUS],
+                fuel,
+                service.data[ATTR_PRICE_TYPE],
+                service.data[ATTR_LIMIT],
+                max_age,
+            )
+            results[entity_id] = {
+                "stations": [
+                    {
+                        "station_id": str(station.get("station_id") or station.get("id")),
+                        "name": station.get("name"),
+                        "address": format_address(station.get("address")),
+                        "latitude": station["latitude"],
+                        "longitude": station["longitude"],
+                        "distance_miles": round(distance, 2),
+                        "price": round(
+                            price
+                            / (100 if station.get("unit_of_measure") == "cents_per_liter" else 1),
+                            3,
+                        ),
+                        "age": round(age),
+                    }
+                    for price, distance, age, station in stations
+                ],
+                "total": total,
+            }
+        return results
@@ -0,0 +1,73 @@
+"""Persistent last-known-good snapshots for GasBuddy."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORE_KEY, SNAPSHOT_STORE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GasBuddySnapshotStore:
+    """Keep the last good data of every station coordinator on disk.
+
+    Snapshots are keyed by subentry ID and stored next to the CSRF token
+    cache in ``.storage``. The store is loaded once during hub setup so
+    coordinators can read their snapshot synchronously when they are
+    constructed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, SNAPSHOT_STORE_VERSION, SNAPSHOT_STORE_KEY)
+        self._snapshots: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load snapshots from disk."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as ex:  # noqa: BLE001
+            _LOGGER.warning("Unable to load GasBuddy snapshots, starting cold: %s", ex)
+            stored = None
+        self._snapshots = dict((stored or {}).get("stations") or {})
+        _LOGGER.debug("Loaded %d station snapshot(s)", len(self._snapshots))
+
+    def get(self, subentry_id: str) -> tuple[dict[str, Any], str | None] | None:
+        """Return a copy of a station's snapshot data and when it was saved."""
+        if not (snapshot := self._snapshots.get(subentry_id)) or not snapshot.get("data"):
+            return None
+        return dict(snapshot["data"]), snapshot.get("saved_at")
+
+    @callback
+    def async_save(self, subentry_id: str, data: dict[str, Any]) -> None:
+        """Remember a station's latest good data and schedule a write."""
+        self._snapshots[subentry_id] = {
+            "saved_at": datetime.now(UTC).isoformat(),
+            "data": dict(data),
+        }
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the snapshots to disk now instead of waiting for the delayed save."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_prune(self, subentry_ids: set[str]) -> None:
+        """Drop snapshots of subentries that no longer exist."""
+        removed = set(self._snapshots) - subentry_ids
+        if not removed:
+            return
+        for subentry_id in removed:
+            del self._snapshots[subentry_id]
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"stations": self._snapshots}
@@ -0,0 +1,167 @@
+"""Hub-wide spatial index of every gas station record GasBuddy returned."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import heapq
+import logging
+import math
+import operator
+import time
+from typing import Any
+
+from homeassistant.core import callback
+
+from .const import FUEL_KEY_CHOICES, STATION_INDEX_CAPACITY, STATION_INDEX_CELL_DEG
+from .geo import MILES_PER_DEGREE, distance_miles
+from .scoring import score_stations
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Entry:
+    """The latest record of one station and where it is indexed."""
+
+    lat: float
+    lon: float
+    cell: tuple[int, int]
+    seen: float
+    station: dict[str, Any] = field(repr=False)
+
+
+class GasBuddyStationIndex:
+    """Latest record of every gas station seen, in a grid of ``cell`` degree cells.
+
+    Every response that passes through the hub's coalescer is observed, so
+    the index holds the stations of station coordinators, cheapest trackers,
+    regions and service calls alike. A station seen again replaces its
+    previous record. Once more than ``capacity`` stations are indexed, the
+    one seen longest ago is dropped.
+
+    A radius search only visits the cells its bounding box touches, so it
+    costs the same however many stations are indexed elsewhere.
+    """
+
+    def __init__(
+        self,
+        *,
+        cell: float = STATION_INDEX_CELL_DEG,
+        capacity: int = STATION_INDEX_CAPACITY,
+    ) -> None:
+        """Initialize."""
+        self._cell = cell
+        self._capacity = capacity
+        # Insertion order is the order stations were last seen in.
+        self._stations: dict[str, _Entry] = {}
+        self._cells: dict[tuple[int, int], set[str]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stations indexed."""
+        return len(self._stations)
+
+    @callback
+    def async_observe(self, result: Any) -> None:
+        """Record the gas stations of a GasBuddy response.
+
+        ``result`` is either a single station or a response with a
+        ``results`` list. Stations without coordinates or without any fuel
+        price are ignored.
+        """
+        if not isinstance(result, dict):
+            return
+        stations = result.get("results") if "results" in result else [result]
+        now = time.monotonic()
+        for station in stations or []:
+            if not isinstance(station, dict):
+                continue
+            lat, lon = station.get("latitude"), station.get("longitude")
+            station_id = str(station.get("station_id") or station.get("id") or "")
+            if lat is None or lon is None or not station_id:
+                continue
+            if not any(isinstance(station.get(fuel), dict) for fuel in FUEL_KEY_CHOICES):
+                continue
+            self._remove(station_id)
+            cell = self._cell_of(lat, lon)
+            # Callers may decorate their own copy of the response later.
+            self._stations[station_id] = _Entry(lat, lon, cell, now, dict(station))
+            self._cells.setdefault(cell, set()).add(station_id)
+        while len(self._stations) > self._capacity:
+            self._remove(next(iter(self._stations)))
+
+    def nearby(
+        self, lat: float, lon: float, radius: float, max_age: float | None = None
+    ) -> list[tuple[float, dict[str, Any]]]:
+        """Return ``(distance, station)`` within ``radius`` miles, nearest first.
+
+        Stations last seen more than ``max_age`` seconds ago are skipped.
+        The station records are shared; copy one before changing it.
+        """
+        cutoff = time.monotonic() - max_age if max_age is not None else -math.inf
+        lat_span = radius / MILES_PER_DEGREE
+        lon_span = lat_span / max(math.cos(math.radians(lat)), 0.01)
+        south, west = self._cell_of(lat - lat_span, lon - lon_span)
+        north, east = self._cell_of(lat + lat_span, lon + lon_span)
+        found = []
+        for row in range(south, north + 1):
+            for col in range(west, east + 1):
+                for station_id in self._cells.get((row, col), ()):
+                    entry = self._stations[station_id]
+                    if entry.seen < cutoff:
+                        continue
+                    distance = distance_miles(lat, lon, entry.lat, entry.lon)
+                    if distance <= radius:
+                        found.append((distance, entry.station))
+        found.sort(key=operator.itemgetter(0))
+        return found
+
+    def cheapest(
+        self,
+        lat: float,
+        lon: float,
+        radius: float,
+        fuel: str,
+        price_type: str,
+        limit: int,
+        max_age: float | None = None,
+    ) -> tuple[list[tuple[float, float, float, dict[str, Any]]], int]:
+        """Return the ``limit`` cheapest stations selling a fuel within ``radius`` miles.
+
+        Each is returned as ``(price, distance, age, station)``, cheapest
+        first, with the price in the station's own unit and the age in
+        seconds. Also returns how many stations within the radius sell the
+        fuel.
+        """
+        nearby = [
+            (distance, station)
+            for distance, station in self.nearby(lat, lon, radius, max_age)
+            if station.get(fuel)
+        ]
+        scores = score_stations(
+            [station for _, station in nearby], fuel, price_type, [0.0] * len(nearby)
+        )
+        # The position breaks price ties in favour of the nearer station.
+        ranked = heapq.nsmallest(
+            limit,
+            ((price, position) for position, price in enumerate(scores) if math.isfinite(price)),
+        )
+        now = time.monotonic()
+        results = []
+        for price, position in ranked:
+            distance, station = nearby[position]
+            entry = self._stations[str(station.get("station_id") or station.get("id"))]
+            results.append((price, distance, now - entry.seen, station))
+        return results, len(nearby)
+
+    def _remove(self, station_id: str) -> None:
+        """Drop a station from the index, if present."""
+        if (entry := self._stations.pop(station_id, None)) is None:
+            return
+        ids = self._cells[entry.cell]
+        ids.discard(station_id)
+        if not ids:
+            del self._cells[entry.cell]
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        """Return the grid cell of a coordinate."""
+        return math.floor(lat / self._cell), math.floor(lon / self._cell)
@@ -0,0 +1 @@
+"""Micro-benchmarks for gasbuddy (run with ``python -m tests.benchmarks.<name>``)."""
@@ -0,0 +1,110 @@
+"""Estimate recorder growth from the attributes of a station's sensors.
+
+The recorder stores each distinct set of attributes once, so a station
+costs one new attributes row per sensor every time its prices change.
+Compares the rows written with every attribute recorded (as before
+``_unrecorded_attributes``) with the rows written now.
+
+Run with ``python -m tests.benchmarks.bench_recorded_attributes``.
+"""
+# ruff: noqa: T201
+
+import asyncio
+import copy
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+from custom_components.gasbuddy.const import CONF_GPS
+from homeassistant import loader
+from homeassistant.components.recorder.db_schema import StateAttributes
+from homeassistant.components.recorder.util import SupportedDialect
+from homeassistant.core import State
+from tests.conftest import _make_hub_entry, _make_station_subentry
+from tests.const import COORDINATOR_DATA, STATION_SUBENTRY_DATA
+
+FUELS = ("regular_gas", "midgrade_gas", "premium_gas", "diesel", "e85", "e15")
+# GasBuddy users report a station's prices a few times a day.
+PRICE_CHANGES_PER_DAY = 4
+DAYS_PER_MONTH = 30
+
+
+def _station_data() -> dict:
+    """Return station data with every fuel, price type and detail populated."""
+    data = copy.deepcopy(COORDINATOR_DATA)
+    data["phone"] = "(312) 555-0142"
+    data["star_rating"] = 4.2
+    data["amenities"] = [
+        {"name": name, "imageUrl": f"https://images.gasbuddy.io/amenities/{slug}.png"}
+        for name, slug in (
+            ("Air Pump", "air"),
+            ("ATM", "atm"),
+            ("Car Wash", "carwash"),
+            ("Convenience Store", "cstore"),
+            ("Restrooms", "restrooms"),
+            ("Pay At Pump", "payatpump"),
+        )
+    ]
+    for index, fuel in enumerate(FUELS):
+        price = 3.0 + index / 10
+        data[fuel] = {
+            "credit": "Buddy",
+            "price": price,
+            "cash_price": price - 0.1,
+            "deal_price": price - 0.2,
+            "formatted_price": f"${price:.2f}",
+            "last_updated": "2023-12-10T17:48:46.584Z",
+        }
+    return data
+
+
+def _recorded_bytes(state: State, *, slim: bool) -> int:
+    """Return the size of the attributes row the recorder writes for a state."""
+    if not slim:
+        state = State(state.entity_id, state.state, state.attributes)
+    event = type("Event", (), {"data": {"new_state": state}})
+    return len(StateAttributes.shared_attrs_bytes_from_event(event, SupportedDialect.SQLITE))
+
+
+async def main() -> None:
+    """Print attribute bytes written per station per price change and month."""
+    async with async_test_home_assistant() as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+        entry = _make_hub_entry(
+            hass,
+            subentries=[_make_station_subentry(data={**STATION_SUBENTRY_DATA, CONF_GPS: True})],
+        )
+        with (
+            patch(
+                "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+                return_value=_station_data(),
+            ),
+            patch("custom_components.gasbuddy.coordinator.async_get_clientsession"),
+            patch("custom_components.gasbuddy.client.async_get_clientsession"),
+        ):
+            await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+
+        states = [
+            state
+            for state in hass.states.async_all("sensor")
+            if state.entity_id.startswith("sensor.gas_station_")
+            and state.attributes.get("last_updated") is not None
+        ]
+        before = sum(_recorded_bytes(state, slim=False) for state in states)
+        after = sum(_recorded_bytes(state, slim=True) for state in states)
+        changes = PRICE_CHANGES_PER_DAY * DAYS_PER_MONTH
+        print(f"{len(states)} price sensors, {changes} price changes a month")
+        print(
+            f"every attribute recorded: {before:7d} B/change {before * changes / 1024:8.1f} KiB/month"
+        )
+        print(
+            f"station details skipped:  {after:7d} B/change {after * changes / 1024:8.1f} KiB/month"
+        )
+        print(f"saved:                    {1 - after / before:7.0%}")
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
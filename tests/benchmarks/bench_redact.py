@@ -0,0 +1,45 @@
+"""Benchmark eager vs lazy debug-log redaction on a large payload.
+
+Run with ``python -m tests.benchmarks.bench_redact``.
+"""
+# ruff: noqa: T201
+
+import json
+import logging
+from pathlib import Path
+import timeit
+
+from custom_components.gasbuddy.coordinator import LazyRedact, _redact  # noqa: PLC2701
+
+# A poll logs the payload this many times (station data, EV results, final data...).
+CALLS_PER_POLL = 5
+ROUNDS = 200
+
+_LOGGER = logging.getLogger("gasbuddy.bench")
+
+
+def main() -> None:
+    """Print per-poll CPU time for eager and lazy redaction with debug logging off."""
+    payload = json.loads(
+        (Path(__file__).parent.parent / "fixtures" / "results.json").read_text(encoding="utf-8")
+    )
+    _LOGGER.setLevel(logging.INFO)
+
+    def eager() -> None:
+        for _ in range(CALLS_PER_POLL):
+            _LOGGER.debug("Gas station data: %s", _redact(payload))
+
+    def lazy() -> None:
+        for _ in range(CALLS_PER_POLL):
+            _LOGGER.debug("Gas station data: %s", LazyRedact(payload))
+
+    eager_us = min(timeit.repeat(eager, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+    lazy_us = min(timeit.repeat(lazy, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+    print(f"payload: {len(json.dumps(payload))} bytes, {CALLS_PER_POLL} debug calls per poll")
+    print(f"eager redaction: {eager_us:10.1f} us/poll")
+    print(f"lazy redaction:  {lazy_us:10.1f} us/poll")
+    print(f"saved:           {eager_us - lazy_us:10.1f} us/poll ({eager_us / lazy_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the region index with overlapping tile results.
+
+A region's tiles overlap, so the same station comes back from several
+lookups. Times recording a full rotation of tile results, then the
+statistics and a cheapest-10 query, and prints how many polls a full
+rotation takes for a few region sizes at the default request budget.
+
+Run with ``python -m tests.benchmarks.bench_region_index``.
+"""
+# ruff: noqa: T201
+
+import math
+import random
+import timeit
+
+from custom_components.gasbuddy.const import DEFAULT_REQUEST_BUDGET, REGION_TILE_LIMIT
+from custom_components.gasbuddy.region import RegionArea, RegionIndex
+
+ROUNDS = 20
+CENTRE = (41.88, -87.63)
+FUELS = ("regular_gas", "premium_gas", "diesel")
+STATION_COUNTS = (200, 1000, 2000)
+
+
+def _tile_results(area: RegionArea, count: int) -> list[list[dict]]:
+    """Return one page of results per tile, drawn from ``count`` stations."""
+    rng = random.Random(count)
+    stations = []
+    for station_id in range(count):
+        distance = area.radius * math.sqrt(rng.random()) / 69.0
+        bearing = rng.uniform(0, 2 * math.pi)
+        price = round(rng.uniform(2.8, 4.2), 2)
+        stations.append({
+            "station_id": str(station_id),
+            "name": f"Station {station_id}",
+            "latitude": CENTRE[0] + distance * math.cos(bearing),
+            "longitude": CENTRE[1] + distance * math.sin(bearing) / 0.745,
+            "regular_gas": {"price": price},
+            "premium_gas": {"price": price + 0.6} if rng.random() < 0.8 else None,
+            "diesel": {"price": price + 0.4} if rng.random() < 0.5 else None,
+        })
+    pages = []
+    for lat, lon in area.tiles():
+        # Like GasBuddy, each lookup returns the stations nearest its point.
+        stations.sort(
+            key=lambda s, lat=lat, lon=lon: (s["latitude"] - lat) ** 2 + (s["longitude"] - lon) ** 2
+        )
+        pages.append(stations[:REGION_TILE_LIMIT])
+    return pages
+
+
+def _poll(pages: list[list[dict]], area: RegionArea) -> RegionIndex:
+    """Index a rotation of tile results and read every statistic."""
+    index = RegionIndex()
+    for page in pages:
+        index.update(page, area, 0.0)
+    for fuel in FUELS:
+        index.stats(fuel)
+        index.query(fuel, 10)
+    return index
+
+
+def main() -> None:
+    """Print indexing time per rotation and polls per rotation."""
+    for radius in (5, 10, 25):
+        tiles = len(RegionArea(*CENTRE, radius).tiles())
+        polls = math.ceil(tiles / DEFAULT_REQUEST_BUDGET)
+        print(f"radius {radius:2d} mi: {tiles:3d} tiles, {polls:2d} poll(s) per rotation")
+    area = RegionArea(*CENTRE, 10)
+    for count in STATION_COUNTS:
+        pages = _tile_results(area, count)
+        rows = sum(len(page) for page in pages)
+        index = _poll(pages, area)
+        seconds = min(
+            timeit.repeat(lambda pages=pages: _poll(pages, area), number=ROUNDS, repeat=3)
+        )
+        print(
+            f"{count:5d} stations, {rows:5d} tile rows -> {len(index):5d} indexed: "
+            f"{seconds / ROUNDS * 1e3:6.2f} ms per rotation"
+        )
+
+
+if __name__ == "__main__":
+    main()
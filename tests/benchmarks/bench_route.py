@@ -0,0 +1,76 @@
+"""Benchmark planning and scoring a route-mode cheapest tracker refresh.
+
+Plays back a commute as a followed entity's position updates and compares
+the upstream lookups of one query per recorded position with the capped
+route samples, then times the detour of every candidate station.
+
+Run with ``python -m tests.benchmarks.bench_route``.
+"""
+# ruff: noqa: T201
+
+import math
+import random
+import timeit
+
+from custom_components.gasbuddy.route import RouteTrail, route_detours, route_samples
+
+ROUNDS = 50
+START = (41.80, -87.90)
+# Position updates along a 25 mile drive, one every 15 seconds.
+UPDATES = 240
+LENGTH_DEG = 0.45
+CANDIDATES = (20, 80, 160)
+
+
+def _trail() -> list[tuple[float, float]]:
+    """Return the trail a commute leaves, with a little GPS noise."""
+    rng = random.Random(UPDATES)
+    trail = RouteTrail()
+    for step in range(UPDATES):
+        progress = step / (UPDATES - 1)
+        trail.add(
+            START[0] + 0.1 * math.sin(progress * math.pi) + rng.gauss(0, 0.0005),
+            START[1] + LENGTH_DEG * progress + rng.gauss(0, 0.0005),
+            step * 15.0,
+        )
+    return trail.points(UPDATES * 15.0)
+
+
+def _stations(count: int) -> list[dict]:
+    """Return ``count`` candidate stations scattered around the drive."""
+    rng = random.Random(count)
+    return [
+        {
+            "station_id": str(station_id),
+            "latitude": START[0] + rng.uniform(-0.05, 0.15),
+            "longitude": START[1] + rng.uniform(0, LENGTH_DEG),
+        }
+        for station_id in range(count)
+    ]
+
+
+def main() -> None:
+    """Print the lookups per refresh and the microseconds to place the candidates."""
+    waypoints = _trail()
+    samples = route_samples(waypoints)
+    print(
+        f"{UPDATES} position updates, {len(waypoints)} kept: "
+        f"{len(samples)} lookups per refresh instead of {len(waypoints)}"
+    )
+    for count in CANDIDATES:
+        stations = _stations(count)
+        elapsed = min(
+            timeit.repeat(
+                lambda stations=stations: route_detours(stations, waypoints),
+                number=ROUNDS,
+                repeat=5,
+            )
+        )
+        print(
+            f"{count:4d} candidates along {len(waypoints)} waypoints: "
+            f"{elapsed / ROUNDS * 1e3:6.2f} ms per refresh"
+        )
+
+
+if __name__ == "__main__":
+    main()
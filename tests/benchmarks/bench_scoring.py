@@ -0,0 +1,79 @@
+"""Benchmark cheapest-mode price scoring against the old per-station closure.
+
+Run with ``python -m tests.benchmarks.bench_scoring``.
+"""
+# ruff: noqa: T201
+
+from itertools import starmap
+import random
+import timeit
+
+from custom_components.gasbuddy import scoring
+
+ROUNDS = 200
+STATION_COUNTS = (20, 100)
+PRICE_TYPES = ("best", "credit")
+
+
+def _stations(count: int) -> list[dict]:
+    """Return stations where some price types are missing, like real area results."""
+    rng = random.Random(count)
+    stations = []
+    for _ in range(count):
+        price = round(rng.uniform(2.8, 4.2), 2)
+        stations.append({
+            "regular_gas": {
+                "price": price,
+                "cash_price": price - 0.1 if rng.random() < 0.5 else None,
+                "deal_price": price - 0.2 if rng.random() < 0.2 else None,
+            }
+        })
+    return stations
+
+
+def _score_closure(stations, fuel_key, price_type, adjustments) -> list[float]:
+    """Score stations the way the coordinator's ``_sort_key`` closure did."""
+
+    def _sort_key(s: dict, adjustment: float) -> float:
+        node = s.get(fuel_key) or {}
+
+        def adjust(val: float | None) -> float:
+            if val is None:
+                return float("inf")
+            return val + adjustment
+
+        if price_type == "best":
+            candidates = [node.get("deal_price"), node.get("cash_price"), node.get("price")]
+            vals = [adjust(p) for p in candidates if p is not None]
+            return min(vals) if vals else float("inf")
+        if price_type == "deal":
+            return adjust(node.get("deal_price"))
+        field = "cash_price" if price_type == "cash" else "price"
+        return adjust(node.get(field))
+
+    return list(starmap(_sort_key, zip(stations, adjustments, strict=True)))
+
+
+def _per_call_us(func) -> float:
+    """Return the best time of one call in microseconds."""
+    return min(timeit.repeat(func, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+
+
+def main() -> None:
+    """Print scoring time per refresh for both approaches."""
+    for price_type in PRICE_TYPES:
+        for count in STATION_COUNTS:
+            stations = _stations(count)
+            adjustments = [-0.05 if i % 3 == 0 else 0.0 for i in range(count)]
+            args = (stations, "regular_gas", price_type, adjustments)
+            assert scoring.score_stations(*args) == _score_closure(*args)
+            closure_us = _per_call_us(lambda args=args: _score_closure(*args))
+            scoring_us = _per_call_us(lambda args=args: scoring.score_stations(*args))
+            print(
+                f"{price_type:6s} {count:5d} stations: closure {closure_us:8.1f} us, "
+                f"score_stations {scoring_us:8.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
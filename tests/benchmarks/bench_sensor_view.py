@@ -0,0 +1,85 @@
+"""Benchmark sensor state-write work for a station with every sensor enabled.
+
+Compares re-deriving sensor values on every property access (the view is
+rebuilt for each sensor, as before the derived view existed) with one view
+shared by all sensors per refresh.
+
+Run with ``python -m tests.benchmarks.bench_sensor_view``.
+"""
+# ruff: noqa: SLF001, T201
+
+import asyncio
+import timeit
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+from custom_components.gasbuddy.const import CONF_BRAND_ADJUSTMENTS, SENSOR_TYPES
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.sensor import GasBuddySensor
+from tests.conftest import _make_hub_entry
+from tests.const import COORDINATOR_DATA, HUB_DATA
+
+ROUNDS = 500
+FUELS = ("regular_gas", "midgrade_gas", "premium_gas", "diesel", "e85", "e15")
+
+
+def _station_data() -> dict:
+    """Return station data with every fuel and price type populated."""
+    data = dict(COORDINATOR_DATA)
+    data["brands"] = [{"brandId": "1", "name": "Shell"}]
+    for index, fuel in enumerate(FUELS):
+        price = 3.0 + index / 10
+        data[fuel] = {
+            "credit": "Buddy",
+            "price": price,
+            "cash_price": price - 0.1,
+            "deal_price": price - 0.2,
+            "formatted_price": f"${price:.2f}",
+            "last_updated": "2023-12-10T17:48:46.584Z",
+        }
+    return data
+
+
+def _write_states(sensors: list[GasBuddySensor]) -> None:
+    """Read every property a state write reads."""
+    for sensor in sensors:
+        _ = sensor.native_value, sensor.native_unit_of_measurement
+        _ = sensor.extra_state_attributes, sensor.available
+
+
+async def main() -> None:
+    """Print per-refresh state-write time with and without the shared view."""
+    async with async_test_home_assistant() as hass:
+        entry = _make_hub_entry(
+            hass, hub_data={**HUB_DATA, CONF_BRAND_ADJUSTMENTS: {"Shell": -0.1}}
+        )
+        with patch("custom_components.gasbuddy.coordinator.async_get_clientsession"):
+            coordinator = GasBuddyUpdateCoordinator(hass, entry)
+        coordinator.data = _station_data()
+        sensors = [
+            GasBuddySensor(description, coordinator, entry)
+            for key, description in SENSOR_TYPES.items()
+            if description.price and key.split("_cash")[0].split("_deal")[0] in FUELS
+        ]
+
+        def per_sensor() -> None:
+            for sensor in sensors:
+                coordinator._view = None
+                _write_states([sensor])
+
+        def shared() -> None:
+            coordinator._view = None
+            _write_states(sensors)
+
+        before = min(timeit.repeat(per_sensor, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+        after = min(timeit.repeat(shared, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+        print(f"{len(sensors)} price sensors, one refresh each round")
+        print(f"derived per sensor: {before:8.1f} us/refresh")
+        print(f"shared view:        {after:8.1f} us/refresh")
+        print(f"saved:              {before - after:8.1f} us/refresh ({before / after:.1f}x)")
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Benchmark cheapest-mode station filtering with large include/exclude lists.
+
+Compares the per-station list scans and nested brand ``any()`` checks used
+before with filters compiled once into frozensets.
+
+Run with ``python -m tests.benchmarks.bench_station_filter``.
+"""
+# ruff: noqa: T201
+
+import timeit
+
+from custom_components.gasbuddy.const import CONF_EXCLUDE_BRANDS, CONF_EXCLUDE_STATIONS
+from custom_components.gasbuddy.coordinator import StationFilter
+
+ROUNDS = 200
+# An area lookup returns up to 20 stations; wider searches up to 99.
+STATION_COUNTS = (20, 99)
+# A fleet account excluding hundreds of stations and a few dozen brands.
+EXCLUDED_STATIONS = 500
+EXCLUDED_BRANDS = 40
+
+
+def _stations(count: int) -> list[dict]:
+    """Return area results with two brands per station."""
+    return [
+        {
+            "station_id": str(100000 + index),
+            "brands": [{"brandId": str(index % 90)}, {"brandId": str(1000 + index % 7)}],
+        }
+        for index in range(count)
+    ]
+
+
+def _list_filter(data: dict, stations: list[dict]) -> list[dict]:
+    """Filter the way the coordinator did before compiling."""
+    exclude_brands = data.get(CONF_EXCLUDE_BRANDS) or []
+    exclude_stations = data.get(CONF_EXCLUDE_STATIONS) or []
+    filtered = []
+    for s in stations:
+        station_id = str(s.get("station_id") or s.get("id") or "")
+        brand_ids = [str(b.get("brandId")) for b in s.get("brands", []) if b.get("brandId")]
+        if exclude_stations and station_id in exclude_stations:
+            continue
+        if exclude_brands and any(b_id in exclude_brands for b_id in brand_ids):
+            continue
+        filtered.append(s)
+    return filtered
+
+
+def _per_call_us(func) -> float:
+    """Return the best time of one call in microseconds."""
+    return min(timeit.repeat(func, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+
+
+def main() -> None:
+    """Print per-refresh filter time for list scans and compiled sets."""
+    data = {
+        # Exclude every other station so about half the lookups hit.
+        CONF_EXCLUDE_STATIONS: [str(100000 + 2 * i) for i in range(EXCLUDED_STATIONS)],
+        CONF_EXCLUDE_BRANDS: [str(200 + i) for i in range(EXCLUDED_BRANDS)],
+    }
+    compiled = StationFilter(data)
+    print(
+        f"{EXCLUDED_STATIONS} excluded stations, {EXCLUDED_BRANDS} excluded brands; "
+        f"compiling once: {_per_call_us(lambda: StationFilter(data)):.1f} us"
+    )
+    for count in STATION_COUNTS:
+        stations = _stations(count)
+        assert _list_filter(data, stations) == list(filter(compiled, stations))
+        lists_us = _per_call_us(lambda stations=stations: _list_filter(data, stations))
+        sets_us = _per_call_us(lambda stations=stations: list(filter(compiled, stations)))
+        print(
+            f"{count:3d} stations: lists {lists_us:8.1f} us, sets {sets_us:6.1f} us "
+            f"({lists_us / sets_us:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark cheapest-within-radius searches of the hub's station index.
+
+Compares the grid index with a linear scan over every indexed station,
+for a few index sizes spread over a metro area.
+
+Run with ``python -m tests.benchmarks.bench_station_index``.
+"""
+# ruff: noqa: SLF001, T201
+
+import random
+import timeit
+
+from custom_components.gasbuddy.geo import distance_miles
+from custom_components.gasbuddy.spatial import GasBuddyStationIndex
+
+ROUNDS = 200
+CENTRE = (41.88, -87.63)
+STATION_COUNTS = (500, 2000, 5000)
+RADIUS = 5.0
+# Stations are spread over a square this many degrees wide.
+SPREAD = 1.5
+
+
+def _index(count: int) -> GasBuddyStationIndex:
+    """Return an index of ``count`` stations around the centre."""
+    rng = random.Random(count)
+    index = GasBuddyStationIndex(capacity=count)
+    index.async_observe({
+        "results": [
+            {
+                "station_id": str(station_id),
+                "latitude": CENTRE[0] + rng.uniform(-SPREAD, SPREAD) / 2,
+                "longitude": CENTRE[1] + rng.uniform(-SPREAD, SPREAD) / 2,
+                "regular_gas": {"price": round(rng.uniform(2.8, 4.2), 2), "cash_price": None},
+            }
+            for station_id in range(count)
+        ]
+    })
+    return index
+
+
+def _linear(index: GasBuddyStationIndex) -> list:
+    """Return the five cheapest stations within the radius by scanning them all."""
+    found = [
+        (entry.station["regular_gas"]["price"], entry.station["station_id"])
+        for entry in index._stations.values()
+        if distance_miles(*CENTRE, entry.lat, entry.lon) <= RADIUS
+    ]
+    return sorted(found)[:5]
+
+
+def main() -> None:
+    """Print microseconds per search for the grid and a linear scan."""
+    for count in STATION_COUNTS:
+        index = _index(count)
+        ranked, total = index.cheapest(*CENTRE, RADIUS, "regular_gas", "credit", 5)
+        assert [price for price, _, _, _ in ranked] == [price for price, _ in _linear(index)]
+        grid = min(
+            timeit.repeat(
+                lambda index=index: index.cheapest(*CENTRE, RADIUS, "regular_gas", "credit", 5),
+                number=ROUNDS,
+                repeat=5,
+            )
+        )
+        linear = min(timeit.repeat(lambda index=index: _linear(index), number=ROUNDS, repeat=5))
+        print(
+            f"{count:5d} stations, {total:3d} within {RADIUS:g} mi: "
+            f"grid {grid / ROUNDS * 1e6:7.1f} us, linear {linear / ROUNDS * 1e6:7.1f} us "
+            f"({linear / grid:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Test adaptive polling and upstream call counting."""
+# ruff: noqa: SLF001
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.gasbuddy.const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+)
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator, PriceChangeTracker
+from custom_components.gasbuddy.hub import GasBuddyHub
+from custom_components.gasbuddy.metrics import GasBuddyCallCounter
+from tests.conftest import _make_cheapest_subentry, _make_hub_entry, _make_station_subentry
+from tests.const import COORDINATOR_DATA, HUB_DATA
+
+pytestmark = pytest.mark.asyncio
+
+_MIN = timedelta(minutes=15)
+_MAX = timedelta(hours=4)
+_BASE = timedelta(hours=1)
+
+
+def _station(price: float, updated: datetime) -> dict:
+    """Return station data with a single regular price."""
+    return {"regular_gas": {"price": price, "last_updated": updated.isoformat()}}
+
+
+async def test_tracker_tightens_for_volatile_stations():
+    """Frequent price changes shorten the interval, down to the minimum."""
+    tracker = PriceChangeTracker()
+    now = datetime.now(UTC)
+    assert tracker.interval(_BASE, _MIN, _MAX) == _BASE
+
+    # The first refresh is not a change, and the configured interval is kept
+    # unclamped until two changes are seen.
+    tracker.observe(_station(3.09, now - timedelta(hours=3)))
+    assert tracker._changes == []
+    tracker.observe(_station(3.05, now - timedelta(hours=2)))
+    assert tracker.interval(_BASE, timedelta(hours=2), _MAX) == _BASE
+
+    for step, price in enumerate((3.09, 3.05, 2.99, 3.01)):
+        tracker.observe(_station(price, now - timedelta(hours=3 - step)))
+    # Unchanged prices and empty fuels are not changes.
+    tracker.observe({**_station(3.01, now), "premium_gas": {"price": None}, "e85": None})
+
+    assert tracker.interval(_BASE, _MIN, _MAX) == timedelta(minutes=30)
+    assert tracker.interval(_BASE, timedelta(hours=2), _MAX) == timedelta(hours=2)
+
+
+async def test_tracker_backs_off_for_quiet_stations():
+    """A station that stopped changing backs off, up to the maximum."""
+    tracker = PriceChangeTracker(history=3)
+    now = datetime.now(UTC)
+    for step, price in enumerate((3.19, 3.15, 3.09, 3.05)):
+        tracker.observe(_station(price, now - timedelta(hours=10, minutes=4 - step)))
+
+    assert len(tracker._changes) == 3
+    assert tracker.interval(_BASE, _MIN, _MAX) == _MAX
+
+    # A change without a reported time counts from now.
+    tracker.observe({"regular_gas": {"price": 3.29, "last_updated": None}})
+    assert tracker._changes[-1] == pytest.approx(now.timestamp(), abs=60)
+    assert tracker.interval(_BASE, _MIN, _MAX) < _MAX
+
+
+async def test_coordinator_adapts_interval_when_enabled(hass):
+    """The hub option retunes the coordinator's update interval."""
+    entry = _make_hub_entry(
+        hass,
+        hub_data={
+            **HUB_DATA,
+            CONF_ADAPTIVE_POLLING: True,
+            CONF_MIN_INTERVAL: 600,
+            CONF_MAX_INTERVAL: 7200,
+        },
+    )
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, hub=hub)
+    coordinator._tracker._changes = [0.0, 1.0]
+
+    with patch.object(coordinator, "_async_price_lookup", return_value=dict(COORDINATOR_DATA)):
+        await coordinator._async_update_data()
+
+    assert coordinator.update_interval == timedelta(seconds=7200)
+
+    # Without the option the configured interval is kept.
+    plain = GasBuddyUpdateCoordinator(hass, _make_hub_entry(hass), hub=hub)
+    plain._tracker._changes = [0.0, 1.0]
+    with patch.object(plain, "_async_price_lookup", return_value=dict(COORDINATOR_DATA)):
+        await plain._async_update_data()
+    assert plain.update_interval == timedelta(seconds=3600)
+
+
+async def test_upstream_calls_are_counted(hass):
+    """Hub requests are counted over a rolling day."""
+    counter = GasBuddyCallCounter()
+    counter.record()
+    counter.record()
+    assert counter.calls_per_day == 2
+    counter._window = -1
+    assert counter.calls_per_day == 0
+    assert counter.total == 2
+
+    cheapest = _make_cheapest_subentry()
+    entry = _make_hub_entry(hass, subentries=[cheapest])
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, cheapest, hub=hub)
+    coordinator._api = MagicMock()
+    coordinator._api.price_lookup_service = AsyncMock(return_value={"results": []})
+    with pytest.raises(Exception, match="No stations"):
+        await coordinator._async_update_data()
+    assert hub.calls.calls_per_day == 1
+
+    hub.batcher._window = 0
+    station = GasBuddyUpdateCoordinator(hass, entry, _make_station_subentry(), hub=hub)
+    station._api = MagicMock()
+    station._api.price_lookup = AsyncMock(return_value=dict(COORDINATOR_DATA))
+    await station._async_update_data()
+    assert hub.calls.total == 2
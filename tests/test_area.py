@@ -0,0 +1,105 @@
+"""Test area snapshots shared by cheapest gas trackers."""
+# ruff: noqa: SLF001
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.gasbuddy.area import GasBuddyAreaSnapshots
+from custom_components.gasbuddy.const import AREA_MAX_AGE, CONF_FUEL_KEY
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.hub import GasBuddyHub
+from tests.conftest import _make_cheapest_subentry, _make_hub_entry
+from tests.const import CHEAPEST_SUBENTRY_DATA
+
+pytestmark = pytest.mark.asyncio
+
+_AREA_RESULTS = {
+    "results": [
+        {
+            "station_id": "1",
+            "name": "Regular Stop",
+            "regular_gas": {"price": 2.99},
+            "diesel": {"price": 3.99},
+        },
+        {
+            "station_id": "2",
+            "name": "Diesel Stop",
+            "regular_gas": {"price": 3.09},
+            "diesel": {"price": 3.79},
+        },
+    ]
+}
+
+
+def _mock_api() -> MagicMock:
+    """Return a client that answers area lookups."""
+    api = MagicMock()
+    api.price_lookup_service = AsyncMock(return_value=_AREA_RESULTS)
+    return api
+
+
+async def test_cheapest_trackers_share_one_area_query(hass):
+    """Trackers at one location filter the same snapshot for their own fuel."""
+    regular = _make_cheapest_subentry()
+    diesel = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_FUEL_KEY: "diesel"},
+        subentry_id="diesel_subentry_id",
+        unique_id="diesel_subentry_id",
+    )
+    entry = _make_hub_entry(hass, subentries=[regular, diesel])
+    hub = GasBuddyHub(hass, entry)
+    api = _mock_api()
+    coordinators = [
+        GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub) for subentry in (regular, diesel)
+    ]
+    for coordinator in coordinators:
+        coordinator._api = api
+
+    first = await coordinators[0]._async_update_data()
+    second = await coordinators[1]._async_update_data()
+
+    assert first["station_id"] == "1"
+    assert second["station_id"] == "2"
+    api.price_lookup_service.assert_awaited_once()
+    assert (hub.areas.hits, hub.areas.misses) == (1, 1)
+    # Each tracker decorates its own copy of the winning station.
+    assert "runner_ups" not in _AREA_RESULTS["results"][0]
+    assert "last_updated" not in _AREA_RESULTS["results"][1]
+
+
+async def test_area_snapshots_expire():
+    """Snapshots older than the caller's interval are fetched again."""
+    areas = GasBuddyAreaSnapshots()
+    api = _mock_api()
+
+    await areas.async_price_lookup(api, 41.8781, -87.6298, None, 600)
+    await areas.async_price_lookup(api, 41.87812, -87.62981, None, 600)
+    assert api.price_lookup_service.await_count == 1
+
+    key = ("gps", 41.878, -87.63)
+    fetched_at, result = areas._snapshots[key]
+    areas._snapshots[key] = (fetched_at - 120, result)
+    await areas.async_price_lookup(api, 41.8781, -87.6298, None, 60)
+    assert api.price_lookup_service.await_count == 2
+
+    # Nothing is reused past AREA_MAX_AGE, and stale snapshots are pruned.
+    areas._snapshots[("gps", 0.0, 0.0)] = (fetched_at - AREA_MAX_AGE - 1, result)
+    await areas.async_price_lookup(api, None, None, "60601", 3600)
+    assert ("gps", 0.0, 0.0) not in areas._snapshots
+    assert api.price_lookup_service.await_count == 3
+
+
+async def test_area_snapshots_key_postal_codes():
+    """Postal code searches share a snapshot regardless of formatting."""
+    areas = GasBuddyAreaSnapshots()
+    api = _mock_api()
+
+    first = await areas.async_price_lookup(api, None, None, "k1a 0b1")
+    second = await areas.async_price_lookup(api, None, None, "K1A0B1")
+
+    api.price_lookup_service.assert_awaited_once_with(
+        lat=None, lon=None, zipcode="k1a 0b1", limit=20
+    )
+    assert first == second
+    assert first is not second
@@ -0,0 +1,189 @@
+"""Test the hub-level price batcher."""
+# ruff: noqa: SLF001
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from py_gasbuddy.exceptions import APIError
+import pytest
+
+from custom_components.gasbuddy.batch import GasBuddyPriceBatcher
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.geo import distance_miles
+from custom_components.gasbuddy.hub import GasBuddyHub
+from tests.conftest import _make_cheapest_subentry, _make_hub_entry, _make_station_subentry
+from tests.const import STATION_SUBENTRY_DATA
+
+pytestmark = pytest.mark.asyncio
+
+_AREA_RESULTS = {
+    "results": [
+        {
+            "station_id": "999001",
+            "name": "Test Gas Co",
+            "distance": 0.4,
+            "latitude": 41.8781,
+            "longitude": -87.6298,
+            "regular_gas": {"price": 2.95},
+        },
+        {
+            "station_id": "999002",
+            "name": "Cheap Gas",
+            "distance": 0.9,
+            "latitude": 41.8800,
+            "longitude": -87.6300,
+            "regular_gas": {"price": 2.89},
+        },
+    ]
+}
+
+
+def _mock_api(**kwargs) -> MagicMock:
+    """Return a mocked GasBuddy client."""
+    api = MagicMock()
+    api.price_lookup_service = AsyncMock(**kwargs)
+    api.price_lookup = AsyncMock(return_value={"station_id": "direct"})
+    return api
+
+
+async def test_batcher_combines_nearby_stations(hass):
+    """Stations due together in one area are answered by a single area query."""
+    batcher = GasBuddyPriceBatcher(hass, window=0)
+    batcher.async_register("999001", 41.8781, -87.6298)
+    batcher.async_register("999002", 41.8800, -87.6300)
+    api = _mock_api(return_value=_AREA_RESULTS)
+
+    first, second = await asyncio.gather(
+        batcher.async_price_lookup(api, "999001", 41.8781, -87.6298),
+        batcher.async_price_lookup(api, 999002),
+    )
+
+    assert first["name"] == "Test Gas Co"
+    assert second["name"] == "Cheap Gas"
+    assert "distance" not in first
+    api.price_lookup_service.assert_awaited_once()
+    api.price_lookup.assert_not_awaited()
+    assert batcher.area_queries == 1
+    assert batcher.station_queries == 0
+
+
+async def test_batcher_serves_neighbour_from_fresh_slice(hass):
+    """A neighbour coming due later reuses the slice from the earlier area query."""
+    batcher = GasBuddyPriceBatcher(hass, window=0)
+    batcher.async_register("999001", 41.8781, -87.6298)
+    batcher.async_register("999002", 41.8800, -87.6300)
+    batcher.async_register("999003", 41.8790, -87.6310)
+    api = _mock_api(return_value={"results": [*_AREA_RESULTS["results"], {"station_id": "999004"}]})
+
+    await asyncio.gather(
+        batcher.async_price_lookup(api, "999001"), batcher.async_price_lookup(api, "999003")
+    )
+    # Only the registered station that was not due is kept for later.
+    assert set(batcher._slices) == {"999002"}
+    data = await batcher.async_price_lookup(api, "999002")
+
+    assert data["regular_gas"]["price"] == 2.89
+    api.price_lookup_service.assert_awaited_once()
+
+    # An explicit refresh does not use the slice.
+    assert await batcher.async_price_lookup(api, "999002", refresh=True) == {"station_id": "direct"}
+
+    # Once the slice ages out the station is fetched again, and old slices are pruned.
+    batcher._max_age = -1
+    assert await batcher.async_price_lookup(api, "999002") == {"station_id": "direct"}
+    batcher._slices["999009"] = (0.0, {})
+    await asyncio.gather(
+        batcher.async_price_lookup(api, "999001"), batcher.async_price_lookup(api, "999003")
+    )
+    assert "999009" not in batcher._slices
+
+
+async def test_batcher_lone_station_uses_direct_lookup(hass):
+    """A station due on its own keeps using price_lookup, even with neighbours."""
+    batcher = GasBuddyPriceBatcher(hass, window=0)
+    batcher.async_register("999001", 41.8781, -87.6298)
+    batcher.async_register("999002", 41.8800, -87.6300)
+    batcher.async_register("999010", None, None)
+    api = _mock_api(return_value=_AREA_RESULTS)
+
+    assert await batcher.async_price_lookup(api, "999001") == {"station_id": "direct"}
+    assert await batcher.async_price_lookup(api, "999010") == {"station_id": "direct"}
+    api.price_lookup_service.assert_not_awaited()
+    assert batcher.station_queries == 2
+
+
+async def test_batcher_falls_back_for_uncovered_stations(hass):
+    """Stations missing from the area results, or a failed area query, fall back."""
+    batcher = GasBuddyPriceBatcher(hass, window=0)
+    batcher.async_register("999001", 41.8781, -87.6298)
+    batcher.async_register("999003", 41.8790, -87.6310)
+    api = _mock_api(return_value={"results": [*_AREA_RESULTS["results"], {"name": "no id"}]})
+
+    first, third = await asyncio.gather(
+        batcher.async_price_lookup(api, "999001"), batcher.async_price_lookup(api, "999003")
+    )
+    assert first["name"] == "Test Gas Co"
+    assert third == {"station_id": "direct"}
+
+    failing = _mock_api(side_effect=APIError("boom"))
+    failing.price_lookup = AsyncMock(side_effect=APIError("still boom"))
+    with pytest.raises(APIError):
+        await asyncio.gather(
+            batcher.async_price_lookup(failing, "999001"),
+            batcher.async_price_lookup(failing, "999003"),
+        )
+    failing.price_lookup_service.assert_awaited_once()
+
+
+async def test_batcher_waits_for_window(hass):
+    """Lookups inside the batching window share one flush."""
+    batcher = GasBuddyPriceBatcher(hass, window=0.01)
+    batcher.async_register("999001", 41.8781, -87.6298)
+    batcher.async_register("999002", 41.8800, -87.6300)
+    api = _mock_api(return_value=_AREA_RESULTS)
+
+    results = await asyncio.gather(
+        batcher.async_price_lookup(api, "999001"),
+        batcher.async_price_lookup(api, "999001"),
+        batcher.async_price_lookup(api, "999002"),
+    )
+
+    assert [r["station_id"] for r in results] == ["999001", "999001", "999002"]
+    api.price_lookup_service.assert_awaited_once()
+
+
+async def test_coordinator_uses_hub_batcher(hass):
+    """Station coordinators route price lookups through the hub batcher."""
+    station = _make_station_subentry()
+    neighbour = _make_station_subentry(
+        data={**STATION_SUBENTRY_DATA, "station_id": 999002, "latitude": 41.88},
+        subentry_id="neighbour_subentry_id",
+        unique_id="999002",
+    )
+    cheapest = _make_cheapest_subentry()
+    entry = _make_hub_entry(hass, subentries=[station, neighbour, cheapest])
+    hub = GasBuddyHub(hass, entry)
+    hub.batcher._window = 0
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, station, hub=hub)
+    other = GasBuddyUpdateCoordinator(hass, entry, neighbour, hub=hub)
+    GasBuddyUpdateCoordinator(hass, entry, cheapest, hub=hub)
+    assert set(hub.batcher._stations) == {"999001", "999002"}
+
+    coordinator._api = other._api = _mock_api(return_value=_AREA_RESULTS)
+    data, _ = await asyncio.gather(coordinator._async_update_data(), other._async_update_data())
+
+    assert data["name"] == "Test Gas Co"
+    coordinator._api.price_lookup_service.assert_awaited_once()
+    coordinator._api.price_lookup.assert_not_awaited()
+
+    # A requested refresh skips cached slices.
+    with patch.object(hub.batcher, "async_price_lookup", return_value={}) as lookup:
+        await coordinator.async_request_refresh()
+        await coordinator.async_refresh()
+    assert [call.kwargs["refresh"] for call in lookup.call_args_list] == [True, False]
+
+
+async def test_distance_miles():
+    """Test the haversine helper."""
+    assert distance_miles(41.8781, -87.6298, 41.8781, -87.6298) == 0
+    assert distance_miles(40.7128, -74.0060, 34.0522, -118.2437) == pytest.approx(2445, rel=0.01)
@@ -0,0 +1,221 @@
+"""Test the hub circuit breaker for Cloudflare/CSRF-blocked periods."""
+# ruff: noqa: SLF001
+
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from py_gasbuddy import ERROR_TIMEOUT
+from py_gasbuddy.exceptions import APIError, CloudflareBlocked, LibraryError
+import pytest
+
+from custom_components.gasbuddy.breaker import (
+    CircuitOpenError,
+    GasBuddyCircuitBreaker,
+    classify_error,
+    is_blocked,
+    is_timeout,
+)
+from custom_components.gasbuddy.coalesce import GasBuddyRequestCoalescer
+from custom_components.gasbuddy.config_flow import (
+    CloudflareBlocked as FlowCloudflareBlocked,
+    validate_station,
+)
+from custom_components.gasbuddy.const import DOMAIN, HUB
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.hub import GasBuddyHub
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from tests.conftest import _make_hub_entry, _make_station_subentry
+from tests.const import COORDINATOR_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+def _blocked_api() -> MagicMock:
+    """Return a client whose last request hit the Cloudflare block."""
+    api = MagicMock()
+    api._cf_last = False
+    return api
+
+
+async def test_breaker_backs_off_and_probes():
+    """Blocked requests open the breaker; one probe is let through per backoff."""
+    breaker = GasBuddyCircuitBreaker(base=60, max_delay=100, jitter=0.2)
+    assert not is_blocked(APIError("boom"))
+    assert not is_blocked(LibraryError())
+    assert is_blocked(CloudflareBlocked("Missing Token"))
+
+    breaker.acquire()
+    breaker.record(APIError("not a block"))
+    assert breaker.state == "closed"
+
+    breaker.acquire()
+    breaker.record(CloudflareBlocked("Missing Token"))
+    assert breaker.state == "open"
+    assert 48 <= breaker.retry_in <= 72
+    with pytest.raises(CircuitOpenError, match="retrying in"):
+        breaker.acquire()
+    assert not breaker.allows_requests
+
+    breaker._retry_at = 0
+    assert breaker.state == "half_open"
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record(CloudflareBlocked("Missing Token"))
+    # Doubled, then capped at max_delay before jitter.
+    assert breaker.failures == 2
+    assert 80 <= breaker.retry_in <= 120
+
+    # A probe that times out keeps the breaker open at the same delay.
+    breaker._retry_at = 0
+    breaker.acquire()
+    breaker.record(LibraryError(ERROR_TIMEOUT))
+    assert breaker.failures == 2
+    assert breaker.state == "open"
+    assert 80 <= breaker.retry_in <= 120
+
+    breaker._retry_at = 0
+    breaker.acquire()
+    breaker.release()
+    assert breaker.allows_requests
+    breaker.acquire()
+    breaker.record()
+    assert breaker.as_dict() == {
+        "status": "closed",
+        "failures": 0,
+        "retry_in": 0.0,
+        "opened": 1,
+        "rejected": 2,
+    }
+
+
+async def test_is_timeout():
+    """Timeouts are recognised whether asyncio or py_gasbuddy reports them."""
+    assert is_timeout(TimeoutError())
+    assert is_timeout(LibraryError(ERROR_TIMEOUT))
+    assert is_timeout(LibraryError("Timeout while getting CSRF tokens"))
+    assert not is_timeout(LibraryError())
+    assert not is_timeout(LibraryError("Station not found"))
+    assert not is_timeout(LibraryError({"error": "Timeout while updating"}))
+    assert not is_timeout(CloudflareBlocked("Missing Token"))
+
+
+async def test_classify_error():
+    """Failures are taken as a block from the client's state right after the call."""
+    api = _blocked_api()
+    blocked = classify_error(api, LibraryError("<html>"))
+    assert isinstance(blocked, CloudflareBlocked)
+    assert str(blocked) == "<html>"
+    # py_gasbuddy clears _cf_last on a plain timeout too.
+    timeout = LibraryError(ERROR_TIMEOUT)
+    assert classify_error(api, timeout) is timeout
+    error = APIError("Station not found")
+    assert classify_error(api, error) is error
+    error = LibraryError()
+    assert classify_error(MagicMock(), error) is error
+
+
+async def test_coalescer_raises_flagged_blocks():
+    """The coalescer raises a block the client flagged, so callers need not read the client."""
+    coalescer = GasBuddyRequestCoalescer()
+    api = _blocked_api()
+    api.price_lookup = AsyncMock(side_effect=LibraryError("Retries exhausted"))
+
+    with pytest.raises(CloudflareBlocked, match="Retries exhausted") as err:
+        await coalescer.async_request(api, "price_lookup", "999001")
+    assert isinstance(err.value.__cause__, LibraryError)
+    assert coalescer.breaker.failures == 1
+
+
+async def test_coalescer_stops_sending_while_open():
+    """The coalescer raises instead of calling GasBuddy while the breaker is open."""
+    coalescer = GasBuddyRequestCoalescer()
+    api = MagicMock()
+    api.price_lookup = AsyncMock(side_effect=CloudflareBlocked("Missing Token"))
+
+    with pytest.raises(CloudflareBlocked):
+        await coalescer.async_request(api, "price_lookup", "999001")
+    with pytest.raises(CircuitOpenError):
+        await coalescer.async_request(api, "price_lookup", "999001")
+    api.price_lookup.assert_awaited_once()
+    assert coalescer.calls.total == 1
+
+    # A cancelled probe frees the half-open slot.
+    coalescer.breaker._retry_at = 0
+    release = asyncio.Event()
+    api.price_lookup = AsyncMock(side_effect=release.wait)
+    probe = asyncio.create_task(coalescer.async_request(api, "price_lookup", "999001"))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert coalescer.breaker.allows_requests
+
+
+async def test_coordinator_serves_last_good_data_while_blocked(hass):
+    """Coordinators keep their last good data, marked stale, while blocked."""
+    subentry = _make_station_subentry()
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry)
+    coordinator._api = MagicMock()
+    coordinator._api.price_lookup = AsyncMock(side_effect=CloudflareBlocked("Missing Token"))
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    with pytest.raises(UpdateFailed, match="blocking requests"):
+        await coordinator._async_update_data()
+    coordinator._api.price_lookup.assert_awaited_once()
+
+    updated = datetime(2025, 1, 1, tzinfo=UTC)
+    coordinator._requests.breaker._retry_at = 0
+    coordinator._last_good = {**COORDINATOR_DATA, "last_updated": updated}
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == COORDINATOR_DATA["station_id"]
+    assert coordinator.stale
+    assert coordinator.stale_since == updated.isoformat()
+    assert coordinator._api.price_lookup.await_count == 2
+
+    # While the breaker is open the refresh does not touch GasBuddy at all.
+    assert await coordinator._async_update_data() is data
+    assert coordinator._api.price_lookup.await_count == 2
+
+    # A probe that times out is reported rather than hidden, and the breaker stays open.
+    coordinator._requests.breaker._retry_at = 0
+    coordinator._api.price_lookup = AsyncMock(side_effect=LibraryError(ERROR_TIMEOUT))
+    with pytest.raises(UpdateFailed, match=ERROR_TIMEOUT):
+        await coordinator._async_update_data()
+    assert coordinator._requests.breaker.failures == 2
+
+    # A rejected answer does not replace the last good data.
+    coordinator._requests.breaker._retry_at = 0
+    coordinator._api.price_lookup = AsyncMock(
+        return_value={**COORDINATOR_DATA, "latitude": 0.0, "longitude": 0.0}
+    )
+    with pytest.raises(UpdateFailed, match="collision"):
+        await coordinator._async_update_data()
+    assert coordinator._data is data
+
+    # Losing the half-open probe to another caller fails cleanly without data.
+    coordinator._last_good = {}
+    coordinator._requests.breaker.record()
+    with (
+        patch.object(coordinator, "_async_fetch_data", side_effect=CircuitOpenError(5)),
+        pytest.raises(UpdateFailed, match="retrying in 5 seconds"),
+    ):
+        await coordinator._async_update_data()
+
+
+async def test_validate_station_reports_open_breaker(hass):
+    """Config flows report the block while the hub breaker is open."""
+    entry = _make_hub_entry(hass)
+    hub = GasBuddyHub(hass, entry)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {HUB: hub}
+    hub.breaker.record(CloudflareBlocked("Missing Token"))
+
+    with (
+        patch("py_gasbuddy.GasBuddy.price_lookup") as price_lookup,
+        pytest.raises(FlowCloudflareBlocked),
+    ):
+        await validate_station(hass, 999001)
+    price_lookup.assert_not_called()
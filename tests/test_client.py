@@ -0,0 +1,109 @@
+"""Test the pooled GasBuddy clients."""
+# ruff: noqa: SLF001
+
+import asyncio
+
+import pytest
+
+from custom_components.gasbuddy.client import GasBuddyClientPool
+from custom_components.gasbuddy.coalesce import GasBuddyRequestCoalescer
+from custom_components.gasbuddy.const import CONF_TIMEOUT, COORDINATOR, DOMAIN, HUB
+from custom_components.gasbuddy.hub import async_get_client
+from tests.conftest import _make_hub_entry
+from tests.const import HUB_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_pool_reuses_clients(hass):
+    """Clients are reused per solver and station, oldest dropped first."""
+    pool = GasBuddyClientPool(hass, size=3, timeout=30000)
+
+    client = pool.async_get()
+    assert pool.async_get("") is client
+    assert client._timeout == 30000
+    assert client._id is None
+
+    station = pool.async_get(station_id=111)
+    assert pool.async_get(None, " 111") is station
+    assert station is not client
+    assert station._id == 111
+
+    pool.async_get("http://solver.local")
+    pool.async_get("http://other.local")
+    assert len(pool._clients) == 3
+    assert pool.async_get() is not client
+
+
+async def test_each_station_queries_its_own_client(hass):
+    """Concurrent station lookups each go through their own station's client."""
+    pool = GasBuddyClientPool(hass)
+    requests = GasBuddyRequestCoalescer()
+    queried = []
+
+    async def _process_request(query):
+        queried.append(query["variables"]["id"])
+        await asyncio.sleep(0)
+        return {"error": "Timeout while updating"}
+
+    clients = [pool.async_get(station_id=station) for station in ("111", "222")]
+    for client in clients:
+        client.process_request = _process_request
+    results = await asyncio.gather(
+        *(
+            requests.async_request(client, "price_lookup", station)
+            for client, station in zip(clients, ("111", "222"), strict=True)
+        ),
+        return_exceptions=True,
+    )
+    assert len(results) == 2
+    assert sorted(queried) == ["111", "222"]
+
+
+async def test_requests_through_different_solvers_are_not_shared(hass):
+    """Identical requests are only coalesced when they use the same solver."""
+    pool = GasBuddyClientPool(hass)
+    requests = GasBuddyRequestCoalescer()
+    release = asyncio.Event()
+    calls = []
+
+    def _client(solver):
+        client = pool.async_get(solver)
+
+        async def _lookup(**kwargs):
+            calls.append(solver)
+            await release.wait()
+            return {"results": []}
+
+        client.price_lookup_service = _lookup
+        return client
+
+    direct, solved, direct_again = _client(None), _client("http://solver.local"), _client(None)
+    tasks = [
+        asyncio.create_task(requests.async_request(client, "price_lookup_service", zipcode="1"))
+        for client in (direct, solved, direct_again)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sorted(calls, key=str) == [None, "http://solver.local"]
+    assert requests.coalesced == 1
+
+
+async def test_hub_shares_pooled_clients(hass, mock_gasbuddy):
+    """Coordinators, services and flows share the loaded hub's clients."""
+    standalone = async_get_client(hass)
+    assert async_get_client(hass) is not standalone
+
+    entry = _make_hub_entry(hass, hub_data={**HUB_DATA, CONF_TIMEOUT: 20000})
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]["test_subentry_id"]
+    # Services and flows ask without a timeout and still get the hub's client.
+    station_id = coordinator._subentry.data["station_id"]
+    assert async_get_client(hass, station_id=station_id) is coordinator._api
+    assert coordinator._api._timeout == 20000
+    assert async_get_client(hass) is not coordinator._api
+    assert len(hub.clients._clients) == 2
@@ -0,0 +1,117 @@
+"""Test single-flight coalescing of GasBuddy requests."""
+# ruff: noqa: SLF001
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from py_gasbuddy.exceptions import APIError
+import pytest
+
+from custom_components.gasbuddy.coalesce import GasBuddyRequestCoalescer
+from custom_components.gasbuddy.const import DOMAIN, HUB
+from custom_components.gasbuddy.hub import GasBuddyHub, async_get_coalescer
+from tests.conftest import _make_hub_entry
+
+pytestmark = pytest.mark.asyncio
+
+
+def _gated_api(release: asyncio.Event, **kwargs) -> MagicMock:
+    """Return a client whose area lookup waits for ``release``."""
+
+    async def _lookup(**_):
+        await release.wait()
+        if "side_effect" in kwargs:
+            raise kwargs["side_effect"]
+        return {"results": [{"station_id": "999001"}]}
+
+    api = MagicMock()
+    api.price_lookup_service = AsyncMock(side_effect=_lookup)
+    return api
+
+
+async def test_identical_requests_share_one_call():
+    """Concurrent identical callers get copies of one upstream result."""
+    coalescer = GasBuddyRequestCoalescer()
+    release = asyncio.Event()
+    api = _gated_api(release)
+
+    tasks = [
+        asyncio.create_task(
+            coalescer.async_request(api, "price_lookup_service", lat=41.8, lon=-87.6, limit=5)
+        )
+        for _ in range(3)
+    ]
+    other = asyncio.create_task(
+        coalescer.async_request(api, "price_lookup_service", lat=41.8, lon=-87.6, limit=10)
+    )
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, other)
+
+    assert api.price_lookup_service.await_count == 2
+    assert coalescer.coalesced == 2
+    assert coalescer.calls.total == 2
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]
+    assert not coalescer._inflight
+
+
+async def test_joined_callers_share_errors():
+    """A failed request fails every caller that joined it."""
+    coalescer = GasBuddyRequestCoalescer()
+    release = asyncio.Event()
+    api = _gated_api(release, side_effect=APIError("boom"))
+
+    tasks = [
+        asyncio.create_task(coalescer.async_request(api, "price_lookup_service", zipcode="62701"))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, APIError) for result in results)
+    api.price_lookup_service.assert_awaited_once()
+
+
+async def test_waiter_retries_when_owner_is_cancelled():
+    """Cancelling the first caller does not cancel the callers that joined it."""
+    coalescer = GasBuddyRequestCoalescer()
+    release = asyncio.Event()
+    api = _gated_api(release)
+
+    owner = asyncio.create_task(coalescer.async_request(api, "price_lookup_service", limit=5))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(coalescer.async_request(api, "price_lookup_service", limit=5))
+    await asyncio.sleep(0)
+    owner.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await waiter)["results"][0]["station_id"] == "999001"
+    assert owner.cancelled()
+    assert api.price_lookup_service.await_count == 2
+
+    # A cancelled waiter still raises.
+    release.clear()
+    owner = asyncio.create_task(coalescer.async_request(api, "price_lookup_service", limit=5))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(coalescer.async_request(api, "price_lookup_service", limit=5))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    release.set()
+    await owner
+
+
+async def test_get_coalescer_prefers_loaded_hub(hass):
+    """Services and flows share the hub coalescer once the hub is loaded."""
+    standalone = async_get_coalescer(hass)
+    assert standalone is not async_get_coalescer(hass)
+
+    entry = _make_hub_entry(hass)
+    hub = GasBuddyHub(hass, entry)
+    hass.data.setdefault(DOMAIN, {})["station_coordinates_by_flow"] = {}
+    hass.data[DOMAIN][entry.entry_id] = {HUB: hub}
+    assert async_get_coalescer(hass) is hub.requests
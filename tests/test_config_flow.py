@@ -15,8 +15,10 @@ from custom_components.gasbuddy.config_flow import (
     validate_station,
 )
 from custom_components.gasbuddy.const import (
+    CONF_ADAPTIVE_POLLING,
     CONF_BRAND_ADJUSTMENTS,
     CONF_CHEAPEST,
+    CONF_DETOUR_PENALTY,
     CONF_EV_CHARGING,
     CONF_EXCLUDE_BRANDS,
     CONF_EXCLUDE_STATIONS,
@@ -25,12 +27,19 @@ from custom_components.gasbuddy.const import (
     CONF_GPS,
     CONF_INCLUDE_BRANDS,
     CONF_INCLUDE_STATIONS,
+    CONF_INDEX_RADIUS,
     CONF_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
     CONF_NAME,
     CONF_POSTAL,
     CONF_PRICE_TYPE,
+    CONF_RESPONSE_CACHE_SIZE,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_ROUTE,
     CONF_SHOW_DISCOUNTED,
     CONF_SOLVER,
+    CONF_STARTUP_CONCURRENCY,
     CONF_STATION_ID,
     CONF_TIMEOUT,
     CONF_UOM,
@@ -278,6 +287,9 @@ async def test_station_subentry_cheapest_flow(hass):
     assert result["data"][CONF_CHEAPEST] is True
     assert result["data"][CONF_EXCLUDE_BRANDS] == ["brand_a"]
     assert result["data"][CONF_INCLUDE_STATIONS] == ["999001"]
+    assert result["data"][CONF_INDEX_RADIUS] == 0
+    assert result["data"][CONF_ROUTE] == []
+    assert result["data"][CONF_DETOUR_PENALTY] == 0.01
 
 
 async def test_subentry_reconfigure(hass):
@@ -457,9 +469,35 @@ async def test_hub_options_flow(hass):
             CONF_SOLVER: "http://solver-new",
             CONF_TIMEOUT: 30000,
             CONF_BRAND_ADJUSTMENTS: {"Shell": -0.10},
+            CONF_STARTUP_CONCURRENCY: 8,
+            CONF_ADAPTIVE_POLLING: True,
+            CONF_MIN_INTERVAL: 7200,
+            CONF_MAX_INTERVAL: 3600,
+        },
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {CONF_MAX_INTERVAL: "invalid_interval_bounds"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "GasBuddy Hub New",
+            CONF_SOLVER: "http://solver-new",
+            CONF_TIMEOUT: 30000,
+            CONF_BRAND_ADJUSTMENTS: {"Shell": -0.10},
+            CONF_STARTUP_CONCURRENCY: 8,
+            CONF_ADAPTIVE_POLLING: True,
+            CONF_MIN_INTERVAL: 600,
+            CONF_MAX_INTERVAL: 7200,
+            CONF_RESPONSE_CACHE_TTL: 0,
+            CONF_RESPONSE_CACHE_SIZE: 16,
         },
     )
     assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert hub.data[CONF_STARTUP_CONCURRENCY] == 8
+    assert hub.data[CONF_ADAPTIVE_POLLING] is True
+    assert (hub.data[CONF_MIN_INTERVAL], hub.data[CONF_MAX_INTERVAL]) == (600, 7200)
+    assert (hub.data[CONF_RESPONSE_CACHE_TTL], hub.data[CONF_RESPONSE_CACHE_SIZE]) == (0, 16)
     assert hub.data[CONF_NAME] == "GasBuddy Hub New"
     assert hub.data[CONF_SOLVER] == "http://solver-new"
     assert hub.data[CONF_TIMEOUT] == 30000
@@ -965,6 +1003,19 @@ async def test_cheapest_flow_edge_cases(hass):
         {"next_step_id": "cheapest"},
     )
 
+    # A route needs at least two points
+    res = await hass.config_entries.subentries.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "Cheapest",
+            CONF_FUEL_KEY: "regular_gas",
+            CONF_PRICE_TYPE: "best",
+            CONF_ROUTE: [[41.88, -87.63]],
+        },
+    )
+    assert res["type"] == FlowResultType.FORM
+    assert res["errors"][CONF_ROUTE] == "invalid_route"
+
     # Invalid postal input in cheapest
     res = await hass.config_entries.subentries.async_configure(
         result["flow_id"],
@@ -973,6 +1024,7 @@ async def test_cheapest_flow_edge_cases(hass):
             CONF_FUEL_KEY: "regular_gas",
             CONF_PRICE_TYPE: "best",
             CONF_POSTAL: "invalid!",
+            CONF_ROUTE: [],
         },
     )
     assert res["type"] == FlowResultType.FORM
@@ -1055,6 +1107,19 @@ async def test_reconfigure_cheapest_flow_edge_cases(hass):
     )
     assert result["step_id"] == "reconfigure_cheapest"
 
+    # Invalid route input
+    res = await hass.config_entries.subentries.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "New Cheapest",
+            CONF_FUEL_KEY: "midgrade_gas",
+            CONF_PRICE_TYPE: "best",
+            CONF_ROUTE: [[41.88, -87.63], [91, 0]],
+        },
+    )
+    assert res["type"] == FlowResultType.FORM
+    assert res["errors"][CONF_ROUTE] == "invalid_route"
+
     # Invalid postal input
     res = await hass.config_entries.subentries.async_configure(
         result["flow_id"],
@@ -1063,6 +1128,7 @@ async def test_reconfigure_cheapest_flow_edge_cases(hass):
             CONF_FUEL_KEY: "midgrade_gas",
             CONF_PRICE_TYPE: "best",
             CONF_POSTAL: "invalid!",
+            CONF_ROUTE: [],
         },
     )
     assert res["type"] == FlowResultType.FORM
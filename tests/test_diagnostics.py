@@ -36,6 +36,10 @@ async def test_diagnostics(
     config_diagnostics = await async_get_config_entry_diagnostics(hass, entry)
     assert config_diagnostics["config"]["subentries"][0]["data"]["station_id"] == "**REDACTED**"
     assert config_diagnostics["config"]["title"] == "GasBuddy Hub"
+    assert set(config_diagnostics["upstream_calls"]) == {"last_24h", "total"}
+    assert config_diagnostics["circuit_breaker"]["status"] == "closed"
+    assert set(config_diagnostics["request_metrics"]) == {"operations", "paths"}
+    assert list(config_diagnostics["update_intervals"].values()) == [3600]
 
     # Test Device Diagnostics
     device_registry = dr.async_get(hass)
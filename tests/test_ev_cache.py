@@ -0,0 +1,178 @@
+"""Test the hub-level EV station area cache."""
+# ruff: noqa: SLF001
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from py_gasbuddy.exceptions import APIError
+import pytest
+
+from custom_components.gasbuddy.const import CONF_EV_CHARGING, CONF_FETCH_GAS
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.ev_cache import GasBuddyEVCache
+from custom_components.gasbuddy.hub import GasBuddyHub
+from tests.conftest import _make_hub_entry, _make_station_subentry
+from tests.const import STATION_SUBENTRY_DATA
+
+pytestmark = pytest.mark.asyncio
+
+_EV_STATIONS = {
+    "stations": [
+        {
+            "station_id": "999001",
+            "name": "Downtown EV",
+            "latitude": 41.8781,
+            "longitude": -87.6298,
+            "distance_miles": 0.0,
+            "level2_count": 4,
+        },
+        {
+            "station_id": "999002",
+            "name": "Lakeside EV",
+            "latitude": 41.9000,
+            "longitude": -87.6300,
+            "distance_miles": 1.5,
+            "level2_count": 2,
+        },
+        {
+            "station_id": "999003",
+            "name": "Suburb EV",
+            "latitude": 41.9900,
+            "longitude": -87.6300,
+            "distance_miles": 7.7,
+            "level2_count": 6,
+        },
+        {"station_id": "999004", "name": "Nowhere EV", "latitude": None, "longitude": None},
+    ],
+    "total": 4,
+}
+
+
+def _mock_api(**kwargs) -> MagicMock:
+    """Return a mocked GasBuddy client."""
+    api = MagicMock()
+    api.ev_stations_nearby = AsyncMock(**kwargs)
+    return api
+
+
+async def test_ev_cache_answers_covered_searches(hass):
+    """A search inside a fresh, complete area is answered without a request."""
+    cache = GasBuddyEVCache(hass)
+    api = _mock_api(return_value=_EV_STATIONS)
+
+    first = await cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10)
+    api.ev_stations_nearby.assert_awaited_once_with(
+        lat=41.8781, lon=-87.6298, radius=10.0, limit=50
+    )
+    assert [s["station_id"] for s in first["stations"]] == ["999001", "999002"]
+    assert first["total"] == 2
+
+    second = await cache.async_stations_nearby(api, 41.9000, -87.6300, 5, 1)
+    assert api.ev_stations_nearby.await_count == 1
+    assert [s["station_id"] for s in second["stations"]] == ["999002"]
+    assert second["stations"][0]["distance_miles"] == 0
+    assert second["total"] == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A wider search is not covered and goes upstream.
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 100, 100)
+    assert api.ev_stations_nearby.await_count == 2
+
+
+async def test_ev_cache_trusts_truncated_results_up_to_farthest_station(hass):
+    """A response cut short by its limit only covers the stations it returned."""
+    cache = GasBuddyEVCache(hass, limit=2)
+    api = _mock_api(return_value={"stations": _EV_STATIONS["stations"][:2], "total": 40})
+
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 1, 2)
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 1, 2)
+    assert api.ev_stations_nearby.await_count == 1
+
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 2)
+    assert api.ev_stations_nearby.await_count == 2
+
+
+async def test_ev_cache_expires_areas(hass):
+    """Areas older than the TTL are refetched and pruned."""
+    cache = GasBuddyEVCache(hass, ttl=-1)
+    api = _mock_api(return_value=_EV_STATIONS)
+
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10)
+    await cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10)
+
+    assert api.ev_stations_nearby.await_count == 2
+    assert all(len(areas) == 1 for areas in cache._cells.values())
+
+
+async def test_ev_cache_shares_inflight_searches(hass):
+    """Concurrent searches in one area wait for a single request."""
+    cache = GasBuddyEVCache(hass)
+    release = asyncio.Event()
+
+    async def _slow(**kwargs):
+        await release.wait()
+        return _EV_STATIONS
+
+    api = _mock_api(side_effect=_slow)
+    tasks = [
+        asyncio.create_task(cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10)),
+        asyncio.create_task(cache.async_stations_nearby(api, 41.9000, -87.6300, 5, 10)),
+        asyncio.create_task(cache.async_stations_nearby(api, 33.4591, -112.5027, 5, 10)),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    first, second, far = await asyncio.gather(*tasks)
+
+    # The far away search is not covered by the shared one.
+    assert api.ev_stations_nearby.await_count == 2
+    assert first["total"] == second["total"] == 2
+    assert far["total"] == 0
+
+
+async def test_ev_cache_retries_after_failed_inflight_search(hass):
+    """A waiter fetches on its own when the shared search fails."""
+    cache = GasBuddyEVCache(hass)
+    release = asyncio.Event()
+    calls = 0
+
+    async def _flaky(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await release.wait()
+            raise APIError("boom")
+        return _EV_STATIONS
+
+    api = _mock_api(side_effect=_flaky)
+    failing = asyncio.create_task(cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10))
+    waiting = asyncio.create_task(cache.async_stations_nearby(api, 41.8781, -87.6298, 5, 10))
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(APIError):
+        await failing
+    assert (await waiting)["total"] == 2
+    assert api.ev_stations_nearby.await_count == 2
+
+
+async def test_coordinators_share_hub_ev_cache(hass):
+    """EV enrichment of neighbouring stations makes one upstream request."""
+    ev_data = {**STATION_SUBENTRY_DATA, CONF_EV_CHARGING: True, CONF_FETCH_GAS: False}
+    station = _make_station_subentry(data=ev_data)
+    neighbour = _make_station_subentry(
+        data={**ev_data, "station_id": 999002, "latitude": 41.9},
+        subentry_id="neighbour_subentry_id",
+        unique_id="999002",
+    )
+    entry = _make_hub_entry(hass, subentries=[station, neighbour])
+    hub = GasBuddyHub(hass, entry)
+    api = _mock_api(return_value=_EV_STATIONS)
+
+    levels = []
+    for subentry in (station, neighbour):
+        coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+        coordinator._api = api
+        levels.append((await coordinator._async_update_data())["ev_level2"])
+
+    assert levels == [4, 2]
+    api.ev_stations_nearby.assert_awaited_once()
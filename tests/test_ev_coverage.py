@@ -361,7 +361,7 @@ async def test_services_ev_lookup_gps(hass, mock_gasbuddy):
 
     # Patch the GasBuddy client used inside services.py
     with (
-        patch("custom_components.gasbuddy.services.GasBuddy.ev_stations_nearby") as mock_ev_api,
+        patch("custom_components.gasbuddy.client.GasBuddy.ev_stations_nearby") as mock_ev_api,
     ):
 
         def ev_side_effect(lat, lon, radius=None, limit=None):
@@ -380,7 +380,7 @@ async def test_services_ev_lookup_gps(hass, mock_gasbuddy):
         )
 
         # Check results
-        assert entity_valid in response
+        assert set(response) == {entity_valid, entity_no_coords, entity_exception}
         assert response[entity_valid] == [{"station_id": "123", "name": "Test EV Station"}]
 
         assert entity_no_coords in response
@@ -409,8 +409,8 @@ async def test_services_ev_lookup_zip_success(hass, mock_gasbuddy):
     await hass.async_block_till_done()
 
     with (
-        patch("custom_components.gasbuddy.services.GasBuddy.price_lookup_service") as mock_lookup,
-        patch("custom_components.gasbuddy.services.GasBuddy.ev_stations_nearby") as mock_ev,
+        patch("custom_components.gasbuddy.client.GasBuddy.price_lookup_service") as mock_lookup,
+        patch("custom_components.gasbuddy.client.GasBuddy.ev_stations_nearby") as mock_ev,
     ):
         mock_lookup.return_value = {"results": [{"latitude": 33.45, "longitude": -112.50}]}
         mock_ev.return_value = {"stations": [{"station_id": "999", "name": "Zip EV Station"}]}
@@ -446,7 +446,7 @@ async def test_services_ev_lookup_zip_missing_coords(hass, mock_gasbuddy):
     await hass.async_block_till_done()
 
     with (
-        patch("custom_components.gasbuddy.services.GasBuddy.price_lookup_service") as mock_lookup,
+        patch("custom_components.gasbuddy.client.GasBuddy.price_lookup_service") as mock_lookup,
     ):
         # Coordinates missing in the return payload
         mock_lookup.return_value = {"results": [{"latitude": None, "longitude": None}]}
@@ -482,7 +482,7 @@ async def test_services_ev_lookup_zip_exception(hass, mock_gasbuddy):
     await hass.async_block_till_done()
 
     with (
-        patch("custom_components.gasbuddy.services.GasBuddy.price_lookup_service") as mock_lookup,
+        patch("custom_components.gasbuddy.client.GasBuddy.price_lookup_service") as mock_lookup,
     ):
         mock_lookup.side_effect = Exception("API down")
 
@@ -522,7 +522,7 @@ async def test_services_ev_lookup_optional_params(hass, mock_gasbuddy):
     )
     await hass.async_block_till_done()
 
-    with patch("custom_components.gasbuddy.services.GasBuddy") as mock_gb_class:
+    with patch("custom_components.gasbuddy.client.GasBuddy") as mock_gb_class:
         mock_lookup = AsyncMock(
             return_value={"results": [{"latitude": 33.45, "longitude": -112.50}]}
         )
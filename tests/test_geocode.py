@@ -0,0 +1,163 @@
+"""Test the persistent postal code location cache."""
+# ruff: noqa: SLF001
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.gasbuddy.config_flow import _get_station_list  # noqa: PLC2701
+from custom_components.gasbuddy.const import (
+    ATTR_POSTAL_CODE,
+    CONF_POSTAL,
+    DOMAIN,
+    GEOCODE_STORE_KEY,
+    HUB,
+)
+from custom_components.gasbuddy.geocode import GasBuddyGeocodeCache, normalize_postal_code
+from custom_components.gasbuddy.hub import GasBuddyHub
+from custom_components.gasbuddy.services import GasBuddyServices
+from tests.conftest import _make_hub_entry
+
+pytestmark = pytest.mark.asyncio
+
+_PRICES = {
+    "results": [
+        {
+            "station_id": "1",
+            "latitude": 41.0,
+            "longitude": -87.0,
+            "address": {"postalCode": "62701-1234"},
+        },
+        {
+            "station_id": "2",
+            "latitude": 42.0,
+            "longitude": -88.0,
+            "address": {"postalCode": "62701"},
+        },
+        {"station_id": "3", "latitude": None, "longitude": None, "address": {}},
+        "not a station",
+    ]
+}
+
+
+def _station(station_id, lat, code):
+    """Return a station record with a postal code."""
+    return {
+        "station_id": station_id,
+        "latitude": lat,
+        "longitude": -87.0,
+        "address": {"postalCode": code},
+    }
+
+
+async def test_normalize_postal_code():
+    """Postal codes are compared without spacing, case or ZIP+4 suffixes."""
+    assert normalize_postal_code(" k1a 0b1 ") == "K1A0B1"
+    assert normalize_postal_code("62701-1234") == "62701"
+    assert normalize_postal_code(62701) == "62701"
+
+
+async def test_geocode_learns_centroids(hass, hass_storage):
+    """Stations are grouped by postal code and persisted."""
+    cache = GasBuddyGeocodeCache(hass)
+    cache.async_observe(_PRICES)
+    cache.async_observe(_PRICES)
+    cache.async_observe(None)
+
+    assert cache.get("62701") == (41.5, -87.5)
+    assert cache.get("99999") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache._store._async_cleanup_delay_listener()
+    await cache._store._async_handle_write_data()
+    assert hass_storage[GEOCODE_STORE_KEY]["data"]["codes"]["62701"] == {
+        "1": [41.0, -87.0],
+        "2": [42.0, -88.0],
+    }
+
+    reloaded = GasBuddyGeocodeCache(hass)
+    await reloaded.async_load()
+    assert reloaded.get("62701-0000") == (41.5, -87.5)
+
+
+async def test_geocode_falls_back_to_first_search_result(hass):
+    """A searched code without matching addresses uses the first result."""
+    cache = GasBuddyGeocodeCache(hass)
+    cache.async_observe({"results": [_station("1", 40.0, "11111")]}, "22222")
+    assert cache.get("22222") == (40.0, -87.0)
+
+    # Stations that really are in the code replace the stand-in.
+    cache.async_observe(_station("9", 30.0, "22222"))
+    assert cache.get("22222") == (30.0, -87.0)
+
+    cache.async_observe({"results": [{"station_id": "4"}]}, "33333")
+    assert cache.get("33333") is None
+
+
+async def test_geocode_is_bounded(hass):
+    """Codes and stations per code are capped."""
+    cache = GasBuddyGeocodeCache(hass)
+    with (
+        patch("custom_components.gasbuddy.geocode.GEOCODE_MAX_STATIONS", 2),
+        patch("custom_components.gasbuddy.geocode.GEOCODE_MAX_CODES", 2),
+    ):
+        cache.async_observe({
+            "results": [_station(str(i), 40.0 + i, "11111") for i in range(3)]
+            + [_station("a", 1.0, "22222"), _station("b", 2.0, "33333")]
+        })
+
+    assert cache.get("11111") is None
+    assert list(cache._codes) == ["22222", "33333"]
+
+
+async def test_geocode_load_failure(hass, caplog):
+    """An unreadable store starts empty."""
+    cache = GasBuddyGeocodeCache(hass)
+    with patch.object(cache._store, "async_load", side_effect=ValueError("corrupt")):
+        await cache.async_load()
+    assert cache._codes == {}
+    assert "starting cold" in caplog.text
+
+
+async def test_station_list_uses_known_postal_code(hass):
+    """The config flow skips the geocoding request for a known postal code."""
+    entry = _make_hub_entry(hass)
+    hub = GasBuddyHub(hass, entry)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {HUB: hub}
+    hub.geocodes.async_observe(_station("1", 41.0, "62701"))
+
+    with (
+        patch("py_gasbuddy.GasBuddy.location_search", return_value={"results": []}),
+        patch("py_gasbuddy.GasBuddy.price_lookup_service") as mock_prices,
+        patch("py_gasbuddy.GasBuddy.ev_stations_nearby", return_value={"stations": []}) as mock_ev,
+    ):
+        await _get_station_list(hass, {CONF_POSTAL: "62701"})
+
+    mock_prices.assert_not_called()
+    mock_ev.assert_awaited_once_with(lat=41.0, lon=-87.0, radius=10, limit=20)
+
+
+async def test_ev_lookup_zip_uses_known_postal_code(hass):
+    """ev_lookup_zip goes straight to the EV search for a known postal code."""
+    entry = _make_hub_entry(hass)
+    hub = GasBuddyHub(hass, entry)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {HUB: hub}
+    services = GasBuddyServices(hass, entry)
+
+    with (
+        patch(
+            "py_gasbuddy.GasBuddy.price_lookup_service",
+            return_value={"results": [_station("1", 41.0, "62701")]},
+        ) as mock_prices,
+        patch(
+            "py_gasbuddy.GasBuddy.ev_stations_nearby",
+            return_value={"stations": [{"station_id": "ev"}]},
+        ),
+    ):
+        for radius in (5, 10):
+            response = await services._ev_lookup_zip(
+                MagicMock(data={ATTR_POSTAL_CODE: "62701", "radius": radius})
+            )
+            assert response == {"stations": [{"station_id": "ev"}]}
+
+    mock_prices.assert_awaited_once()
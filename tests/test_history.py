@@ -0,0 +1,186 @@
+"""Test the per-station price history."""
+# ruff: noqa: SLF001
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.gasbuddy.const import (
+    ATTR_DEVICE_ID,
+    ATTR_FUEL,
+    ATTR_HOURS,
+    COORDINATOR,
+    DOMAIN,
+    HISTORY_STORE_KEY,
+    HISTORY_STORE_VERSION,
+    HUB,
+    SERVICE_PRICE_HISTORY,
+)
+from custom_components.gasbuddy.history import GasBuddyPriceHistory, PriceRing, price_stats
+from custom_components.gasbuddy.sensor import GasBuddyTrendSensor
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+from tests.conftest import _make_hub_entry
+from tests.const import COORDINATOR_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+def _stored_history(samples: list[list[float]]) -> dict:
+    """Return price history store contents as written to .storage."""
+    return {
+        "version": HISTORY_STORE_VERSION,
+        "minor_version": 1,
+        "key": HISTORY_STORE_KEY,
+        "data": {"stations": {"test_subentry_id": {"regular_gas": samples}}},
+    }
+
+
+async def test_price_ring_wraps():
+    """Test the ring keeps the newest samples in order once full."""
+    ring = PriceRing(3)
+    for step in range(5):
+        ring.append(float(step), step / 10)
+    assert len(ring) == 3
+    assert ring.as_list() == [[2.0, 0.2], [3.0, 0.3], [4.0, 0.4]]
+    assert ring.since(3.0) == [(3.0, 0.3), (4.0, 0.4)]
+    assert ring.since(10.0) == []
+    assert ring.last == (4.0, 0.4)
+    ring.replace_last(0.5)
+    assert ring.as_list()[-1] == [4.0, 0.5]
+    assert PriceRing(3).since(0.0) == []
+    assert PriceRing(3).last is None
+
+
+async def test_history_spaces_samples(hass):
+    """Test frequent refreshes share a sample so a full ring still spans a week."""
+    history = GasBuddyPriceHistory(hass, capacity=3, spacing=600)
+    with (
+        patch("custom_components.gasbuddy.history.time.time") as mock_time,
+        patch.object(history._store, "async_delay_save") as mock_save,
+    ):
+        for now, price in ((0, 3.0), (300, 3.0), (400, 3.1), (600, 3.1), (1300, 3.2)):
+            mock_time.return_value = now
+            history.async_record("test_subentry_id", {"regular_gas": {"price": price}})
+        ring = history._stations["test_subentry_id"]["regular_gas"]
+        assert ring.as_list() == [[0, 3.1], [600, 3.1], [1300, 3.2]]
+        # An unchanged price within the spacing leaves nothing to save.
+        assert mock_save.call_count == 4
+
+
+async def test_price_stats():
+    """Test window statistics and the per-day slope."""
+    assert price_stats([]) is None
+    single = price_stats([(0.0, 3.0)])
+    assert single == {"min": 3.0, "max": 3.0, "mean": 3.0, "slope": None, "samples": 1}
+    assert price_stats([(5.0, 3.0), (5.0, 3.2)])["slope"] is None
+
+    stats = price_stats([(0.0, 3.0), (43200.0, 3.05), (86400.0, 3.1)])
+    assert stats["min"] == 3.0
+    assert stats["max"] == 3.1
+    assert stats["mean"] == 3.05
+    assert stats["slope"] == 0.1
+    assert stats["samples"] == 3
+
+
+async def test_history_record_load_and_prune(hass, hass_storage):
+    """Test recording, persisting and pruning history."""
+    now = time.time()
+    hass_storage[HISTORY_STORE_KEY] = _stored_history([[now - 100000, 2.5], [now - 60, 2.9]])
+    history = GasBuddyPriceHistory(hass)
+    await history.async_load()
+    assert history.get("test_subentry_id", "regular_gas", 86400) == [(now - 60, 2.9)]
+    assert history.get("test_subentry_id", "diesel", 86400) == []
+
+    history.async_record(
+        "cad_subentry_id",
+        {"unit_of_measure": "cents_per_liter", "regular_gas": {"price": 145.9}, "diesel": None},
+    )
+    assert history.fuels("cad_subentry_id") == ["regular_gas"]
+    assert history.get("cad_subentry_id", "regular_gas", 60)[0][1] == pytest.approx(1.459)
+
+    history.async_record("empty_subentry_id", {"regular_gas": {"price": None}})
+    assert history.fuels("empty_subentry_id") == []
+
+    history.async_prune({"cad_subentry_id", "empty_subentry_id"})
+    history.async_prune({"cad_subentry_id", "empty_subentry_id"})
+    assert history.fuels("test_subentry_id") == []
+    assert set(history._data_to_save()["stations"]) == {"cad_subentry_id"}
+
+
+async def test_history_load_failure(hass):
+    """Test a broken store starts cold instead of failing setup."""
+    history = GasBuddyPriceHistory(hass)
+    with patch.object(history._store, "async_load", side_effect=ValueError("corrupt")):
+        await history.async_load()
+    assert history.fuels("test_subentry_id") == []
+
+
+async def test_trend_sensor_and_service(hass, hass_storage, mock_gasbuddy):
+    """Test trend sensors and the history service read recorded prices."""
+    now = time.time()
+    hass_storage[HISTORY_STORE_KEY] = _stored_history([[now - 7200, 2.85], [now - 3600, 2.9]])
+    entry = _make_hub_entry(hass)
+    with patch.object(GasBuddyTrendSensor, "_attr_entity_registry_enabled_default", True):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.gas_station_regular_gas_24h_trend")
+    assert float(state.state) == pytest.approx(2.875)
+    assert state.attributes["unit_of_measurement"] == "USD/gallon"
+    assert state.attributes["min"] == 2.85
+    assert state.attributes["max"] == 2.9
+    assert state.attributes["slope_per_day"] == pytest.approx(1.2)
+    assert state.attributes["samples"] == 2
+    assert hass.states.get("sensor.gas_station_diesel_7d_trend").state == "unavailable"
+
+    # A good refresh records a sample and updates the trend.
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]["test_subentry_id"]
+    coordinator.async_set_updated_data(
+        coordinator._async_save_snapshot({**COORDINATOR_DATA, "last_updated": "2025-01-10"})
+    )
+    await hass.async_block_till_done()
+    state = hass.states.get("sensor.gas_station_regular_gas_24h_trend")
+    assert state.attributes["samples"] == 3
+    assert state.attributes["max"] == 2.95
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "test_subentry_id")})
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PRICE_HISTORY,
+        {ATTR_DEVICE_ID: device.id, ATTR_FUEL: "regular_gas", ATTR_HOURS: 1},
+        blocking=True,
+        return_response=True,
+    )
+    history = response[device.id]["regular_gas"]
+    assert [sample["price"] for sample in history["samples"]] == [2.95]
+    assert history["stats"]["samples"] == 1
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PRICE_HISTORY,
+        {ATTR_DEVICE_ID: [device.id]},
+        blocking=True,
+        return_response=True,
+    )
+    assert set(response[device.id]) == {"regular_gas", "e85", "e15"}
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PRICE_HISTORY,
+            {ATTR_DEVICE_ID: "missing"},
+            blocking=True,
+            return_response=True,
+        )
+
+    hass.data[DOMAIN][entry.entry_id].pop(HUB)
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PRICE_HISTORY,
+            {ATTR_DEVICE_ID: device.id},
+            blocking=True,
+            return_response=True,
+        )
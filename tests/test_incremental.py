@@ -0,0 +1,53 @@
+"""Test that coordinator refreshes only notify sensors whose data changed."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from tests.conftest import _make_hub_entry
+from tests.const import COORDINATOR_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+def _changed(**changes) -> dict:
+    """Return coordinator data with some keys replaced."""
+    return {**COORDINATOR_DATA, **changes}
+
+
+async def test_only_changed_sensors_are_notified(hass):
+    """Isolated key changes reach their own sensors; shared changes reach all."""
+    coordinator = GasBuddyUpdateCoordinator(hass, _make_hub_entry(hass))
+    listeners = {context: MagicMock() for context in ("regular_gas", "diesel", None)}
+    unsubs = [
+        coordinator.async_add_listener(listener, context) for context, listener in listeners.items()
+    ]
+
+    def _notified(data: dict) -> set:
+        for listener in listeners.values():
+            listener.reset_mock()
+        coordinator.async_set_updated_data(data)
+        return {context for context, listener in listeners.items() if listener.called}
+
+    # The first notification has nothing to compare against.
+    assert _notified(_changed()) == {"regular_gas", "diesel", None}
+    assert _notified(_changed()) == {None}
+
+    regular = {**COORDINATOR_DATA["regular_gas"], "price": 2.49}
+    assert _notified(_changed(regular_gas=regular)) == {"regular_gas", None}
+    assert _notified(_changed(regular_gas=regular, phone="555-000-0000")) == {
+        "regular_gas",
+        "diesel",
+        None,
+    }
+
+    coordinator.stale = True
+    assert _notified(_changed(regular_gas=regular, phone="555-000-0000")) == {
+        "regular_gas",
+        "diesel",
+        None,
+    }
+
+    for unsub in unsubs:
+        unsub()
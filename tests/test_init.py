@@ -1,6 +1,7 @@
 """Test gasbuddy setup process."""
 # ruff: noqa: SLF001
 
+import asyncio
 import contextlib
 from types import MappingProxyType
 from unittest.mock import patch
@@ -10,27 +11,34 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.gasbuddy import async_remove_config_entry_device
 from custom_components.gasbuddy.const import (
+    CONF_ADAPTIVE_POLLING,
     CONF_BRAND_ADJUSTMENTS,
     CONF_EXCLUDE_BRANDS,
     CONF_EXCLUDE_STATIONS,
     CONF_GPS,
     CONF_INCLUDE_BRANDS,
     CONF_INCLUDE_STATIONS,
+    CONF_MIN_INTERVAL,
     CONF_NAME,
     CONF_SOLVER,
+    CONF_STARTUP_CONCURRENCY,
     CONF_TIMEOUT,
+    CONF_TOP_K,
     CONF_UOM,
     CONFIG_VER,
     COORDINATOR,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_TIMEOUT,
+    DEFAULT_TOP_K,
     DOMAIN,
     CoordinatorsDict,
 )
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
-from homeassistant.config_entries import ConfigSubentry
+from homeassistant.config_entries import ConfigEntryState, ConfigSubentry
 from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from tests.conftest import _make_hub_entry, _make_station_subentry
-from tests.const import COORDINATOR_DATA, STATION_SUBENTRY_DATA
+from tests.const import CHEAPEST_SUBENTRY_DATA, COORDINATOR_DATA, HUB_DATA, STATION_SUBENTRY_DATA
 
 pytestmark = pytest.mark.asyncio
 
@@ -41,13 +49,14 @@ async def test_hub_setup_and_unload(hass, mock_gasbuddy):
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 8
+    # 8 station sensors plus 4 enabled hub diagnostic sensors.
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     entries = hass.config_entries.async_entries(DOMAIN)
     assert len(entries) == 1
 
     assert await hass.config_entries.async_unload(entries[0].entry_id)
     await hass.async_block_till_done()
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 8
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     assert len(hass.states.async_entity_ids(DOMAIN)) == 0
 
     assert await hass.config_entries.async_remove(entries[0].entry_id)
@@ -61,8 +70,8 @@ async def test_hub_with_no_subentries(hass, mock_gasbuddy):
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
-    # No sensors should be created
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 0
+    # Only the hub diagnostic sensors should be created
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 4
 
 
 async def test_legacy_entry_rejected_without_hub(hass, mock_gasbuddy):
@@ -204,6 +213,92 @@ async def test_multiple_station_subentries(hass):
     assert "sub2" in coordinators
 
 
+def _station_subentries(count: int) -> list[ConfigSubentry]:
+    """Return ``count`` station subentries with distinct station IDs."""
+    return [
+        _make_station_subentry(
+            data=MappingProxyType({**STATION_SUBENTRY_DATA, "station_id": 999001 + index}),
+            title=f"Station {index}",
+            subentry_id=f"sub{index}",
+            unique_id=str(999001 + index),
+        )
+        for index in range(count)
+    ]
+
+
+async def test_first_refresh_runs_concurrently_with_cap(hass, caplog):
+    """Test first refreshes overlap but never exceed the configured cap."""
+    running = 0
+    peak = 0
+
+    async def _slow_update(self):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return dict(COORDINATOR_DATA)
+
+    entry = _make_hub_entry(
+        hass,
+        hub_data={**HUB_DATA, CONF_STARTUP_CONCURRENCY: 2},
+        subentries=_station_subentries(5),
+    )
+    with (
+        caplog.at_level("DEBUG", logger="custom_components.gasbuddy"),
+        patch(
+            "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+            _slow_update,
+        ),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert peak == 2
+    assert len(hass.data[DOMAIN][entry.entry_id][COORDINATOR]) == 5
+    assert "Station 3 first refresh finished" in caplog.text
+    assert "First refresh of 5 station(s)" in caplog.text
+
+
+async def test_failed_station_does_not_block_others(hass, caplog):
+    """Test one station failing its first refresh leaves the hub loaded."""
+
+    async def _update(self):
+        if self._subentry.subentry_id == "sub0":
+            raise UpdateFailed("boom")
+        self.timings["price_lookup"] = 0.5
+        return dict(COORDINATOR_DATA)
+
+    entry = _make_hub_entry(hass, subentries=_station_subentries(2))
+    with (
+        caplog.at_level("DEBUG", logger="custom_components.gasbuddy"),
+        patch("custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data", _update),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinators = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    assert not coordinators["sub0"].last_update_success
+    assert coordinators["sub1"].last_update_success
+    assert "Station 0 is not ready yet" in caplog.text
+    assert "Station 1 first refresh finished in" in caplog.text
+    assert "price_lookup 0.50s" in caplog.text
+
+
+async def test_all_stations_failing_retries_setup(hass):
+    """Test the hub setup is retried when no station comes up."""
+    entry = _make_hub_entry(hass, subentries=_station_subentries(2))
+    with patch(
+        "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+        side_effect=UpdateFailed("boom"),
+    ):
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+
+
 async def test_legacy_entry_auto_hub_creation_failure(hass, mock_gasbuddy):
     """Test that a failure in creating the default hub doesn't crash component setup."""
     entry = MockConfigEntry(
@@ -489,6 +584,46 @@ async def test_migrate_entry_from_v8(hass):
     assert updated.data.get(CONF_BRAND_ADJUSTMENTS) == {}
 
 
+async def test_migrate_entry_from_v9(hass):
+    """Test async_migrate_entry fills in hub request settings and cheapest tracker ranking."""
+    from custom_components.gasbuddy import async_migrate_entry  # noqa: PLC0415
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="GasBuddy Hub",
+        data={**HUB_DATA, CONF_STARTUP_CONCURRENCY: 2},
+        unique_id="hub",
+        version=9,
+        subentries_data=[
+            {
+                "subentry_type": "station",
+                "data": dict(STATION_SUBENTRY_DATA),
+                "title": "Gas Station",
+                "unique_id": "999001",
+                "subentry_id": "station_subentry_id",
+            },
+            {
+                "subentry_type": "station",
+                "data": dict(CHEAPEST_SUBENTRY_DATA),
+                "title": "Cheapest Gas",
+                "unique_id": "cheapest",
+                "subentry_id": "cheapest_subentry_id",
+            },
+        ],
+    )
+    entry.add_to_hass(hass)
+
+    assert await async_migrate_entry(hass, entry)
+
+    updated = hass.config_entries.async_get_entry(entry.entry_id)
+    assert updated.version == CONFIG_VER
+    assert updated.data[CONF_STARTUP_CONCURRENCY] == 2
+    assert updated.data[CONF_ADAPTIVE_POLLING] is False
+    assert updated.data[CONF_MIN_INTERVAL] == DEFAULT_MIN_INTERVAL
+    assert updated.subentries["cheapest_subentry_id"].data[CONF_TOP_K] == DEFAULT_TOP_K
+    assert updated.subentries["station_subentry_id"].data == STATION_SUBENTRY_DATA
+
+
 async def test_migrate_entry_already_current(hass):
     """Test async_migrate_entry when entry is already at current version — no update needed."""
     from custom_components.gasbuddy import async_migrate_entry  # noqa: PLC0415
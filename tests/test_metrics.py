@@ -0,0 +1,99 @@
+"""Test upstream request metrics and the hub diagnostic sensors."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from py_gasbuddy import ERROR_TIMEOUT
+from py_gasbuddy.exceptions import APIError, LibraryError
+import pytest
+
+from custom_components.gasbuddy.coalesce import GasBuddyRequestCoalescer
+from custom_components.gasbuddy.const import DOMAIN, HUB
+from custom_components.gasbuddy.entity import GasBuddyHubSensorEntityDescription
+from custom_components.gasbuddy.metrics import GasBuddyRequestMetrics
+from custom_components.gasbuddy.sensor import GasBuddyHubSensor
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity_component import async_update_entity
+from tests.conftest import _make_hub_entry
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_metrics_record_outcomes_and_latency():
+    """Outcomes, latency buckets and paths are tracked per operation."""
+    metrics = GasBuddyRequestMetrics()
+    assert metrics.percentile(0.95) is None
+
+    direct = MagicMock(_solver=None)
+    solver = MagicMock(_solver="http://solver:8191")
+    metrics.record("price_lookup", direct, 0.1)
+    metrics.record("price_lookup", solver, 1.5)
+    # py_gasbuddy reports its request timeouts as a LibraryError.
+    metrics.record("price_lookup", direct, 61.0, error=LibraryError(ERROR_TIMEOUT))
+    metrics.record("location_search", direct, 0.4, error=APIError("boom"))
+
+    price_lookup = metrics.operations["price_lookup"]
+    assert (price_lookup.success, price_lookup.error, price_lookup.timeout) == (2, 0, 1)
+    assert price_lookup.count == 3
+    assert price_lookup.percentile(0.5) == 2.0
+    assert price_lookup.percentile(0.95) == 61.0
+    assert metrics.errors == 1
+    assert metrics.timeouts == 1
+    assert metrics.paths == {"direct": 3, "solver": 1}
+    assert metrics.percentile(0.5) == 0.5
+
+    diagnostics = metrics.as_dict()
+    assert diagnostics["operations"]["price_lookup"]["latency_buckets"][">60s"] == 1
+    assert diagnostics["operations"]["location_search"]["latency_p95"] == 0.4
+    assert diagnostics["paths"] == {"direct": 3, "solver": 1}
+
+
+async def test_coalescer_records_metrics():
+    """Only requests that go upstream are recorded, with their outcome."""
+    coalescer = GasBuddyRequestCoalescer()
+    api = MagicMock(_solver=None)
+    api.price_lookup = AsyncMock(return_value={"station_id": "999001"})
+    api.location_search = AsyncMock(side_effect=APIError("boom"))
+
+    await coalescer.async_request(api, "price_lookup", "999001")
+    with pytest.raises(APIError):
+        await coalescer.async_request(api, "location_search", zipcode="62701")
+
+    assert coalescer.metrics.operations["price_lookup"].success == 1
+    assert coalescer.metrics.operations["location_search"].error == 1
+
+
+async def test_hub_diagnostic_sensors(hass, mock_gasbuddy):
+    """The hub device carries diagnostic sensors fed by the request metrics."""
+    entry = _make_hub_entry(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    assert device is not None
+    assert device.entry_type is dr.DeviceEntryType.SERVICE
+
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    hub.calls.record()
+    hub.metrics.record("price_lookup", MagicMock(_solver=None), 0.3)
+    hub.metrics.record("price_lookup", MagicMock(_solver=None), 0.3, error=TimeoutError())
+    for entity_id in (
+        "sensor.gasbuddy_hub_upstream_requests",
+        "sensor.gasbuddy_hub_request_timeouts",
+        "sensor.gasbuddy_hub_request_latency_p95",
+    ):
+        await async_update_entity(hass, entity_id)
+
+    requests = hass.states.get("sensor.gasbuddy_hub_upstream_requests")
+    assert requests.state == "1"
+    assert requests.attributes["direct"] == 2
+    timeouts = hass.states.get("sensor.gasbuddy_hub_request_timeouts")
+    assert timeouts.state == "1"
+    assert timeouts.attributes["price_lookup"] == 1
+    latency = hass.states.get("sensor.gasbuddy_hub_request_latency_p95")
+    assert float(latency.state) == pytest.approx(0.3)
+    assert latency.attributes["price_lookup"]["p50"] == pytest.approx(0.3)
+
+    bare = GasBuddyHubSensor(
+        GasBuddyHubSensorEntityDescription(key="bare", value_fn=lambda hub: 0), hub, entry
+    )
+    assert bare.extra_state_attributes is None
@@ -0,0 +1,342 @@
+"""Test region subentries that track every station in an area."""
+# ruff: noqa: SLF001
+
+import asyncio
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from py_gasbuddy.exceptions import APIError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.gasbuddy.const import (
+    ATTR_DEVICE_ID,
+    ATTR_FUEL,
+    ATTR_LIMIT,
+    ATTR_MAX_PRICE,
+    CONF_FUELS,
+    CONF_INTERVAL,
+    CONF_NAME,
+    CONF_POLYGON,
+    CONF_RADIUS,
+    CONF_REQUEST_BUDGET,
+    DOMAIN,
+    REGIONS,
+    SERVICE_QUERY_REGION,
+)
+from custom_components.gasbuddy.diagnostics import async_get_config_entry_diagnostics
+from custom_components.gasbuddy.geo import grid_points, point_in_polygon
+from custom_components.gasbuddy.hub import GasBuddyHub
+from custom_components.gasbuddy.region import GasBuddyRegionCoordinator, RegionArea, RegionIndex
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from tests.conftest import _make_hub_entry, _make_station_subentry
+
+pytestmark = pytest.mark.asyncio
+
+REGION_DATA = {
+    CONF_NAME: "Downtown",
+    "latitude": 41.88,
+    "longitude": -87.63,
+    CONF_RADIUS: 2,
+    CONF_POLYGON: [],
+    CONF_FUELS: ["regular_gas", "diesel"],
+    CONF_INTERVAL: 3600,
+    CONF_REQUEST_BUDGET: 2,
+}
+
+SQUARE = [[41.0, -88.0], [41.0, -87.0], [42.0, -87.0], [42.0, -88.0]]
+
+_LOOKUP_RESULTS = {
+    "results": [
+        {
+            "station_id": "1",
+            "name": "Corner Fuel",
+            "address": {"line1": "1 Main St", "locality": "Chicago", "region": "IL"},
+            "latitude": 41.88,
+            "longitude": -87.63,
+            "unit_of_measure": "dollars_per_gallon",
+            "currency": "USD",
+            "regular_gas": {"price": 2.99},
+            "diesel": {"price": 3.89},
+        },
+        {
+            "station_id": "2",
+            "name": "Lake Gas",
+            "latitude": 41.89,
+            "longitude": -87.62,
+            "unit_of_measure": "dollars_per_gallon",
+            "currency": "USD",
+            "regular_gas": {"price": 3.19},
+            "diesel": None,
+        },
+        {
+            "station_id": "3",
+            "name": "Far Away",
+            "latitude": 42.5,
+            "longitude": -88.5,
+            "regular_gas": {"price": 1.99},
+        },
+    ]
+}
+
+
+def _make_region_subentry(data: dict | None = None) -> ConfigSubentry:
+    """Return a region ConfigSubentry."""
+    return ConfigSubentry(
+        data=MappingProxyType(data if data is not None else REGION_DATA),
+        subentry_type="region",
+        title="Downtown",
+        unique_id=None,
+        subentry_id="region_subentry_id",
+    )
+
+
+def _make_region(hass, data: dict | None = None) -> GasBuddyRegionCoordinator:
+    """Return a region coordinator whose client answers price lookups."""
+    subentry = _make_region_subentry(data)
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    region = GasBuddyRegionCoordinator(hass, entry, subentry, GasBuddyHub(hass, entry))
+    region._api = MagicMock()
+    region._api.price_lookup_service = AsyncMock(return_value=_LOOKUP_RESULTS)
+    return region
+
+
+async def test_geo_helpers():
+    """Test the polygon test and grid helper."""
+    assert point_in_polygon(41.5, -87.5, SQUARE)
+    assert not point_in_polygon(42.5, -87.5, SQUARE)
+    assert not point_in_polygon(41.5, -86.5, SQUARE)
+
+    points = grid_points(41.0, -88.0, 41.1, -87.9, 3.0)
+    assert len(points) == 6
+    assert grid_points(41.0, -88.0, 41.0, -88.0, 3.0) == [(41.0, -88.0)]
+
+
+async def test_region_area_tiles():
+    """Test tiles cover circles and polygons, and never come back empty."""
+    circle = RegionArea(41.88, -87.63, 10)
+    tiles = circle.tiles()
+    assert 30 < len(tiles) < 49
+    assert circle.contains(41.88, -87.63)
+    assert not circle.contains(42.5, -87.63)
+
+    square = RegionArea(41.5, -87.5, 0, SQUARE)
+    assert square.polygon[0] == (41.0, -88.0)
+    assert square.contains(41.5, -87.5)
+    assert not square.contains(40.5, -87.5)
+    assert len(square.tiles(20.0)) == 12
+
+    # A sliver thinner than a tile still gets a query point.
+    sliver = RegionArea(41.0, -87.0, 0, [[41.0, -87.0], [41.0, -86.999], [41.00001, -87.0]])
+    assert sliver.tiles(50.0) == [(41.0, -87.0)]
+
+
+async def test_region_index():
+    """Test the index de-dupes, converts, summarises, queries and expires stations."""
+    area = RegionArea(41.88, -87.63, 5)
+    index = RegionIndex()
+    stations = _LOOKUP_RESULTS["results"]
+    assert index.update(stations, area, 1.0) == 2
+    # An overlapping tile returns the same stations again.
+    assert index.update([*stations, {"id": "4", "latitude": None}], area, 2.0) == 2
+    assert len(index) == 2
+    assert index.get("1").address == "1 Main St, Chicago, IL"
+    assert index.get(None) is None
+
+    assert index.stats("regular_gas") == {
+        "min": 2.99,
+        "median": 3.09,
+        "p90": 3.17,
+        "stations": 2,
+        "cheapest": "1",
+    }
+    assert index.stats("diesel")["stations"] == 1
+    assert index.stats("e85") is None
+    assert [row["station_id"] for row in index.query("regular_gas", 10)] == ["1", "2"]
+    assert [row["price"] for row in index.query("regular_gas", 1)] == [2.99]
+    assert index.query("regular_gas", 10, max_price=3.0)[0]["prices"] == {
+        "regular_gas": 2.99,
+        "diesel": 3.89,
+    }
+    assert len(index.query("regular_gas", 10, max_price=3.0)) == 1
+
+    index.update(
+        [
+            {
+                "station_id": "5",
+                "latitude": 41.88,
+                "longitude": -87.63,
+                "unit_of_measure": "cents_per_liter",
+                "regular_gas": {"price": 145.9},
+            }
+        ],
+        area,
+        3.0,
+    )
+    assert index.get("5").prices == {"regular_gas": pytest.approx(1.459)}
+    assert index.expire(2.5) == 2
+    assert index.expire(2.5) == 0
+    assert index.stats("regular_gas")["cheapest"] == "5"
+
+
+async def test_region_refresh_rotates_tiles(hass):
+    """Test each refresh looks up the next tiles within the budget."""
+    region = _make_region(hass)
+    assert len(region.tiles) == 4
+    lookup = region._api.price_lookup_service
+
+    data = await region._async_update_data()
+    assert lookup.await_count == 2
+    assert data["stations"] == 2
+    assert data["tiles"] == 4
+    assert data["tiles_refreshed"] == 2
+    assert data["unit"] == "USD/gallon"
+    assert data["fuels"]["regular_gas"]["min"] == 2.99
+    assert data["fuels"]["diesel"]["stations"] == 1
+    first = {(call.kwargs["lat"], call.kwargs["lon"]) for call in lookup.await_args_list}
+
+    await region._async_update_data()
+    second = {(call.kwargs["lat"], call.kwargs["lon"]) for call in lookup.await_args_list[2:]}
+    assert first | second == set(region.tiles)
+    assert region._hub.requests.calls.total == 4
+
+
+async def test_region_refresh_failures(hass):
+    """Test partial, total and unexpected lookup failures."""
+    region = _make_region(hass)
+    lookup = region._api.price_lookup_service
+    lookup.side_effect = [APIError("boom"), {"results": None}]
+    data = await region._async_update_data()
+    assert data["tiles_refreshed"] == 1
+    assert data["stations"] == 0
+    assert data["unit"] is None
+
+    lookup.side_effect = APIError("boom")
+    with pytest.raises(UpdateFailed):
+        await region._async_update_data()
+
+    lookup.side_effect = RuntimeError("bug")
+    with pytest.raises(RuntimeError):
+        await region._async_update_data()
+
+
+async def test_region_sensors_and_service(hass, mock_gasbuddy):
+    """Test region sensors, the query service and diagnostics."""
+    entry = _make_hub_entry(hass, subentries=[_make_station_subentry(), _make_region_subentry()])
+    with patch(
+        "py_gasbuddy.GasBuddy.price_lookup_service", AsyncMock(return_value=_LOOKUP_RESULTS)
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.downtown_regular_gas_min")
+    assert float(state.state) == 2.99
+    assert state.attributes["unit_of_measurement"] == "USD/gallon"
+    assert state.attributes["stations"] == 2
+    assert state.attributes["station_name"] == "Corner Fuel"
+    state = hass.states.get("sensor.downtown_regular_gas_p90")
+    assert float(state.state) == 3.17
+    assert "station_name" not in state.attributes
+    assert float(hass.states.get("sensor.downtown_diesel_median").state) == 3.89
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["region_data"]["region_subentry_id"]["stations"] == 2
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "region_subentry_id")})
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY_REGION,
+        {ATTR_DEVICE_ID: device.id, ATTR_FUEL: "regular_gas", ATTR_LIMIT: 5, ATTR_MAX_PRICE: 3.0},
+        blocking=True,
+        return_response=True,
+    )
+    assert response[device.id]["stats"]["stations"] == 2
+    assert [row["name"] for row in response[device.id]["stations"]] == ["Corner Fuel"]
+
+    station = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "test_subentry_id")})
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_QUERY_REGION,
+            {ATTR_DEVICE_ID: station.id},
+            blocking=True,
+            return_response=True,
+        )
+
+    # A region with no prices for a fuel leaves that fuel's sensors unavailable.
+    region = hass.data[DOMAIN][entry.entry_id][REGIONS]["region_subentry_id"]
+    region.async_set_updated_data({**region.data, "fuels": {"regular_gas": None}})
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.downtown_regular_gas_min").state == "unavailable"
+
+
+async def test_region_refresh_does_not_block_setup(hass, mock_gasbuddy):
+    """Hub setup finishes while a region is still on its first refresh."""
+    entry = _make_hub_entry(hass, subentries=[_make_station_subentry(), _make_region_subentry()])
+    release = asyncio.Event()
+
+    async def _slow_lookup(**kwargs):
+        await release.wait()
+        return _LOOKUP_RESULTS
+
+    with patch("py_gasbuddy.GasBuddy.price_lookup_service", side_effect=_slow_lookup):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        region = hass.data[DOMAIN][entry.entry_id][REGIONS]["region_subentry_id"]
+        assert region.data is None
+
+        release.set()
+        await hass.async_block_till_done(wait_background_tasks=True)
+    assert region.data["stations"] == 2
+    assert float(hass.states.get("sensor.downtown_regular_gas_min").state) == 2.99
+
+
+async def test_region_subentry_flow(hass):
+    """Test adding and reconfiguring a region subentry."""
+    hub = MockConfigEntry(domain=DOMAIN, unique_id="hub", data={CONF_NAME: "Hub"})
+    hub.add_to_hass(hass)
+
+    result = await hass.config_entries.subentries.async_init(
+        (hub.entry_id, "region"), context={"source": "user"}
+    )
+    assert result["type"] == FlowResultType.FORM
+    user_input = {**REGION_DATA, CONF_POLYGON: [[41.0, -88.0], [41.0, "x"], [42.0, -87.0]]}
+    result = await hass.config_entries.subentries.async_configure(result["flow_id"], user_input)
+    assert result["errors"] == {CONF_POLYGON: "invalid_polygon"}
+
+    user_input[CONF_POLYGON] = [[41.0, -88.0], [41.0, -87.0], [95.0, -87.0]]
+    result = await hass.config_entries.subentries.async_configure(result["flow_id"], user_input)
+    assert result["errors"] == {CONF_POLYGON: "invalid_polygon"}
+
+    user_input[CONF_POLYGON] = [[41, -88], [41, -87]]
+    result = await hass.config_entries.subentries.async_configure(result["flow_id"], user_input)
+    assert result["errors"] == {CONF_POLYGON: "invalid_polygon"}
+
+    user_input[CONF_POLYGON] = SQUARE
+    result = await hass.config_entries.subentries.async_configure(result["flow_id"], user_input)
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == "Downtown"
+    assert result["data"][CONF_POLYGON] == SQUARE
+
+    subentry_id = next(iter(hub.subentries))
+    result = await hass.config_entries.subentries.async_init(
+        (hub.entry_id, "region"),
+        context={"source": "reconfigure", "subentry_id": subentry_id},
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "reconfigure"
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {**REGION_DATA, CONF_POLYGON: "nope"}
+    )
+    assert result["errors"] == {CONF_POLYGON: "invalid_polygon"}
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {**REGION_DATA, CONF_NAME: "Uptown"}
+    )
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "reconfigure_successful"
+    assert hub.subentries[subentry_id].title == "Uptown"
+    assert hub.subentries[subentry_id].data[CONF_POLYGON] == []
@@ -0,0 +1,48 @@
+"""Test the service response cache."""
+
+from unittest.mock import patch
+
+from custom_components.gasbuddy.response_cache import GasBuddyResponseCache
+
+
+def test_response_cache_expires_entries():
+    """Entries older than the TTL are dropped."""
+    cache = GasBuddyResponseCache(ttl=60, size=4)
+    with patch("custom_components.gasbuddy.response_cache.time.monotonic", return_value=100):
+        cache.set(("zip", "12345"), {"results": []})
+    with patch("custom_components.gasbuddy.response_cache.time.monotonic", return_value=150):
+        assert cache.get(("zip", "12345")) == {"results": []}
+    with patch("custom_components.gasbuddy.response_cache.time.monotonic", return_value=161):
+        assert cache.get(("zip", "12345")) is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_response_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted once the cache is full."""
+    cache = GasBuddyResponseCache(ttl=60, size=2)
+    cache.set(("a",), 1)
+    cache.set(("b",), 2)
+    assert cache.get(("a",)) == 1
+    cache.set(("c",), 3)
+
+    assert cache.get(("b",)) is None
+    assert (cache.get(("a",)), cache.get(("c",))) == (1, 3)
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_response_cache_returns_copies():
+    """Callers cannot change the cached result."""
+    cache = GasBuddyResponseCache()
+    cache.set(("a",), {"stations": []})
+    cache.get(("a",))["stations"] = None
+    assert cache.get(("a",)) == {"stations": []}
+
+
+def test_response_cache_disabled():
+    """A TTL of zero stores nothing."""
+    cache = GasBuddyResponseCache(ttl=0)
+    cache.set(("a",), 1)
+    assert len(cache) == 0
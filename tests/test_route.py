@@ -0,0 +1,254 @@
+"""Test route mode for cheapest gas trackers."""
+# ruff: noqa: SLF001
+
+import math
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from py_gasbuddy.exceptions import APIError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.gasbuddy.const import (
+    CONF_CHEAPEST,
+    CONF_DETOUR_PENALTY,
+    CONF_FUEL_KEY,
+    CONF_NAME,
+    CONF_PRICE_TYPE,
+    CONF_ROUTE,
+    CONF_ROUTE_ENTITY,
+    DOMAIN,
+)
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.geo import distance_miles, distance_to_polyline, sample_polyline
+from custom_components.gasbuddy.hub import GasBuddyHub
+from custom_components.gasbuddy.route import (
+    RouteTrail,
+    async_route_lookup,
+    route_detours,
+    route_samples,
+)
+from homeassistant.data_entry_flow import FlowResultType
+from tests.conftest import _make_cheapest_subentry, _make_hub_entry
+from tests.const import CHEAPEST_SUBENTRY_DATA, COORDINATOR_DATA_CHEAPEST
+
+pytestmark = pytest.mark.asyncio
+
+# A 15 mile drive due east.
+ROUTE = [[41.80, -87.70], [41.80, -87.40]]
+
+
+def _station(station_id: str, lat: float | None, lon: float | None, price: float) -> dict:
+    """Return a station record as GasBuddy returns it."""
+    return {
+        "station_id": station_id,
+        "name": f"Station {station_id}",
+        "latitude": lat,
+        "longitude": lon,
+        "regular_gas": {"price": price, "cash_price": None},
+    }
+
+
+async def test_sample_polyline_and_distance():
+    """Test sampling along a polyline and measuring the distance to it."""
+    line = [(0.0, 0.0), (0.0, 0.0), (0.0, 1.0)]
+    samples = sample_polyline(line, 20)
+    assert len(samples) == 5
+    assert samples[0] == (0.0, 0.0)
+    assert samples[-1] == (0.0, 1.0)
+    assert distance_miles(*samples[0], *samples[1]) == pytest.approx(20)
+    assert len(sample_polyline([(0, 0), (0, 1)], distance_miles(0, 0, 0, 1))) == 2
+
+    assert distance_to_polyline(0.01, 0.5, line) == pytest.approx(0.691, abs=0.001)
+    # Past the end of the line, the nearest point is the end itself.
+    assert distance_to_polyline(0.0, 1.01, line) == pytest.approx(0.691, abs=0.001)
+    assert distance_to_polyline(0.01, 0.0, [(0.0, 0.0)]) == pytest.approx(0.691, abs=0.001)
+
+
+async def test_route_trail():
+    """Test a trail keeps spaced out positions within its window."""
+    trail = RouteTrail(spacing=0.5, window=100, size=3)
+    assert trail.add(41.80, -87.70, 0)
+    assert not trail.add(41.801, -87.70, 10)
+    assert trail.add(41.81, -87.70, 20)
+    assert trail.add(41.82, -87.70, 110)
+    assert trail.points(110) == [(41.81, -87.70), (41.82, -87.70)]
+    assert trail.add(41.83, -87.70, 160)
+    assert trail.add(41.84, -87.70, 170)
+    assert trail.points(170) == [(41.82, -87.70), (41.83, -87.70), (41.84, -87.70)]
+    assert trail.points(1000) == []
+
+
+async def test_route_samples_and_detours():
+    """Test query points are spaced, snapped, de-duplicated and capped."""
+    samples = route_samples(ROUTE)
+    assert samples[0] == (41.8, -87.7)
+    assert samples[-1] == (41.8, -87.4)
+    assert len(samples) == 7
+    assert all(round(lon, 2) == lon for _, lon in samples)
+
+    # A long drive is covered by the same number of points, further apart.
+    long_route = [[41.80, -87.70], [41.80, -84.70]]
+    assert len(route_samples(long_route)) == 8
+    assert len(route_samples(long_route, limit=1)) == 1
+    # Waypoints too close to tell apart after snapping collapse into one.
+    assert route_samples([[41.8, -87.7], [41.8, -87.7]]) == [(41.8, -87.7)]
+    assert route_samples([[41.801, -87.7], [41.802, -87.7]], spacing=0.01) == [(41.8, -87.7)]
+
+    detours = route_detours(
+        [_station("on", 41.80, -87.55, 3), _station("unplaced", None, None, 3)], ROUTE
+    )
+    assert detours[0] == pytest.approx(0)
+    assert math.isinf(detours[1])
+
+
+async def test_route_lookup_merges_and_tolerates_failures():
+    """Test route lookups merge stations once and skip failed points."""
+
+    async def _lookup(lat, lon):
+        if lon > 0:
+            raise APIError
+        return {"results": [_station("shared", lat, 0, 3), _station(str(lon), lat, lon, 3)]}
+
+    stations = await async_route_lookup(_lookup, [(0, -1), (0, -2), (0, 1)])
+    assert [station["station_id"] for station in stations] == ["shared", "-1", "-2"]
+
+    with pytest.raises(APIError):
+        await async_route_lookup(_lookup, [(0, 1), (0, 2)])
+
+    async def _broken(lat, lon):
+        if lon > 0:
+            raise ValueError
+        return {"results": None}
+
+    with pytest.raises(ValueError):
+        await async_route_lookup(_broken, [(0, -1), (0, 1)])
+    assert await async_route_lookup(_broken, [(0, -1)]) == []
+
+
+async def test_cheapest_tracker_along_route(hass):
+    """Test a tracker with a route ranks stations by price plus detour."""
+    subentry = _make_cheapest_subentry(data={**CHEAPEST_SUBENTRY_DATA, CONF_ROUTE: ROUTE})
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+
+    async def _lookup(**kwargs):
+        results = [_station("on_route", 41.80, -87.55, 3.09)]
+        if kwargs["lon"] > -87.45:
+            # Seven miles north of the end of the route.
+            results.append(_station("off_route", 41.90, -87.40, 3.00))
+        return {"results": results}
+
+    coordinator._api = MagicMock()
+    coordinator._api.price_lookup_service = AsyncMock(side_effect=_lookup)
+
+    data = await coordinator._async_update_data()
+    assert coordinator._api.price_lookup_service.await_count == len(route_samples(ROUTE))
+    assert data["station_id"] == "on_route"
+    assert data["detour_miles"] == 0.0
+    [runner_up] = data["runner_ups"]
+    assert runner_up["station_id"] == "off_route"
+    assert runner_up["price"] == 3.00
+    assert runner_up["detour_miles"] == pytest.approx(13.8, abs=0.1)
+
+    # Driving the route again reuses the area lookups.
+    await coordinator._async_update_data()
+    assert coordinator._api.price_lookup_service.await_count == len(route_samples(ROUTE))
+
+    # Without a penalty, the cheaper station wins however far off it is.
+    coordinator._subentry = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_ROUTE: ROUTE, CONF_DETOUR_PENALTY: 0}
+    )
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == "off_route"
+
+
+async def test_cheapest_tracker_follows_entity(hass):
+    """Test a tracker following an entity searches along its recent positions."""
+    subentry = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_ROUTE_ENTITY: "device_tracker.car"}
+    )
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+    coordinator._api = MagicMock()
+    coordinator._api.price_lookup_service = AsyncMock(
+        return_value={"results": [_station("1", 41.80, -87.70, 3.09)]}
+    )
+
+    # Until the entity has a position, the tracker searches around home.
+    assert coordinator._route_waypoints() is None
+    await coordinator._async_update_data()
+    assert coordinator._api.price_lookup_service.call_args.kwargs["lat"] == hass.config.latitude
+
+    hass.states.async_set(
+        "device_tracker.car", "not_home", {"latitude": 41.80, "longitude": -87.70}
+    )
+    await hass.async_block_till_done()
+    assert coordinator._route_waypoints() == [(41.80, -87.70)]
+    hub.areas._snapshots.clear()
+    data = await coordinator._async_update_data()
+    assert coordinator._api.price_lookup_service.call_args.kwargs["lat"] == 41.80
+    assert data["detour_miles"] == 0.0
+
+    hass.states.async_set("device_tracker.car", "unknown")
+    hass.states.async_set(
+        "device_tracker.car", "not_home", {"latitude": 41.80, "longitude": -87.60}
+    )
+    hass.states.async_remove("device_tracker.car")
+    await hass.async_block_till_done()
+    assert coordinator._route_waypoints() == [(41.80, -87.70), (41.80, -87.60)]
+
+    # A tracker set up while the entity is somewhere starts from there.
+    hass.states.async_set("device_tracker.car", "home", {"latitude": 41.80, "longitude": -87.50})
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+    assert coordinator._route_waypoints() == [(41.80, -87.50)]
+
+
+async def test_route_sensor_attributes(hass):
+    """Test the fuel sensor shows how far off the route its station is."""
+    subentry = _make_cheapest_subentry(data={**CHEAPEST_SUBENTRY_DATA, CONF_ROUTE: ROUTE})
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    with patch(
+        "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+        return_value={**COORDINATOR_DATA_CHEAPEST, "runner_ups": [], "detour_miles": 1.2},
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.cheapest_gas_regular_gas")
+    assert state.attributes["detour_miles"] == 1.2
+
+
+async def test_route_config_flow(hass):
+    """Test setting up a cheapest tracker that follows a route."""
+    hub = MockConfigEntry(domain=DOMAIN, unique_id="hub", data={CONF_NAME: "Hub"})
+    hub.add_to_hass(hass)
+
+    result = await hass.config_entries.subentries.async_init(
+        (hub.entry_id, "station"), context={"source": "user"}
+    )
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {"next_step_id": "cheapest"}
+    )
+    with patch(
+        "custom_components.gasbuddy.config_flow._get_nearby_brands_and_stations",
+        return_value=({}, {}),
+    ):
+        result = await hass.config_entries.subentries.async_configure(
+            result["flow_id"],
+            {
+                CONF_NAME: "Commute",
+                CONF_FUEL_KEY: "regular_gas",
+                CONF_PRICE_TYPE: "best",
+                CONF_ROUTE: ROUTE,
+                CONF_ROUTE_ENTITY: "person.driver",
+                CONF_DETOUR_PENALTY: 0.05,
+            },
+        )
+    result = await hass.config_entries.subentries.async_configure(result["flow_id"], {})
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_CHEAPEST] is True
+    assert result["data"][CONF_ROUTE] == ROUTE
+    assert result["data"][CONF_ROUTE_ENTITY] == "person.driver"
+    assert result["data"][CONF_DETOUR_PENALTY] == 0.05
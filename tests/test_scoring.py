@@ -0,0 +1,31 @@
+"""Test cheapest gas price scoring."""
+
+import math
+
+import pytest
+
+from custom_components.gasbuddy.scoring import score_stations
+
+_STATIONS = [
+    {"regular_gas": {"price": 3.09, "cash_price": 2.99, "deal_price": None}},
+    {"regular_gas": {"price": 3.19, "deal_price": 2.89}},
+    {"regular_gas": {"price": None}},
+    {"regular_gas": None},
+    {},
+]
+_ADJUSTMENTS = [0.0, 0.05, 0.0, -0.1, 0.0]
+
+
+@pytest.mark.parametrize(
+    ("price_type", "expected"),
+    [
+        ("best", [2.99, 2.94, math.inf, math.inf, math.inf]),
+        ("deal", [math.inf, 2.94, math.inf, math.inf, math.inf]),
+        ("cash", [2.99, math.inf, math.inf, math.inf, math.inf]),
+        ("credit", [3.09, 3.24, math.inf, math.inf, math.inf]),
+    ],
+)
+def test_score_stations(price_type, expected):
+    """Scores apply adjustments and score missing prices as inf."""
+    scores = score_stations(_STATIONS, "regular_gas", price_type, _ADJUSTMENTS)
+    assert scores == pytest.approx(expected)
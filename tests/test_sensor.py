@@ -1,7 +1,9 @@
 """Test gasbuddy sensors."""
 
 import copy
+import dataclasses
 import json
+import logging
 from unittest.mock import patch
 
 from py_gasbuddy.exceptions import APIError
@@ -21,23 +23,30 @@ from custom_components.gasbuddy.const import (
     CONF_NAME,
     CONF_POSTAL,
     CONF_PRICE_TYPE,
+    CONF_RANK_SENSORS,
     CONF_SHOW_DISCOUNTED,
     CONF_SOLVER,
     CONF_STATION_ID,
     CONF_TIMEOUT,
+    CONF_TOP_K,
     CONF_UOM,
     COORDINATOR,
     DEFAULT_TIMEOUT,
     DOMAIN,
+    HUB_SENSOR_TYPES,
     SENSOR_TYPES,
     SERVICE_LOOKUP_GPS,
 )
 from custom_components.gasbuddy.coordinator import (
+    BrandAdjustmentIndex,
     GasBuddyUpdateCoordinator,
+    LazyRedact,
+    StationFilter,
+    StationView,
     _redact,  # noqa: PLC2701
     format_address,
 )
-from custom_components.gasbuddy.sensor import GasBuddySensor
+from custom_components.gasbuddy.sensor import GasBuddyHubSensor, GasBuddyRankSensor, GasBuddySensor
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.const import ATTR_ENTITY_ID, ATTR_LATITUDE, ATTR_LONGITUDE
 from homeassistant.helpers import entity_registry as er
@@ -47,10 +56,12 @@ from tests.common import load_fixture
 from tests.conftest import _make_cheapest_subentry, _make_hub_entry, _make_station_subentry
 
 from .const import (
+    CHEAPEST_SUBENTRY_DATA,
     CONFIG_DATA,
     CONFIG_DATA_CHEAPEST,
     CONFIG_DATA_NO_UOM,
     COORDINATOR_DATA,
+    COORDINATOR_DATA_CHEAPEST,
     HUB_DATA,
     OPTIONS_CHEAPEST,
     OPTIONS_NO_UOM,
@@ -74,8 +85,9 @@ async def test_sensors(hass, mock_gasbuddy, entity_registry: er.EntityRegistry):
     await hass.async_block_till_done()
 
     # With enriched COORDINATOR_DATA: regular_gas, premium_gas, premium_gas_cash,
-    # e85, e15, e15_cash, regular_gas_deal, last_updated = 8 enabled sensors
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 8
+    # e85, e15, e15_cash, regular_gas_deal, last_updated = 8 enabled sensors,
+    # plus 4 enabled hub diagnostic sensors
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     entries = hass.config_entries.async_entries(DOMAIN)
     assert len(entries) == 1
 
@@ -136,7 +148,7 @@ async def test_sensors_no_uom(hass, mock_gasbuddy, entity_registry: er.EntityReg
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 8
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     entries = hass.config_entries.async_entries(DOMAIN)
     assert len(entries) == 1
 
@@ -190,8 +202,9 @@ async def test_sensors_cad(hass, mock_gasbuddy_cad, entity_registry: er.EntityRe
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
-    # CAD data has regular_gas + premium_gas + premium_gas_cash (cash=145.2) + last_updated = 4
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 4
+    # CAD data has regular_gas + premium_gas + premium_gas_cash (cash=145.2) + last_updated = 4,
+    # plus 4 hub diagnostic sensors
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 8
     entries = hass.config_entries.async_entries(DOMAIN)
     assert len(entries) == 1
 
@@ -293,35 +306,100 @@ async def test_sensor_coverage_edge_cases(hass, mock_gasbuddy, integration):
     """Test sensor edge cases for 100% coverage."""
     coordinator = hass.data[DOMAIN][integration.entry_id][COORDINATOR]
 
+    # Sensors read a view derived when data is published, so patch the data
+    # through the coordinator rather than mutating it in place.
     # Test: price is 0 — valid price, sensor is available and returns 0
-    with patch.dict(
-        coordinator.data,
-        {"regular_gas": {"price": 0, "last_updated": "2023-12-10T17:48:46.584Z"}},
+    with patch.object(
+        coordinator,
+        "data",
+        {
+            **coordinator.data,
+            "regular_gas": {"price": 0, "last_updated": "2023-12-10T17:48:46.584Z"},
+        },
     ):
         sensor = GasBuddySensor(SENSOR_TYPES["regular_gas"], coordinator, integration)
         assert sensor.available is True
         assert sensor.native_value == 0
 
     # Test: price is None — native_value returns None (sensor.py line 148)
-    with patch.dict(
-        coordinator.data,
-        {"regular_gas": {"price": None, "last_updated": "2023-12-10T17:48:46.584Z"}},
+    with patch.object(
+        coordinator,
+        "data",
+        {
+            **coordinator.data,
+            "regular_gas": {"price": None, "last_updated": "2023-12-10T17:48:46.584Z"},
+        },
     ):
         sensor = GasBuddySensor(SENSOR_TYPES["regular_gas"], coordinator, integration)
         assert sensor.native_value is None
 
     # Test Line 115: currency and uom missing when CONF_UOM is True
-    with patch.dict(coordinator.data, {"unit_of_measure": None, "currency": None}):
+    with patch.object(
+        coordinator, "data", {**coordinator.data, "unit_of_measure": None, "currency": None}
+    ):
         sensor = GasBuddySensor(SENSOR_TYPES["regular_gas"], coordinator, integration)
         assert sensor.native_unit_of_measurement is None
 
     # Test Line 115: currency missing when CONF_UOM is False
     hass.config_entries.async_update_entry(integration, options={CONF_UOM: False})
-    with patch.dict(coordinator.data, {"currency": None}):
+    await hass.async_block_till_done()
+    with patch.object(coordinator, "data", {**coordinator.data, "currency": None}):
         sensor = GasBuddySensor(SENSOR_TYPES["regular_gas"], coordinator, integration)
         assert sensor.native_unit_of_measurement is None
 
 
+async def test_station_view_built_once_per_refresh(hass, mock_gasbuddy, integration):
+    """Test sensors share one derived view until new data is published."""
+    coordinator = hass.data[DOMAIN][integration.entry_id][COORDINATOR]
+    sensors = [
+        GasBuddySensor(SENSOR_TYPES[key], coordinator, integration)
+        for key in ("regular_gas", "regular_gas_deal", "premium_gas", "e85")
+    ]
+
+    coordinator.data = dict(coordinator.data)
+    with patch(
+        "custom_components.gasbuddy.coordinator.StationView.build",
+        side_effect=StationView.build,
+    ) as mock_build:
+        for sensor in sensors:
+            _ = sensor.native_value, sensor.extra_state_attributes
+            _ = sensor.native_unit_of_measurement
+        coordinator.async_set_updated_data(dict(coordinator.data))
+        for sensor in sensors:
+            _ = sensor.native_value
+    # Once for the reads above, once for the refresh and its state writes.
+    assert mock_build.call_count == 2
+
+    view = coordinator.view
+    assert view.address == "100 Test Blvd, Springfield, IL, 62701, US"
+    assert view.amenities == "ATM, Restrooms"
+    assert view.unit == "USD/gallon"
+    assert view.attribution["regular_gas"] == "Buddy_5bbkqrb1 via GasBuddy"
+    assert view.prices["regular_gas"]["deal_price"] == (2.78, 2.78)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        view.unit = "EUR/liter"
+
+
+async def test_station_view_cents_per_liter(hass):
+    """Test the view converts cents per liter and applies the brand adjustment."""
+    view = StationView.build(
+        {
+            "unit_of_measure": "cents_per_liter",
+            "currency": "CAD",
+            "brands": [{"brandId": "5", "name": "Costco"}],
+            "regular_gas": {"price": 140.0, "cash_price": None},
+            "diesel": None,
+        },
+        BrandAdjustmentIndex({"costco": -5.0}),
+    )
+    assert view.adjustment == -5.0
+    assert view.unit == "CAD/liter"
+    assert view.prices["regular_gas"] == {"price": (1.4, 1.35)}
+    assert "diesel" not in view.prices
+    assert view.address is None
+    assert view.amenities is None
+
+
 async def test_ev_sensors(hass, mock_gasbuddy, integration):
     """Test EV charging sensors and their attributes."""
     coordinator = hass.data[DOMAIN][integration.entry_id][COORDINATOR]
@@ -424,6 +502,23 @@ async def test_redact_fallback():
     assert "**REDACTED**" in redacted
 
 
+async def test_lazy_redact(caplog):
+    """Test lazy redaction only serialises when the record is emitted."""
+    logger = logging.getLogger("custom_components.gasbuddy.coordinator")
+    payload = {"station_id": "999001", "name": "Test Gas Station"}
+
+    with patch("custom_components.gasbuddy.coordinator._redact") as mock_redact:
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            logger.debug("Gas station data: %s", LazyRedact(payload))
+        mock_redact.assert_not_called()
+
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        logger.debug("Gas station data: %s", LazyRedact(payload))
+    assert '"station_id": "**REDACTED**"' in caplog.text
+    assert "Test Gas Station" in caplog.text
+    assert str(LazyRedact(payload)) == _redact(payload)
+
+
 async def test_dynamic_enabled_deal(hass, mock_gasbuddy, entity_registry: er.EntityRegistry):
     """Test that deal sensors are enabled only when deal_price is present."""
     entry = MockConfigEntry(
@@ -504,6 +599,15 @@ async def test_extra_attrs_richer(hass, mock_gasbuddy, integration):
     assert attrs.get("amenities") == "ATM, Restrooms"
 
 
+async def test_station_details_not_recorded(hass, mock_gasbuddy, integration):
+    """Test static station details are kept out of the recorder."""
+    state = hass.states.get("sensor.gas_station_regular_gas")
+    assert state.attributes["phone"] == "555-555-5555"
+    unrecorded = state.state_info["unrecorded_attributes"]
+    assert {"address", "amenities", "entity_picture", "phone", "star_rating"} <= unrecorded
+    assert not {"last_updated", "deal_price", "station_id", "stale"} & unrecorded
+
+
 async def test_deal_sensor_enabled_without_pay_status(
     hass, mock_gasbuddy, entity_registry: er.EntityRegistry
 ):
@@ -758,6 +862,27 @@ async def test_coordinator_cheapest_filtering(hass):
     assert data["station_id"] == "111"
 
 
+async def test_station_filter_compiles_once(hass):
+    """Station filters are compiled into sets once per coordinator."""
+    station_filter = StationFilter({
+        CONF_EXCLUDE_STATIONS: [111],
+        CONF_INCLUDE_BRANDS: ["brand_exp", 7],
+    })
+    assert station_filter.exclude_stations == {"111"}
+    assert not station_filter({"station_id": "111", "brands": [{"brandId": "brand_exp"}]})
+    assert station_filter({"id": 222, "brands": [{"brandId": 7}]})
+    assert not station_filter({"station_id": "333", "brands": [{"name": "No ID"}]})
+    assert not StationFilter({})
+    assert StationFilter({})({"station_id": "1"})
+
+    subentry = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_INCLUDE_STATIONS: ["111"]}
+    )
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry)
+    assert coordinator._station_filter.include_stations == {"111"}  # noqa: SLF001
+
+
 async def test_coordinator_cheapest_filtering_no_stations(hass):
     """Test coordinator filtering in cheapest mode raises UpdateFailed if no stations remain."""
 
@@ -916,6 +1041,38 @@ async def test_coordinator_cheapest_brand_adjustments(hass):
     assert data["station_id"] == "111"
 
 
+async def test_brand_adjustment_index(hass):
+    """Test brand adjustments are compiled once and memoised per data generation."""
+    index = BrandAdjustmentIndex({"Shell": "bad", 123: -0.05, "SHELL": -0.10, "Costco": -0.08})
+    assert index.lookup({"brands": [{"brandId": 123, "name": "Costco"}]}) == -0.05
+    assert index.lookup({"brands": [{"brandId": "9", "name": "costco"}]}) == -0.08
+    # The first key for a name wins, even when its amount is invalid.
+    assert index.lookup({"brands": [{"brandId": "9", "name": "shell"}]}) == 0.0
+    assert index.lookup({"brands": None}) == 0.0
+    assert BrandAdjustmentIndex(None).lookup({"brands": [{"name": "Shell"}]}) == 0.0
+
+    entry = _make_hub_entry(hass, hub_data={**HUB_DATA, CONF_BRAND_ADJUSTMENTS: {"Shell": -0.1}})
+    coordinator = GasBuddyUpdateCoordinator(hass, entry)
+    coordinator.data = {"brands": [{"brandId": "1", "name": "Shell"}]}
+
+    with patch.object(
+        BrandAdjustmentIndex, "lookup", autospec=True, side_effect=BrandAdjustmentIndex.lookup
+    ) as mock_lookup:
+        assert coordinator.get_brand_adjustment() == -0.1
+        assert coordinator.get_brand_adjustment() == -0.1
+        assert mock_lookup.call_count == 1
+
+        coordinator.data = {"brands": [{"brandId": "1", "name": "Shell"}]}
+        assert coordinator.get_brand_adjustment() == -0.1
+        assert mock_lookup.call_count == 2
+
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_BRAND_ADJUSTMENTS: {"shell": -0.2}}
+        )
+        assert coordinator.get_brand_adjustment() == -0.2
+        assert mock_lookup.call_count == 3
+
+
 async def test_coordinator_cheapest_brand_adjustments_edge_cases(hass):
     """Test edge cases in coordinator brand adjustments (invalid types and missing price)."""
     stations = [
@@ -1353,13 +1510,14 @@ async def test_sensor_setup_skips_subentry_without_coordinator(hass, mock_gasbud
 
     sensors_added = []
 
-    async def mock_add(entities, update_before_add=False, config_subentry_id=None):
+    def mock_add(entities, update_before_add=False, config_subentry_id=None):
         sensors_added.extend(entities)
 
     await async_setup_entry(hass, entry, mock_add)
 
-    # Since coordinator dict is empty, the subentry is skipped — no sensors added
-    assert len(sensors_added) == 0
+    # Since coordinator dict is empty, the subentry is skipped — only hub sensors added
+    assert len(sensors_added) == len(HUB_SENSOR_TYPES)
+    assert all(isinstance(sensor, GasBuddyHubSensor) for sensor in sensors_added)
 
 
 async def test_get_setting_falls_back_to_config_data(hass, mock_gasbuddy):
@@ -1385,3 +1543,89 @@ async def test_get_setting_falls_back_to_config_data(hass, mock_gasbuddy):
         # Clean up for the next loop iteration
         await hass.config_entries.async_unload(entry.entry_id)
         await hass.async_block_till_done()
+
+
+_RANKED_STATIONS = [
+    {
+        "station_id": "1",
+        "name": "Third",
+        "regular_gas": {"price": 3.30},
+        "address": {"line1": "3 Main St"},
+    },
+    {"station_id": "2", "name": "Cheapest", "regular_gas": {"price": 3.00}},
+    {"station_id": "3", "name": "No price", "regular_gas": {"price": None}},
+    {
+        "station_id": "4",
+        "name": "Metric",
+        "unit_of_measure": "cents_per_liter",
+        "regular_gas": {"price": 310.0},
+    },
+    {"station_id": "5", "name": "Fourth", "regular_gas": {"price": 3.30}},
+]
+
+
+async def test_coordinator_cheapest_top_k(hass):
+    """Cheapest mode ranks the K cheapest stations and keeps ties in listing order."""
+    subentry = _make_cheapest_subentry(data={**CHEAPEST_SUBENTRY_DATA, CONF_TOP_K: 3})
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry)
+    with patch.object(
+        coordinator._api,  # noqa: SLF001
+        "price_lookup_service",
+        return_value={"results": copy.deepcopy(_RANKED_STATIONS)},
+    ):
+        data = await coordinator._async_update_data()  # noqa: SLF001
+
+    assert data["station_id"] == "2"
+    assert data["runner_ups"] == [
+        {"rank": 2, "station_id": "1", "name": "Third", "address": "3 Main St", "price": 3.3},
+        {"rank": 3, "station_id": "5", "name": "Fourth", "address": None, "price": 3.3},
+    ]
+
+
+async def test_cheapest_runner_ups_and_rank_sensors(hass):
+    """The fuel sensor lists runner-ups and rank sensors show each of them."""
+    subentry = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_TOP_K: 3, CONF_RANK_SENSORS: True}
+    )
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    runner_ups = [{"rank": 2, "station_id": "7", "name": "Second", "address": None, "price": 2.99}]
+    with patch(
+        "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+        return_value={**COORDINATOR_DATA_CHEAPEST, "runner_ups": runner_ups},
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.cheapest_gas_regular_gas")
+    assert state.attributes["runner_ups"] == runner_ups
+
+    rank_2 = hass.states.get("sensor.cheapest_gas_rank_2")
+    assert rank_2.state == "2.99"
+    assert rank_2.attributes["unit_of_measurement"] == "USD/gallon"
+    assert rank_2.attributes["station_id"] == "7"
+    assert rank_2.attributes["rank"] == 2
+    assert "address" not in rank_2.attributes
+    assert hass.states.get("sensor.cheapest_gas_rank_3").state == "unavailable"
+
+    entity_registry = er.async_get(hass)
+    rank_entry = entity_registry.async_get("sensor.cheapest_gas_rank_2")
+    assert (
+        rank_entry.device_id
+        == entity_registry.async_get("sensor.cheapest_gas_regular_gas").device_id
+    )
+
+
+async def test_rank_sensor_without_runner_up(hass):
+    """A rank sensor has no value or attributes until its rank is filled."""
+    subentry = _make_cheapest_subentry(data={**CHEAPEST_SUBENTRY_DATA, CONF_UOM: False})
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry)
+    sensor = GasBuddyRankSensor(coordinator, entry, subentry, 2)
+
+    assert sensor.native_value is None
+    assert sensor.native_unit_of_measurement is None
+    assert sensor.extra_state_attributes is None
+
+    coordinator.data = {**COORDINATOR_DATA_CHEAPEST, "runner_ups": []}
+    assert sensor.native_unit_of_measurement == "USD"
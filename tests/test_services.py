@@ -1,5 +1,6 @@
 """Test gasbuddy services."""
 
+import asyncio
 import logging
 from unittest.mock import MagicMock, patch
 
@@ -11,10 +12,13 @@ from yarl import URL
 from custom_components.gasbuddy.const import (
     ATTR_DEVICE_ID,
     ATTR_LIMIT,
+    ATTR_LOOKUP_STATS,
     ATTR_POSTAL_CODE,
     ATTR_SOLVER,
+    ATTR_TIMEOUT,
     COORDINATOR,
     DOMAIN,
+    SERVICES,
 )
 from homeassistant.const import ATTR_ENTITY_ID, ATTR_LATITUDE, ATTR_LONGITUDE
 from homeassistant.exceptions import ServiceValidationError
@@ -34,6 +38,13 @@ GB_URL = "https://www.gasbuddy.com/home"
 SOLVER_URL = "http://solver.url"
 
 
+def _clear_response_cache(hass) -> None:
+    """Drop cached service responses so the next call goes upstream."""
+    for entry_data in hass.data[DOMAIN].values():
+        if isinstance(entry_data, dict) and SERVICES in entry_data:
+            entry_data[SERVICES].cache.clear()
+
+
 async def test_lookup_gps(
     hass,
     mock_gasbuddy,
@@ -122,6 +133,7 @@ async def test_lookup_gps(
 
         assert len(response[entity_id]["results"]) == 10
 
+        _clear_response_cache(hass)
         response = await hass.services.async_call(
             DOMAIN,
             SERVICE_LOOKUP_GPS,
@@ -212,6 +224,7 @@ async def test_lookup_zip(
         assert response["trend"][1]["average_price"] == 3.11
         assert response["trend"][1]["lowest_price"] == 0
 
+    _clear_response_cache(hass)
     with caplog.at_level(logging.DEBUG):
         response = await hass.services.async_call(
             DOMAIN,
@@ -426,3 +439,232 @@ async def test_clear_cache_no_coordinator(hass, mock_gasbuddy, mock_aioclient, c
                 blocking=True,
                 return_response=False,
             )
+
+
+async def test_lookup_gps_shares_grid_cells(hass, mock_gasbuddy):
+    """Nearby entities share one concurrent lookup and report stats."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        "device_tracker.car", "home", {ATTR_LATITUDE: 41.8781, ATTR_LONGITUDE: -87.6298}
+    )
+    hass.states.async_set(
+        "device_tracker.van", "home", {ATTR_LATITUDE: 41.8783, ATTR_LONGITUDE: -87.6301}
+    )
+    hass.states.async_set(
+        "device_tracker.boat", "home", {ATTR_LATITUDE: 33.4591, ATTR_LONGITUDE: -112.5027}
+    )
+    running = 0
+    peak = 0
+
+    async def _lookup(lat, lon, limit=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return {"results": [{"lat": lat}]}
+
+    with patch(
+        "custom_components.gasbuddy.client.GasBuddy.price_lookup_service", side_effect=_lookup
+    ) as mock_lookup:
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_LOOKUP_GPS,
+            {ATTR_ENTITY_ID: ["device_tracker.car", "device_tracker.van", "device_tracker.boat"]},
+            blocking=True,
+            return_response=True,
+        )
+
+    assert mock_lookup.await_count == 2
+    assert peak == 2
+    assert set(response) == {"device_tracker.car", "device_tracker.van", "device_tracker.boat"}
+    stats = {entity: result.pop(ATTR_LOOKUP_STATS) for entity, result in response.items()}
+    assert (
+        response["device_tracker.car"]
+        == response["device_tracker.van"]
+        == {"results": [{"lat": 41.8781}]}
+    )
+    assert response["device_tracker.boat"] == {"results": [{"lat": 33.4591}]}
+    assert [
+        stats[entity]["cached"]
+        for entity in ("device_tracker.car", "device_tracker.van", "device_tracker.boat")
+    ] == [False, True, False]
+    assert all(stat["elapsed"] >= 0 for stat in stats.values())
+
+
+async def test_lookup_gps_times_out_per_entity(hass, mock_gasbuddy, caplog):
+    """An entity whose lookup exceeds the timeout is left out of the response."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        "device_tracker.car", "home", {ATTR_LATITUDE: 41.8781, ATTR_LONGITUDE: -87.6298}
+    )
+    hass.states.async_set(
+        "device_tracker.boat", "home", {ATTR_LATITUDE: 33.4591, ATTR_LONGITUDE: -112.5027}
+    )
+
+    async def _lookup(lat, lon, limit=None):
+        if lat == 33.4591:
+            await asyncio.sleep(10)
+        return {"results": []}
+
+    real_timeout = asyncio.timeout
+    with (
+        patch(
+            "custom_components.gasbuddy.client.GasBuddy.price_lookup_service", side_effect=_lookup
+        ),
+        patch(
+            "custom_components.gasbuddy.services.asyncio.timeout",
+            side_effect=lambda _: real_timeout(0.01),
+        ) as mock_timeout,
+        caplog.at_level(logging.ERROR),
+    ):
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_LOOKUP_GPS,
+            {ATTR_ENTITY_ID: ["device_tracker.car", "device_tracker.boat"], ATTR_TIMEOUT: 5},
+            blocking=True,
+            return_response=True,
+        )
+
+    mock_timeout.assert_called_with(5)
+    assert response["device_tracker.car"]["results"] == []
+    assert "device_tracker.boat" not in response
+    assert "Error checking prices" in caplog.text
+
+
+async def test_lookup_gps_raises_unexpected_errors(hass, mock_gasbuddy):
+    """Errors other than API failures and timeouts still fail the service call."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        "device_tracker.car", "home", {ATTR_LATITUDE: 41.8781, ATTR_LONGITUDE: -87.6298}
+    )
+
+    with (
+        patch(
+            "custom_components.gasbuddy.client.GasBuddy.price_lookup_service",
+            side_effect=ValueError("boom"),
+        ),
+        pytest.raises(ValueError, match="boom"),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_LOOKUP_GPS,
+            {ATTR_ENTITY_ID: "device_tracker.car"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_lookup_zip_uses_response_cache(hass, mock_gasbuddy):
+    """Repeated lookups are answered from the response cache until it is cleared."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with patch(
+        "custom_components.gasbuddy.client.GasBuddy.price_lookup_service",
+        return_value={"results": [{"station_id": "1"}]},
+    ) as mock_lookup:
+        for zipcode in ("k1a 0b1", "K1A0B1"):
+            response = await hass.services.async_call(
+                DOMAIN,
+                SERVICE_LOOKUP_ZIP,
+                {ATTR_POSTAL_CODE: zipcode},
+                blocking=True,
+                return_response=True,
+            )
+            assert response == {"results": [{"station_id": "1"}]}
+        assert mock_lookup.await_count == 1
+
+        # A lookup through a solver is not answered with a direct lookup's result.
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_LOOKUP_ZIP,
+            {ATTR_POSTAL_CODE: "K1A 0B1", ATTR_SOLVER: SOLVER_URL},
+            blocking=True,
+            return_response=True,
+        )
+        assert mock_lookup.await_count == 2
+
+        _clear_response_cache(hass)
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_LOOKUP_ZIP,
+            {ATTR_POSTAL_CODE: "K1A 0B1"},
+            blocking=True,
+            return_response=True,
+        )
+        assert mock_lookup.await_count == 3
+
+
+async def test_lookup_gps_uses_response_cache(hass, mock_gasbuddy):
+    """A repeated GPS lookup in the same grid cell is served from the cache."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        "device_tracker.car", "home", {ATTR_LATITUDE: 41.8781, ATTR_LONGITUDE: -87.6298}
+    )
+
+    with patch(
+        "custom_components.gasbuddy.client.GasBuddy.price_lookup_service",
+        return_value={"results": []},
+    ) as mock_lookup:
+        for cached in (False, True):
+            response = await hass.services.async_call(
+                DOMAIN,
+                SERVICE_LOOKUP_GPS,
+                {ATTR_ENTITY_ID: "device_tracker.car"},
+                blocking=True,
+                return_response=True,
+            )
+            result = response["device_tracker.car"]
+            assert result.pop(ATTR_LOOKUP_STATS)["cached"] is cached
+            assert result == {"results": []}
+
+    mock_lookup.assert_awaited_once()
+
+
+async def test_ev_lookup_zip_uses_response_cache(hass, mock_gasbuddy):
+    """Repeated EV ZIP lookups skip both upstream requests."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Gas Station", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with (
+        patch(
+            "custom_components.gasbuddy.client.GasBuddy.price_lookup_service",
+            return_value={"results": [{"latitude": 41.8781, "longitude": -87.6298}]},
+        ) as mock_lookup,
+        patch(
+            "custom_components.gasbuddy.client.GasBuddy.ev_stations_nearby",
+            return_value={"stations": [{"station_id": "1"}]},
+        ),
+    ):
+        for _ in range(2):
+            response = await hass.services.async_call(
+                DOMAIN,
+                "ev_lookup_zip",
+                {ATTR_POSTAL_CODE: "60601"},
+                blocking=True,
+                return_response=True,
+            )
+            assert response == {"stations": [{"station_id": "1"}]}
+
+    mock_lookup.assert_awaited_once()
@@ -0,0 +1,162 @@
+"""Test the last-known-good snapshot store."""
+# ruff: noqa: SLF001
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.gasbuddy.const import (
+    COORDINATOR,
+    DOMAIN,
+    HUB,
+    SNAPSHOT_STORE_KEY,
+    SNAPSHOT_STORE_VERSION,
+)
+from custom_components.gasbuddy.snapshot import GasBuddySnapshotStore
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from tests.conftest import _make_hub_entry
+from tests.const import COORDINATOR_DATA
+
+pytestmark = pytest.mark.asyncio
+
+_SNAPSHOT_DATA = {
+    **COORDINATOR_DATA,
+    "regular_gas": {**COORDINATOR_DATA["regular_gas"], "price": 2.49},
+    "last_updated": "2024-01-01T00:00:00+00:00",
+}
+
+
+def _stored_snapshot(subentry_id: str = "test_subentry_id") -> dict:
+    """Return snapshot store contents as written to .storage."""
+    return {
+        "version": SNAPSHOT_STORE_VERSION,
+        "minor_version": 1,
+        "key": SNAPSHOT_STORE_KEY,
+        "data": {
+            "stations": {
+                subentry_id: {
+                    "saved_at": "2024-01-01T00:00:00+00:00",
+                    "data": _SNAPSHOT_DATA,
+                }
+            }
+        },
+    }
+
+
+async def test_snapshot_store_round_trip(hass, hass_storage):
+    """Test saving, reading back and pruning snapshots."""
+    hass_storage[SNAPSHOT_STORE_KEY] = _stored_snapshot("old_subentry_id")
+    store = GasBuddySnapshotStore(hass)
+    await store.async_load()
+    assert store.get("old_subentry_id")[1] == "2024-01-01T00:00:00+00:00"
+    assert store.get("missing") is None
+
+    store.async_save("test_subentry_id", COORDINATOR_DATA)
+    data, saved_at = store.get("test_subentry_id")
+    assert data == COORDINATOR_DATA
+    assert data is not COORDINATOR_DATA
+    assert saved_at is not None
+
+    store.async_prune({"test_subentry_id"})
+    store.async_prune({"test_subentry_id"})
+    assert store.get("old_subentry_id") is None
+    assert set(store._data_to_save()["stations"]) == {"test_subentry_id"}
+
+
+async def test_snapshot_store_load_failure(hass):
+    """Test a broken store starts cold instead of failing setup."""
+    store = GasBuddySnapshotStore(hass)
+    with patch.object(store._store, "async_load", side_effect=ValueError("corrupt")):
+        await store.async_load()
+    assert store.get("test_subentry_id") is None
+
+
+async def test_warm_start_from_snapshot(hass, hass_storage):
+    """Test sensors come up from the snapshot while the live refresh runs."""
+    hass_storage[SNAPSHOT_STORE_KEY] = _stored_snapshot()
+    release = asyncio.Event()
+
+    async def _slow_update(self):
+        await release.wait()
+        return self._async_save_snapshot(dict(COORDINATOR_DATA))
+
+    entry = _make_hub_entry(hass)
+    with patch(
+        "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+        _slow_update,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("sensor.gas_station_regular_gas")
+        assert state.state == "2.49"
+        assert state.attributes["stale"] is True
+        assert state.attributes["stale_since"] == "2024-01-01T00:00:00+00:00"
+
+        release.set()
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.gas_station_regular_gas")
+    assert state.state == "2.95"
+    assert "stale" not in state.attributes
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    assert hub.snapshots.get("test_subentry_id")[0]["regular_gas"]["price"] == 2.95
+
+
+async def test_warm_start_refresh_failure_keeps_hub_loaded(hass, hass_storage):
+    """Test a failed background refresh after a warm start does not fail setup."""
+    hass_storage[SNAPSHOT_STORE_KEY] = _stored_snapshot()
+    entry = _make_hub_entry(hass)
+    with patch(
+        "custom_components.gasbuddy.GasBuddyUpdateCoordinator._async_update_data",
+        side_effect=UpdateFailed("blocked"),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]["test_subentry_id"]
+    assert coordinator.stale
+    assert not coordinator.last_update_success
+
+
+async def test_snapshot_saved_after_refresh(hass, hass_storage):
+    """Test a successful refresh persists the snapshot to .storage."""
+    entry = _make_hub_entry(hass)
+    with patch("custom_components.gasbuddy.coordinator.GasBuddy.price_lookup") as lookup:
+        lookup.return_value = dict(COORDINATOR_DATA)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]["test_subentry_id"]
+    assert not coordinator.stale
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    await hub.snapshots._store._async_handle_write_data()
+    stored = hass_storage[SNAPSHOT_STORE_KEY]["data"]["stations"]["test_subentry_id"]
+    assert stored["data"]["regular_gas"]["price"] == 2.95
+
+
+async def test_reload_keeps_pending_hub_state(hass, hass_storage):
+    """Test snapshots, history and postal codes still waiting to be saved survive a reload."""
+    entry = _make_hub_entry(hass)
+    with patch("custom_components.gasbuddy.coordinator.GasBuddy.price_lookup") as lookup:
+        lookup.return_value = dict(COORDINATOR_DATA)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        hub = hass.data[DOMAIN][entry.entry_id][HUB]
+        hub.geocodes.async_observe(
+            {"results": [{"latitude": 41.88, "longitude": -87.63}]}, zipcode="60601"
+        )
+        assert SNAPSHOT_STORE_KEY not in hass_storage
+
+        lookup.side_effect = UpdateFailed("blocked")
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    assert hub.snapshots.get("test_subentry_id")[0]["regular_gas"]["price"] == 2.95
+    assert hub.history.fuels("test_subentry_id")
+    assert hub.geocodes.get("60601") == (41.88, -87.63)
@@ -0,0 +1,228 @@
+"""Test the hub-wide spatial index of station records."""
+# ruff: noqa: SLF001
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.gasbuddy.const import (
+    ATTR_FUEL,
+    ATTR_LIMIT,
+    ATTR_MAX_AGE,
+    ATTR_PRICE_TYPE,
+    ATTR_RADIUS,
+    CONF_INDEX_RADIUS,
+    CONF_POSTAL,
+    DOMAIN,
+    HUB,
+    SERVICE_CHEAPEST_NEARBY,
+)
+from custom_components.gasbuddy.coordinator import GasBuddyUpdateCoordinator
+from custom_components.gasbuddy.diagnostics import async_get_config_entry_diagnostics
+from custom_components.gasbuddy.hub import GasBuddyHub
+from custom_components.gasbuddy.spatial import GasBuddyStationIndex
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.exceptions import ServiceValidationError
+from tests.conftest import _make_cheapest_subentry, _make_hub_entry
+from tests.const import CHEAPEST_SUBENTRY_DATA
+
+pytestmark = pytest.mark.asyncio
+
+LAT, LON = 41.88, -87.63
+
+
+def _station(station_id: str, lat: float, lon: float, price: float | None, **extra) -> dict:
+    """Return a station record as GasBuddy returns it."""
+    return {
+        "station_id": station_id,
+        "name": f"Station {station_id}",
+        "latitude": lat,
+        "longitude": lon,
+        "regular_gas": {"price": price, "cash_price": None},
+        **extra,
+    }
+
+
+async def test_index_observe_and_nearby():
+    """Test recording responses and searching around a point."""
+    index = GasBuddyStationIndex(capacity=3)
+    index.async_observe(None)
+    index.async_observe({
+        "results": [
+            _station("1", LAT, LON, 3.09),
+            _station("2", LAT + 0.03, LON, 2.99),
+            "junk",
+            {"station_id": "3", "latitude": None, "longitude": LON},
+            {"station_id": "4", "latitude": LAT, "longitude": LON, "name": "No prices"},
+        ]
+    })
+    index.async_observe(_station("5", LAT + 1, LON, 2.5))
+    assert len(index) == 3
+    assert [station["station_id"] for _, station in index.nearby(LAT, LON, 5)] == ["1", "2"]
+    assert index.nearby(LAT, LON, 1)[0][0] == 0.0
+
+    # A station seen again replaces its record, even in another cell.
+    index.async_observe(_station("1", LAT + 1.001, LON, 3.19))
+    assert [station["station_id"] for _, station in index.nearby(LAT, LON, 5)] == ["2"]
+    assert len(index.nearby(LAT + 1, LON, 1)) == 2
+
+    # Past capacity, the station seen longest ago is dropped.
+    index.async_observe({"results": [_station("6", LAT, LON, 3.0)]})
+    assert len(index) == 3
+    assert [station["station_id"] for _, station in index.nearby(LAT, LON, 5)] == ["6"]
+
+
+async def test_index_max_age_and_cheapest():
+    """Test freshness filtering and ranking by price."""
+    index = GasBuddyStationIndex()
+    with patch("custom_components.gasbuddy.spatial.time.monotonic", return_value=1000.0):
+        index.async_observe({"results": [_station("old", LAT, LON, 1.99)]})
+    with patch("custom_components.gasbuddy.spatial.time.monotonic", return_value=4000.0):
+        index.async_observe({
+            "results": [
+                _station("near", LAT, LON + 0.01, 3.09),
+                _station("far", LAT, LON + 0.05, 3.09),
+                _station("cheap", LAT, LON + 0.03, 2.89),
+                _station(
+                    "cad",
+                    LAT,
+                    LON + 0.04,
+                    289.9,
+                    unit_of_measure="cents_per_liter",
+                ),
+                _station("unpriced", LAT, LON, None),
+                {
+                    **_station("diesel", LAT, LON, None),
+                    "regular_gas": None,
+                    "diesel": {"price": 3.5},
+                },
+            ]
+        })
+        assert len(index.nearby(LAT, LON, 5, 1000)) == 6
+        assert len(index.nearby(LAT, LON, 5)) == 7
+
+        ranked, total = index.cheapest(LAT, LON, 5, "regular_gas", "credit", 3, 1000)
+        assert total == 5
+        assert [(price, station["station_id"]) for price, _, _, station in ranked] == [
+            (2.89, "cheap"),
+            (3.09, "near"),
+            (3.09, "far"),
+        ]
+        assert ranked[0][2] == 0.0
+        ranked, total = index.cheapest(LAT, LON, 5, "regular_gas", "cash", 3, 1000)
+        assert (ranked, total) == ([], 5)
+
+
+async def test_coalescer_feeds_index(hass):
+    """Test every upstream response through the hub is indexed."""
+    entry = _make_hub_entry(hass)
+    hub = GasBuddyHub(hass, entry)
+    api = MagicMock()
+    api.price_lookup_service = AsyncMock(return_value={"results": [_station("1", LAT, LON, 3)]})
+    api.price_lookup = AsyncMock(return_value=_station("2", LAT, LON, 3))
+    await hub.requests.async_request(api, "price_lookup_service", lat=LAT, lon=LON)
+    await hub.requests.async_request(api, "price_lookup", "2")
+    assert len(hub.stations) == 2
+
+
+async def test_cheapest_tracker_ranks_indexed_stations(hass):
+    """Test a cheapest tracker with an index radius also ranks known stations."""
+    lat, lon = hass.config.latitude, hass.config.longitude
+    subentry = _make_cheapest_subentry(data={**CHEAPEST_SUBENTRY_DATA, CONF_INDEX_RADIUS: 5})
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+    coordinator._api = MagicMock()
+    coordinator._api.price_lookup_service = AsyncMock(
+        return_value={"results": [_station("area", lat, lon, 3.09)]}
+    )
+
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == "area"
+
+    # A cheaper station further out, seen by another lookup, now wins.
+    hub.stations.async_observe(_station("known", lat + 0.04, lon, 2.89))
+    hub.stations.async_observe(_station("distant", lat + 1, lon, 1.99))
+    hub.areas._snapshots.clear()
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == "known"
+    assert [runner["station_id"] for runner in data["runner_ups"]] == ["area"]
+
+
+async def test_cheapest_tracker_index_by_postal_code(hass):
+    """Test postal code trackers search the index around the learned code."""
+    lat, lon = hass.config.latitude, hass.config.longitude
+    subentry = _make_cheapest_subentry(
+        data={**CHEAPEST_SUBENTRY_DATA, CONF_INDEX_RADIUS: 5, CONF_POSTAL: "60601"}
+    )
+    entry = _make_hub_entry(hass, subentries=[subentry])
+    hub = GasBuddyHub(hass, entry)
+    coordinator = GasBuddyUpdateCoordinator(hass, entry, subentry, hub=hub)
+    coordinator._api = MagicMock()
+    hub.stations.async_observe(_station("known", lat, lon, 2.89))
+
+    # Without a location for the postal code, only the lookup is ranked.
+    coordinator._api.price_lookup_service = AsyncMock(
+        return_value={"results": [_station("area", None, None, 3.09)]}
+    )
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == "area"
+
+    # The lookup taught the hub where the postal code is.
+    coordinator._api.price_lookup_service = AsyncMock(
+        return_value={"results": [_station("area", lat, lon, 3.09)]}
+    )
+    hub.areas._snapshots.clear()
+    data = await coordinator._async_update_data()
+    assert data["station_id"] == "known"
+
+
+async def test_cheapest_nearby_service(hass, mock_gasbuddy):
+    """Test the cheapest nearby service answers from the index."""
+    entry = _make_hub_entry(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hub = hass.data[DOMAIN][entry.entry_id][HUB]
+    hub.stations.async_observe({
+        "results": [
+            _station("1", LAT, LON, 3.09, address={"line1": "1 Main St", "locality": "Chicago"}),
+            _station("2", LAT + 0.01, LON, 309.9, unit_of_measure="cents_per_liter"),
+        ]
+    })
+    hass.states.async_set("device_tracker.car", "home", {"latitude": LAT, "longitude": LON})
+    hass.states.async_set("device_tracker.lost", "unknown")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_CHEAPEST_NEARBY,
+        {
+            ATTR_ENTITY_ID: ["device_tracker.car", "device_tracker.lost"],
+            ATTR_FUEL: "regular_gas",
+            ATTR_PRICE_TYPE: "credit",
+            ATTR_RADIUS: 2,
+            ATTR_LIMIT: 5,
+            ATTR_MAX_AGE: 30,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["device_tracker.lost"] == {}
+    car = response["device_tracker.car"]
+    assert car["total"] == 2
+    assert [station["price"] for station in car["stations"]] == [3.09, 3.099]
+    assert car["stations"][0]["address"] == "1 Main St, Chicago"
+    assert car["stations"][1]["distance_miles"] == 0.69
+    assert car["stations"][1]["age"] == 0
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["indexed_stations"] == len(hub.stations)
+
+    hass.data[DOMAIN][entry.entry_id].pop(HUB)
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHEAPEST_NEARBY,
+            {ATTR_ENTITY_ID: "device_tracker.car"},
+            blocking=True,
+            return_response=True,
+        )